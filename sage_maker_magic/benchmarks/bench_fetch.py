@@ -0,0 +1,100 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Cold and cached model artifact fetch from a local S3 stand-in with per-request latency.
+
+    python benchmarks/bench_fetch.py [--size_mb 256] [--latency_ms 20] [--workers 1 8]
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sage_maker_kernel.artifacts import ArtifactCache
+
+
+class LocalS3(object):
+    """
+        The head_object / ranged get_object subset of an S3 client, served from memory.
+    """
+    def __init__(self, latency, bandwidth):
+        self.objects = {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+
+    def put(self, bucket, key, data):
+        self.objects[(bucket, key)] = data
+
+    def head_object(self, Bucket, Key):
+        data = self.objects[(Bucket, Key)]
+        return {'ETag': '"{:x}"'.format(hash(data) & 0xffffffff), 'ContentLength': len(data)}
+
+    def get_object(self, Bucket, Key, Range=None, IfMatch=None):
+        self.requests += 1
+        data = self.objects[(Bucket, Key)]
+        if Range:
+            first, last = (int(v) for v in Range[len('bytes='):].split('-'))
+            data = data[first:last + 1]
+        ## Each connection is limited to `bandwidth`; parallel ranged GETs add up.
+        time.sleep(self.latency + len(data) / self.bandwidth)
+        return {'Body': io.BytesIO(data)}
+
+
+def model_tarball(size):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w:gz', compresslevel=1) as tar:
+        for i, chunk in enumerate(range(0, size, 64 * 2 ** 20)):
+            payload = os.urandom(min(64 * 2 ** 20, size - chunk))
+            info = tarfile.TarInfo('model/part-{:03d}.bin'.format(i))
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+    return buf.getvalue()
+
+
+def bench(size, latency, bandwidth, workers):
+    workdir = tempfile.mkdtemp(prefix='sm-bench-fetch-')
+    try:
+        s3 = LocalS3(latency, bandwidth)
+        s3.put('bench', 'job/output/model.tar.gz', model_tarball(size))
+        cache = ArtifactCache(root=workdir, max_workers=workers, part_size=8 * 2 ** 20)
+        start = time.perf_counter()
+        cold = cache.fetch('s3://bench/job/output/model.tar.gz', s3)
+        cold_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        warm = cache.fetch('s3://bench/job/output/model.tar.gz', s3)
+        warm_seconds = time.perf_counter() - start
+        return {
+            'workers': workers,
+            'artifact_bytes': len(s3.objects[('bench', 'job/output/model.tar.gz')]),
+            'extracted_bytes': cold.bytes,
+            'cold_seconds': cold_seconds,
+            'cold_mib_per_s': cold.bytes / 2 ** 20 / cold_seconds,
+            'cached_seconds': warm_seconds,
+            'cached_hit': warm.cached,
+            'get_requests': s3.requests,
+        }
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--size_mb', type=int, default=256)
+    ap.add_argument('--latency_ms', type=float, default=20.0)
+    ap.add_argument('--connection_mb_per_s', type=float, default=100.0)
+    ap.add_argument('--workers', type=int, nargs='*', default=[1, 8])
+    args = ap.parse_args(argv)
+    print(json.dumps([bench(args.size_mb * 2 ** 20, args.latency_ms / 1000.0, args.connection_mb_per_s * 2 ** 20, workers)
+                      for workers in args.workers], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Time to first prompt of the `sm` kernel: process launch until the kernel_info reply, then the
+    first cell and the first magic, which pays for the deferred config import. Each repeat starts a
+    fresh kernel process.
+
+    python benchmarks/bench_kernel_startup.py [--repeats 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def kernel_spec_dir():
+    path = tempfile.mkdtemp(prefix='sm-bench-kernel-')
+    os.makedirs(os.path.join(path, 'kernels', 'sm-bench'))
+    with open(os.path.join(path, 'kernels', 'sm-bench', 'kernel.json'), 'w') as f:
+        json.dump({'argv': [sys.executable, '-m', 'sage_maker_kernel', '-f', '{connection_file}'],
+                   'display_name': 'Sage Maker (bench)', 'language': 'text',
+                   'env': {'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+                           'DEFAULT_SM_CONFIG_PATH': os.environ.get('DEFAULT_SM_CONFIG_PATH',
+                                                                    os.path.join(ROOT, '..', 'config', 'default.conf'))}}, f)
+    return path
+
+
+def execute(client, code):
+    start = time.perf_counter()
+    reply = client.execute_interactive(code, silent=False, store_history=False, timeout=120, output_hook=lambda msg: None)
+    if reply['content']['status'] != 'ok':
+        raise RuntimeError('{!r} failed: {}'.format(code, reply['content'].get('evalue')))
+    return time.perf_counter() - start
+
+
+def bench_once():
+    from jupyter_client.manager import start_new_kernel
+    start = time.perf_counter()
+    manager, client = start_new_kernel(kernel_name='sm-bench', startup_timeout=120)
+    try:
+        ## start_new_kernel returns once the kernel has answered kernel_info.
+        first_prompt = time.perf_counter() - start
+        first_cell = execute(client, '1')
+        first_magic = execute(client, '%pytorch show_defaults')
+        aliases = execute(client, 'assert get_ipython().alias_manager.is_alias("list_training_jobs")')
+        return {'first_prompt_s': first_prompt, 'first_cell_s': first_cell, 'first_magic_s': first_magic, 'alias_check_s': aliases}
+    finally:
+        client.stop_channels()
+        manager.shutdown_kernel(now=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeats', type=int, default=5)
+    args = ap.parse_args(argv)
+    spec_dir = kernel_spec_dir()
+    os.environ['JUPYTER_PATH'] = os.pathsep.join(filter(None, [spec_dir, os.environ.get('JUPYTER_PATH')]))
+    try:
+        runs = [bench_once() for _ in range(args.repeats)]
+    finally:
+        shutil.rmtree(spec_dir)
+    print(json.dumps({key: {'median_s': statistics.median(run[key] for run in runs), 'max_s': max(run[key] for run in runs)}
+                      for key in runs[0]}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    End-to-end magic benchmarks against an in-memory SageMaker, SageMaker Metrics, STS, S3 and CloudWatch Logs backend.
+
+    The magics run in an in-process IPython shell; every AWS call made through the shared boto3
+    session is answered by FakeAws before anything is sent, so no network or credentials are needed.
+    Results are printed (or written with --output) as JSON to compare across commits.
+
+    python benchmarks/bench_magics.py [--jobs 2000] [--submits 20] [--sweep_jobs 100] [--log_events 20000] [--metrics_jobs 500] [--output results.json]
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+WORKDIR = tempfile.mkdtemp(prefix='sm-bench-magics-')
+## The magics read these at import time; they must point at scratch space before the import below.
+os.environ.setdefault('SM_MAGIC_STAGING_DIR', os.path.join(WORKDIR, 'staging'))
+os.environ.setdefault('SM_MAGIC_REGISTRY_PATH', os.path.join(WORKDIR, 'jobs.sqlite'))
+os.environ.setdefault('DEFAULT_SM_CONFIG_PATH', os.path.join(ROOT, '..', 'config', 'default.conf'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+os.environ.setdefault('SAGEMAKER_SUPPRESS_V2_WARNING', '1')
+sys.path.insert(0, ROOT)
+
+ACCOUNT = '123456789012'
+ROLE = 'arn:aws:iam::{}:role/bench'.format(ACCOUNT)
+EXTENSION = 'sage_maker_kernel.kernelmagics'
+SUBMIT_LINE = ('submit --role {} --framework_version 1.13 --py_version py39 --instance_type ml.m5.large '
+               '--hyperparameters epochs:10,lr:0.01 --channel_training s3://bench/data/train --channel_testing s3://bench/data/test').format(ROLE)
+
+
+class FakeAws(object):
+    """
+        before-call handler serving the SageMaker, STS, S3 and Logs operations the magics use from memory.
+    """
+    def __init__(self, jobs=0, log_streams=1, log_events=0, metric_points=200, page_size=100):
+        self.metric_points = metric_points
+        self.now = datetime.datetime.now(datetime.timezone.utc)
+        self.training_jobs = {}
+        self.objects = {}
+        self.calls = {}
+        self.page_size = page_size
+        for i in range(jobs):
+            self._add_job('pytorch-bench-{:06d}'.format(i), 'Completed' if i % 3 else 'InProgress',
+                          self.now - datetime.timedelta(minutes=i))
+        self.log_events = {'pytorch-bench-logs/algo-{}-1'.format(s): [
+            {'timestamp': 0, 'message': 'epoch {} step {} loss=0.{:04d}'.format(s, e, e % 10000), 'ingestionTime': 0}
+            for e in range(log_events // log_streams)] for s in range(1, log_streams + 1)}
+
+    def _add_job(self, name, status, created):
+        self.training_jobs[name] = {
+            'TrainingJobName': name,
+            'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:{}:training-job/{}'.format(ACCOUNT, name),
+            'AlgorithmSpecification': {'TrainingInputMode': 'File', 'MetricDefinitions': [
+                {'Name': 'train:loss', 'Regex': 'loss=(.*?);'}, {'Name': 'validation:accuracy', 'Regex': 'acc=(.*?);'}]},
+            'RoleArn': ROLE,
+            'OutputDataConfig': {'S3OutputPath': 's3://bench/output'},
+            'ResourceConfig': {'InstanceCount': 1, 'InstanceType': 'ml.m5.large', 'VolumeSizeInGB': 30},
+            'StoppingCondition': {'MaxRuntimeInSeconds': 86400},
+            'ModelArtifacts': {'S3ModelArtifacts': 's3://bench/output/{}/output/model.tar.gz'.format(name)},
+            'CreationTime': created,
+            'LastModifiedTime': created,
+            'TrainingJobStatus': status,
+            'SecondaryStatus': 'Completed' if status == 'Completed' else 'Training',
+        }
+        if status == 'Completed':
+            self.training_jobs[name]['TrainingEndTime'] = created
+
+    def _page(self, items, params, key):
+        start = int(params.get('NextToken') or 0)
+        size = params.get('MaxResults') or self.page_size
+        page = {key: items[start:start + size]}
+        if start + size < len(items):
+            page['NextToken'] = str(start + size)
+        return page
+
+    def install(self, session):
+        ## before-call only sees the serialized request, so the API parameters are kept from parameter build.
+        session.events.register_first('before-parameter-build', self._keep_params, unique_id='bench-fake-aws-params')
+        session.events.register_first('before-call', self, unique_id='bench-fake-aws')
+
+    def _keep_params(self, params, context, **kwargs):
+        context['bench_params'] = dict(params)
+
+    def __call__(self, model, context, **kwargs):
+        from botocore.awsrequest import AWSResponse
+        operation = '{}.{}'.format(model.service_model.service_name, model.name)
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        handler = getattr(self, operation.replace('.', '_').replace('-', '_'), None)
+        parsed = handler(context.get('bench_params', {})) if handler is not None else {}
+        parsed.setdefault('ResponseMetadata', {'HTTPStatusCode': 200, 'HTTPHeaders': {}})
+        return AWSResponse('https://bench.local', 200, {}, None), parsed
+
+    def sts_GetCallerIdentity(self, params):
+        return {'Account': ACCOUNT, 'Arn': 'arn:aws:iam::{}:user/bench'.format(ACCOUNT), 'UserId': 'bench'}
+
+    def s3_ListBuckets(self, params):
+        return {'Buckets': [{'Name': 'sagemaker-us-east-1-{}'.format(ACCOUNT), 'CreationDate': self.now}]}
+
+    def s3_PutObject(self, params):
+        body = params.get('Body')
+        self.objects[(params['Bucket'], params['Key'])] = body.read() if hasattr(body, 'read') else body
+        return {'ETag': '"bench"'}
+
+    def s3_HeadObject(self, params):
+        data = self.objects.get((params['Bucket'], params['Key']), b'')
+        return {'ETag': '"bench"', 'ContentLength': len(data)}
+
+    def sagemaker_CreateTrainingJob(self, params):
+        self._add_job(params['TrainingJobName'], 'InProgress', datetime.datetime.now(datetime.timezone.utc))
+        return {'TrainingJobArn': self.training_jobs[params['TrainingJobName']]['TrainingJobArn']}
+
+    def sagemaker_DescribeTrainingJob(self, params):
+        return dict(self.training_jobs[params['TrainingJobName']])
+
+    def sagemaker_ListTrainingJobs(self, params):
+        jobs = [job for job in self.training_jobs.values()
+                if params.get('NameContains', '') in job['TrainingJobName']
+                and ('LastModifiedTimeAfter' not in params or job['LastModifiedTime'] > params['LastModifiedTimeAfter'])
+                and ('StatusEquals' not in params or job['TrainingJobStatus'] == params['StatusEquals'])]
+        jobs.sort(key=lambda job: job['CreationTime'], reverse=True)
+        keys = ('TrainingJobName', 'TrainingJobArn', 'CreationTime', 'LastModifiedTime', 'TrainingJobStatus')
+        return self._page([{key: job[key] for key in keys} for job in jobs], params, 'TrainingJobSummaries')
+
+    def sagemaker_Search(self, params):
+        names = [f['Value'] for f in params['SearchExpression']['Filters'] if f['Name'] == 'TrainingJobName']
+        jobs = [{'TrainingJob': dict(self.training_jobs[name])} for name in names if name in self.training_jobs]
+        return self._page(jobs, params, 'Results')
+
+    def sagemaker_metrics_BatchGetMetrics(self, params):
+        results = []
+        for query in params['MetricQueries']:
+            rate = 1 + int(query['ResourceArn'][-6:]) % 7 if query['ResourceArn'][-6:].isdigit() else 1
+            steps = list(range(self.metric_points))
+            curve = [1.0 / (1 + rate * step) for step in steps]
+            results.append({'Status': 'Complete', 'XAxisValues': steps,
+                            'MetricValues': [1 - v for v in curve] if 'accuracy' in query['MetricName'] else curve})
+        return {'MetricQueryResults': results}
+
+    def logs_DescribeLogStreams(self, params):
+        streams = [{'logStreamName': name} for name in sorted(self.log_events)
+                   if name.startswith(params.get('logStreamNamePrefix', ''))]
+        return self._page(streams, {'NextToken': params.get('nextToken'), 'MaxResults': 50}, 'logStreams')
+
+    def logs_GetLogEvents(self, params):
+        events = self.log_events[params['logStreamName']]
+        start = int((params.get('nextToken') or 'f/0').split('/')[1])
+        page = events[start:start + 10000]
+        return {'events': page, 'nextForwardToken': 'f/{}'.format(start + len(page))}
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {'median_ms': statistics.median(ordered) * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000}
+
+
+def bench_load(repeats):
+    """
+        %load_ext time in a fresh interpreter, so module imports are cold every time.
+    """
+    code = ('import sys, time; sys.path.insert(0, {!r})\n'
+            'from IPython.testing.globalipapp import start_ipython\n'
+            'ip = start_ipython()\n'
+            'start = time.perf_counter(); ip.run_line_magic("load_ext", {!r}); print(time.perf_counter() - start)\n'
+            'print(int(any(m in sys.modules for m in ("sagemaker", "boto3", "pyhocon", "pandas"))))').format(ROOT, EXTENSION)
+    samples, heavy = [], 0
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout.split()
+        samples.append(float(out[-2]))
+        heavy |= int(out[-1])
+    return dict(percentiles(samples), heavy_imports_at_load=bool(heavy))
+
+
+def bench_parse(magics, iterations):
+    from IPython.core.magic_arguments import parse_argstring
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse_argstring(magics.pytorch, SUBMIT_LINE)
+    elapsed = time.perf_counter() - start
+    return {'iterations': iterations, 'parses_per_s': iterations / elapsed, 'mean_us': elapsed / iterations * 1e6}
+
+
+def bench_submit(shell, backend, submits):
+    samples = []
+    for i in range(submits):
+        start = time.perf_counter()
+        with quiet():
+            shell.run_cell_magic('pytorch', SUBMIT_LINE, 'print({})\n'.format(i % 2))
+        samples.append(time.perf_counter() - start)
+    return dict(percentiles(samples[1:] or samples), submits=submits, first_ms=samples[0] * 1000,
+                create_training_job_calls=backend.calls.get('sagemaker.CreateTrainingJob', 0),
+                source_uploads=backend.calls.get('s3.PutObject', 0) + backend.calls.get('s3.CreateMultipartUpload', 0))
+
+
+def bench_sweep(shell, backend, jobs, max_parallel):
+    grid = '|'.join('0.{:04d}'.format(i + 1) for i in range(jobs))
+    line = SUBMIT_LINE.replace('submit', 'sweep', 1) + ' --hyperparameter_grid lr:{} --max_parallel {}'.format(grid, max_parallel)
+    before = backend.calls.get('sagemaker.CreateTrainingJob', 0)
+    start = time.perf_counter()
+    with quiet():
+        shell.run_cell_magic('pytorch', line, 'print(2)\n')
+    elapsed = time.perf_counter() - start
+    submitted = len(shell.user_ns['___PyTorch_sweep_job_names'])
+    return {'jobs': jobs, 'max_parallel': max_parallel, 'submitted': submitted, 'seconds': elapsed, 'jobs_per_s': submitted / elapsed,
+            'create_training_job_calls': backend.calls.get('sagemaker.CreateTrainingJob', 0) - before}
+
+
+def bench_list(shell, jobs):
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', 'list --no_index --name_contains pytorch-bench --max_result {}'.format(jobs))
+    paged = time.perf_counter() - start
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', 'list --name_contains pytorch-bench --max_result 50')
+    index_cold = time.perf_counter() - start
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', 'list --name_contains pytorch-bench --max_result 50')
+    index_warm = time.perf_counter() - start
+    return {'jobs': jobs, 'paged_jobs_per_s': jobs / paged, 'index_cold_s': index_cold, 'index_warm_s': index_warm}
+
+
+def bench_status(shell, backend, count):
+    names = sorted(name for name in backend.training_jobs if name.startswith('pytorch-bench-'))[:count]
+    start = time.perf_counter()
+    with quiet():
+        for name in names:
+            shell.user_ns['___PyTorch_latest_job_name'] = name
+            shell.run_line_magic('pytorch', 'status')
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    with quiet():
+        for name in names:
+            shell.user_ns['___PyTorch_latest_job_name'] = name
+            shell.run_line_magic('pytorch', 'status')
+    warm = time.perf_counter() - start
+    return {'jobs': len(names), 'statuses_per_s': len(names) / cold, 'repeat_statuses_per_s': len(names) / warm}
+
+
+def bench_logs(shell, backend):
+    events = sum(len(stream) for stream in backend.log_events.values())
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', 'logs --job_name pytorch-bench-logs --from_start')
+    elapsed = time.perf_counter() - start
+    return {'events': events, 'lines_per_s': events / elapsed, 'seconds': elapsed}
+
+
+def bench_metrics(shell, backend, count):
+    names = sorted(name for name in backend.training_jobs if name.startswith('pytorch-bench-'))[:count]
+    ## As after a sweep; a --job_names line this long would mostly time IPython's variable expansion.
+    shell.user_ns['___PyTorch_sweep_job_names'] = names
+    shell.user_ns['___PyTorch_latest_job_name'] = names[-1]
+    line = 'metrics'
+    before = dict(backend.calls)
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', line)
+    cold = time.perf_counter() - start
+    requests = {op: n - before.get(op, 0) for op, n in backend.calls.items() if n != before.get(op, 0)}
+    start = time.perf_counter()
+    with quiet():
+        shell.run_line_magic('pytorch', line)
+    warm = time.perf_counter() - start
+    return {'jobs': len(names), 'points_per_series': backend.metric_points, 'cold_s': cold, 'repeat_s': warm,
+            'cold_requests': requests}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--jobs', type=int, default=2000, help='Training jobs in the fake account.')
+    ap.add_argument('--submits', type=int, default=20)
+    ap.add_argument('--sweep_jobs', type=int, default=100)
+    ap.add_argument('--max_parallel', type=int, default=8)
+    ap.add_argument('--statuses', type=int, default=500)
+    ap.add_argument('--log_streams', type=int, default=4)
+    ap.add_argument('--log_events', type=int, default=20000)
+    ap.add_argument('--metrics_jobs', type=int, default=500)
+    ap.add_argument('--parses', type=int, default=2000)
+    ap.add_argument('--load_repeats', type=int, default=3)
+    ap.add_argument('--with_rate_limits', action='store_true', help='Keep the default client-side API budgets.')
+    ap.add_argument('--output', type=str, help='Write the JSON results to this file as well.')
+    args = ap.parse_args(argv)
+    logging.getLogger('sagemaker').setLevel(logging.WARNING)
+
+    from IPython.testing.globalipapp import start_ipython
+    from sage_maker_kernel.aws import aws
+    from sage_maker_kernel.throttle import API_BUDGETS, RateLimiter
+
+    results = {'commit': git_commit(), 'python': sys.version.split()[0], 'time': time.time()}
+    results['load_ext'] = bench_load(args.load_repeats)
+
+    shell = start_ipython()
+    shell.run_line_magic('load_ext', EXTENSION)
+    if not args.with_rate_limits:
+        unlimited = (1e9, 1e9)
+        aws.limiter = RateLimiter(budgets=dict.fromkeys(API_BUDGETS, unlimited), default_budget=unlimited)
+    backend = FakeAws(jobs=args.jobs, log_streams=args.log_streams, log_events=args.log_events)
+    aws.reset()
+    backend.install(aws.boto_session())
+    ## The SDK reports usage with plain HTTP outside botocore. Opting out through an SDK config file would make
+    ## every estimator re-validate that file, so the request is dropped here instead.
+    import sagemaker.telemetry.telemetry_logging as telemetry
+    telemetry._requests_helper = lambda url, timeout: None
+    magics = shell.magics_manager.registry['PyTorchEstimatorMagics']
+
+    results['parse'] = bench_parse(magics, args.parses)
+    results['submit'] = bench_submit(shell, backend, args.submits)
+    results['sweep'] = bench_sweep(shell, backend, args.sweep_jobs, args.max_parallel)
+    results['list'] = bench_list(shell, args.jobs)
+    results['status'] = bench_status(shell, backend, args.statuses)
+    results['logs'] = bench_logs(shell, backend)
+    results['metrics'] = bench_metrics(shell, backend, args.metrics_jobs)
+    results['aws_calls'] = dict(sorted(backend.calls.items()))
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
@@ -0,0 +1,67 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Cold and warm --source_dir packaging time for synthetic trees of 1k and 10k files.
+
+    python benchmarks/bench_packaging.py [--files 1000 10000] [--file_size 2048]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sage_maker_kernel.packaging import SourcePackager
+
+
+def make_tree(root, files, file_size):
+    for i in range(files):
+        directory = os.path.join(root, 'pkg{:03d}'.format(i % 100))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'module_{:05d}.py'.format(i)), 'wb') as f:
+            f.write(os.urandom(file_size // 2).hex().encode('ascii'))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench(files, file_size):
+    workdir = tempfile.mkdtemp(prefix='sm-bench-packaging-')
+    try:
+        source_dir = os.path.join(workdir, 'src')
+        make_tree(source_dir, files, file_size)
+        packager = SourcePackager(root=os.path.join(workdir, 'packages'))
+        cold, package = timed(packager.package, source_dir)
+        warm, _ = timed(packager.package, source_dir)
+        archive_bytes = os.path.getsize(package.path)
+        with open(os.path.join(source_dir, 'pkg000', 'module_00000.py'), 'a') as f:
+            f.write('# changed\n')
+        one_changed, _ = timed(packager.package, source_dir)
+        return {
+            'files': files,
+            'archive_bytes': archive_bytes,
+            'cold_seconds': cold,
+            'warm_seconds': warm,
+            'one_file_changed_seconds': one_changed,
+        }
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--files', type=int, nargs='*', default=[1000, 10000])
+    ap.add_argument('--file_size', type=int, default=2048)
+    args = ap.parse_args(argv)
+    print(json.dumps([bench(files, args.file_size) for files in args.files], indent=4))
+
+
+if __name__ == '__main__':
+    main()
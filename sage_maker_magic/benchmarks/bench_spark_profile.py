@@ -0,0 +1,80 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Synthetic Spark event logs and the throughput of the `%pyspark profile` analyzer on them.
+
+    python benchmarks/bench_spark_profile.py [--stages 20] [--tasks_per_stage 20000] [--keep PATH]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sage_maker_kernel.spark_profile import SparkEventLogAnalyzer, iter_event_log_lines
+
+
+def write_synthetic_event_log(path, stages=5, tasks_per_stage=1000, straggler_every=500, skew_every=700, seed=0):
+    """
+        Write a Spark event log with `stages` stages of `tasks_per_stage` tasks. Every
+        `straggler_every`-th task runs 10x longer and every `skew_every`-th partition reads 20x
+        more shuffle data, so the analyzer has known outliers to find.
+    """
+    rng = random.Random(seed)
+    task_id = 0
+    with open(path, 'w') as f:
+        f.write(json.dumps({'Event': 'SparkListenerApplicationStart', 'App Name': 'synthetic'}) + '\n')
+        for stage in range(stages):
+            f.write(json.dumps({'Event': 'SparkListenerStageSubmitted',
+                                'Stage Info': {'Stage ID': stage, 'Stage Name': 'stage {} at synthetic.py:{}'.format(stage, stage)}}) + '\n')
+            for index in range(tasks_per_stage):
+                duration = rng.randint(800, 1200) * (10 if index % straggler_every == straggler_every - 1 else 1)
+                shuffle_read = rng.randint(4, 6) * 2 ** 20 * (20 if index % skew_every == skew_every - 1 else 1)
+                launch = 1600000000000 + task_id
+                f.write(json.dumps({
+                    'Event': 'SparkListenerTaskEnd', 'Stage ID': stage, 'Stage Attempt ID': 0,
+                    'Task Info': {'Task ID': task_id, 'Index': index, 'Launch Time': launch,
+                                  'Finish Time': launch + duration, 'Failed': False},
+                    'Task Metrics': {'Executor Run Time': duration - 50,
+                                     'Shuffle Read Metrics': {'Remote Bytes Read': shuffle_read, 'Local Bytes Read': 0},
+                                     'Shuffle Write Metrics': {'Shuffle Bytes Written': shuffle_read // 2},
+                                     'Memory Bytes Spilled': 0, 'Disk Bytes Spilled': 0,
+                                     'Input Metrics': {'Bytes Read': 2 ** 20}},
+                }) + '\n')
+                task_id += 1
+            f.write(json.dumps({'Event': 'SparkListenerStageCompleted', 'Stage Info': {'Stage ID': stage}}) + '\n')
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--stages', type=int, default=20)
+    ap.add_argument('--tasks_per_stage', type=int, default=20000)
+    ap.add_argument('--keep', type=str, help='Write the synthetic event log here and keep it.')
+    args = ap.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='sm-bench-spark-')
+    try:
+        path = write_synthetic_event_log(args.keep or os.path.join(workdir, 'events'), args.stages, args.tasks_per_stage)
+        start = time.perf_counter()
+        analyzer = SparkEventLogAnalyzer().feed_all(iter_event_log_lines(path))
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            'tasks': analyzer.tasks,
+            'log_bytes': os.path.getsize(path),
+            'seconds': elapsed,
+            'tasks_per_second': analyzer.tasks / elapsed,
+            'stragglers': len(analyzer.stragglers()),
+            'skewed_partitions': len(analyzer.skewed_partitions()),
+        }, indent=4))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Synthetic Debugger system metrics and the throughput of the estimator `profile` reduction on them.
+
+    algo-1 is input bound (busy CPUs, idle GPUs), algo-2 trains on unevenly loaded GPUs, so the
+    analyzer has known bottlenecks to flag. --keep writes the files in the layout Debugger uses,
+    to replay with `%pytorch profile --profiler_data PATH`.
+
+    python benchmarks/bench_system_profile.py [--minutes 60] [--interval_ms 500] [--keep PATH]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sage_maker_kernel.system_profile import SystemMetricsAnalyzer, iter_system_metric_lines
+
+CPUS = 32
+GPUS = 4
+## host -> (CPU, GPU, GPU memory, I/O wait, memory) utilization ranges, GPU ranges per device.
+HOSTS = {
+    'algo-1': ((92, 100), [(2, 20)] * GPUS, (10, 20), (0, 5), (40, 50)),
+    'algo-2': ((20, 40), [(90, 100), (90, 100), (40, 60), (40, 60)], (60, 70), (0, 5), (40, 50)),
+}
+
+
+def write_synthetic_system_metrics(path, minutes=10, interval_ms=500, seed=0):
+    """
+        Write one file per host and minute of Debugger system metric records under `path`.
+    """
+    rng = random.Random(seed)
+    start = 1600000000.0
+    samples_per_file = int(60000 / interval_ms)
+    for minute in range(minutes):
+        directory = os.path.join(path, 'incremental', time.strftime('%Y%m%d%H', time.gmtime(start + minute * 60)))
+        os.makedirs(directory, exist_ok=True)
+        for host, (cpu, gpus, gpu_memory, io_wait, memory) in HOSTS.items():
+            file_name = '{}.{}.json'.format(int((start + minute * 60) * 1e6), host)
+            with open(os.path.join(directory, file_name), 'w') as f:
+                for sample in range(samples_per_file):
+                    timestamp = start + minute * 60 + sample * interval_ms / 1000.0
+                    records = [('cpu{}'.format(i), 'cpu', 'CPUUtilization', rng.uniform(*cpu)) for i in range(CPUS)]
+                    records.append(('cpu_total', 'cpu', 'I/OWaitPercentage', rng.uniform(*io_wait)))
+                    records.append(('MemoryUsedPercent', 'memory', 'Memory', rng.uniform(*memory)))
+                    for i, gpu in enumerate(gpus):
+                        records.append(('gpu{}'.format(i), 'gpu', 'GPUUtilization', rng.uniform(*gpu)))
+                        records.append(('gpu{}'.format(i), 'gpu', 'GPUMemoryUtilization', rng.uniform(*gpu_memory)))
+                    for name, kind, dimension, value in records:
+                        f.write(json.dumps({'Name': name, 'Type': kind, 'Dimension': dimension,
+                                            'Value': round(value, 2), 'Timestamp': timestamp}) + '\n')
+    return path
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--minutes', type=int, default=60)
+    ap.add_argument('--interval_ms', type=int, default=500)
+    ap.add_argument('--keep', type=str, help='Write the synthetic system metrics here and keep them.')
+    args = ap.parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='sm-bench-system-')
+    try:
+        path = write_synthetic_system_metrics(args.keep or os.path.join(workdir, 'system'), args.minutes, args.interval_ms)
+        start = time.perf_counter()
+        analyzer = SystemMetricsAnalyzer(resolution=args.interval_ms / 1000.0).feed_all(iter_system_metric_lines(path))
+        table = analyzer.utilization_table()
+        flags = analyzer.bottlenecks(table)
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            'records': analyzer.records,
+            'skipped': analyzer.skipped,
+            'seconds': elapsed,
+            'records_per_second': analyzer.records / elapsed,
+            'flags': sorted('{} {}'.format(row.host, row.flag) for row in flags.itertuples()),
+        }, indent=4))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
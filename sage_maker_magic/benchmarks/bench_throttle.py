@@ -0,0 +1,118 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+"""
+    Load test of the API rate limiter against a stubbed SageMaker endpoint with a server-side quota.
+
+    Concurrent callers hammer DescribeTrainingJob; the stub answers ThrottlingException whenever its
+    own token bucket is empty, the way the real service does past the account TPS quota.
+
+    python benchmarks/bench_throttle.py [--calls 1000] [--threads 16] [--quota 50]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sage_maker_kernel.throttle import RateLimiter, TokenBucket
+
+DESCRIBE_RESPONSE = {
+    'TrainingJobName': 'bench-job',
+    'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:123456789012:training-job/bench-job',
+    'AlgorithmSpecification': {'TrainingInputMode': 'File'},
+    'RoleArn': 'arn:aws:iam::123456789012:role/bench',
+    'OutputDataConfig': {'S3OutputPath': 's3://bench/output'},
+    'ResourceConfig': {'InstanceCount': 1, 'InstanceType': 'ml.m5.large', 'VolumeSizeInGB': 1},
+    'StoppingCondition': {},
+    'ModelArtifacts': {'S3ModelArtifacts': 's3://bench/model.tar.gz'},
+    'CreationTime': 0,
+    'TrainingJobStatus': 'InProgress',
+    'SecondaryStatus': 'Training',
+}
+
+
+class QuotaStub(object):
+    """
+        before-call handler answering DescribeTrainingJob locally, throttled by a server-side quota.
+    """
+    def __init__(self, quota):
+        self.quota = TokenBucket(quota, quota)
+        self.lock = threading.Lock()
+        self.served = 0
+        self.throttled = 0
+
+    def __call__(self, model, **kwargs):
+        from botocore.awsrequest import AWSResponse
+        with self.quota._lock:
+            now = time.monotonic()
+            self.quota.tokens = min(self.quota.burst, self.quota.tokens + (now - self.quota.updated) * self.quota.rate)
+            self.quota.updated = now
+            allowed = self.quota.tokens >= 1
+            if allowed:
+                self.quota.tokens -= 1
+        with self.lock:
+            if allowed:
+                self.served += 1
+            else:
+                self.throttled += 1
+        if allowed:
+            return AWSResponse(None, 200, {}, None), DESCRIBE_RESPONSE
+        return AWSResponse(None, 400, {}, None), {
+            'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'},
+            'ResponseMetadata': {'HTTPStatusCode': 400}}
+
+
+def bench(calls, threads, quota, budget):
+    import boto3
+    from botocore.config import Config
+    session = boto3.Session(region_name='us-east-1', aws_access_key_id='bench', aws_secret_access_key='bench')
+    client = session.client('sagemaker', config=Config(retries={'total_max_attempts': 1}))
+    stub = QuotaStub(quota)
+    client.meta.events.register('before-call.sagemaker.DescribeTrainingJob', stub)
+    limiter = RateLimiter(budgets={'DescribeTrainingJob': (budget, budget)})
+    limiter.install(client)
+
+    unhandled = []
+
+    def describe(_):
+        try:
+            return client.describe_training_job(TrainingJobName='bench-job')['TrainingJobStatus']
+        except Exception as e:
+            unhandled.append(repr(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(describe, range(calls)))
+    elapsed = time.perf_counter() - start
+    stats = limiter.stats()['DescribeTrainingJob']
+    return {
+        'calls': calls,
+        'threads': threads,
+        'server_quota_per_s': quota,
+        'client_budget_per_s': budget,
+        'seconds': elapsed,
+        'calls_per_s': calls / elapsed,
+        'server_throttles': stub.throttled,
+        'client_retries': stats['retries'],
+        'client_wait_s_all_threads': stats['wait_s'],
+        'unhandled_throttles': len(unhandled),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--calls', type=int, default=1000)
+    ap.add_argument('--threads', type=int, default=16)
+    ap.add_argument('--quota', type=float, default=50.0)
+    ap.add_argument('--budgets', type=float, nargs='*', default=[25.0, 50.0, 200.0],
+                    help='Client-side budgets to try, below, at and above the server quota.')
+    args = ap.parse_args(argv)
+    print(json.dumps([bench(args.calls, args.threads, args.quota, budget) for budget in args.budgets], indent=2))
+
+
+if __name__ == '__main__':
+    main()
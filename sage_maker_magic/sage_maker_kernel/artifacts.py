@@ -0,0 +1,178 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+
+from .staging import STAGING_DIR, digest
+
+ARTIFACTS_DIR = os.path.join(STAGING_DIR, 'artifacts')
+MAX_CACHE_BYTES = int(os.environ.get('SM_MAGIC_ARTIFACT_CACHE_BYTES', 20 * 2 ** 30))
+PART_SIZE = 16 * 2 ** 20
+MAX_WORKERS = 8
+
+Artifact = collections.namedtuple('Artifact', ['path', 'bytes', 'cached'])
+
+
+def split_s3_uri(uri):
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    return bucket, key
+
+
+class RangedReader(io.RawIOBase):
+    """
+        Sequential file object over an S3 object, fetched as parallel ranged GETs.
+
+        Up to `2 * max_workers` parts are in flight ahead of the reader and parts are handed out
+        in order, so a consumer such as tarfile stream mode sees one contiguous stream while the
+        download runs at the bandwidth of several connections. Bytes are hashed as they are read.
+    """
+    def __init__(self, s3_client, bucket, key, size, etag=None, part_size=PART_SIZE, max_workers=MAX_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+        super(RangedReader, self).__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.etag = etag
+        self.max_workers = max_workers
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+        self._parts = collections.deque((first, min(first + part_size, size) - 1) for first in range(0, size, part_size))
+        self._pending = collections.deque()
+        self._buffer = memoryview(b'')
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sm-fetch')
+        self._schedule()
+
+    def _get(self, first, last):
+        kwargs = {'Bucket': self.bucket, 'Key': self.key, 'Range': 'bytes={}-{}'.format(first, last)}
+        if self.etag:
+            ## A part from a newer version of the object would corrupt the stream.
+            kwargs['IfMatch'] = self.etag
+        return self.s3_client.get_object(**kwargs)['Body'].read()
+
+    def _schedule(self):
+        while self._parts and len(self._pending) < 2 * self.max_workers:
+            self._pending.append(self._executor.submit(self._get, *self._parts.popleft()))
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            if not self._pending:
+                return 0
+            part = self._pending.popleft().result()
+            self._schedule()
+            self.sha256.update(part)
+            self._buffer = memoryview(part)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        self.bytes_read += n
+        return n
+
+    def drain(self):
+        """
+            Read and hash the rest of the object, which a consumer that stops early (tarfile
+            stream mode stops at the end-of-archive marker) leaves unread.
+        """
+        while self.read(PART_SIZE):
+            pass
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        super(RangedReader, self).close()
+
+
+class ArtifactCache(object):
+    """
+        Content-addressed local cache of extracted model artifacts.
+
+        Entries are keyed by the S3 object's ETag and size, so the same artifact fetched twice,
+        or under two URIs, is extracted once. A `.tar.gz` is untarred straight from the ranged
+        download stream without an intermediate file. Entries are evicted least-recently-used once
+        their extracted size exceeds `max_bytes`.
+    """
+    def __init__(self, root=ARTIFACTS_DIR, max_bytes=MAX_CACHE_BYTES, part_size=PART_SIZE, max_workers=MAX_WORKERS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+
+    def _entry_paths(self, key):
+        return os.path.join(self.root, key), os.path.join(self.root, '{}.json'.format(key))
+
+    def fetch(self, s3_uri, s3_client):
+        bucket, key = split_s3_uri(s3_uri)
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+        cache_key = digest('\0'.join([head['ETag'], str(head['ContentLength'])]))[:32]
+        path, meta_path = self._entry_paths(cache_key)
+        with self._lock:
+            if os.path.exists(meta_path):
+                os.utime(meta_path)
+                with open(meta_path) as f:
+                    return Artifact(path, json.load(f)['bytes'], True)
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+        reader = RangedReader(s3_client, bucket, key, head['ContentLength'], head['ETag'], self.part_size, self.max_workers)
+        try:
+            if key.endswith(('.tar.gz', '.tgz', '.tar')):
+                with tarfile.open(fileobj=reader, mode='r|*') as tar:
+                    if hasattr(tarfile, 'data_filter'):
+                        tar.extractall(tmp_path, filter='data')
+                    else:
+                        tar.extractall(tmp_path)
+            else:
+                os.makedirs(tmp_path)
+                with open(os.path.join(tmp_path, os.path.basename(key)), 'wb') as f:
+                    shutil.copyfileobj(reader, f, self.part_size)
+            reader.drain()
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        finally:
+            reader.close()
+        extracted = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names)
+
+        with self._lock:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+            with open(meta_path, 'w') as f:
+                json.dump({'s3_uri': s3_uri, 'etag': head['ETag'], 'sha256': reader.sha256.hexdigest(),
+                           'downloaded_bytes': reader.bytes_read, 'bytes': extracted, 'fetched_at': time.time()}, f)
+            self._evict(keep=cache_key)
+        return Artifact(path, extracted, False)
+
+    def _evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith('.json'):
+                meta_path = os.path.join(self.root, name)
+                try:
+                    with open(meta_path) as f:
+                        size = json.load(f)['bytes']
+                except (IOError, ValueError, KeyError):
+                    continue
+                entries.append((os.stat(meta_path).st_mtime, name[:-len('.json')], size))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            path, meta_path = self._entry_paths(key)
+            os.remove(meta_path)
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+artifact_cache = ArtifactCache()
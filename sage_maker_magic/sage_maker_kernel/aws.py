@@ -0,0 +1,96 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import threading
+import time
+
+from .throttle import RateLimiter
+
+ROLE_TTL_SECONDS = 3600
+MAX_POOL_CONNECTIONS = 50
+## Services whose calls go through the rate limiter; it also owns their retries.
+LIMITED_SERVICES = ('sagemaker', 'sagemaker-metrics', 'logs')
+
+
+class AwsProvider(object):
+    """
+        Pooled boto3 session, clients, SageMaker session and execution role shared by all magics.
+
+        Credentials and endpoints are resolved once per process, clients keep their HTTP
+        connection pool between calls and the execution role is looked up once per `role_ttl`.
+        SageMaker, SageMaker Metrics and CloudWatch Logs clients are rate limited by `limiter`;
+        `call_observers` are told the operation and duration of every API call made through the session.
+    """
+    def __init__(self, role_ttl=ROLE_TTL_SECONDS, max_pool_connections=MAX_POOL_CONNECTIONS, limiter=None):
+        self.role_ttl = role_ttl
+        self.max_pool_connections = max_pool_connections
+        self.limiter = limiter or RateLimiter()
+        self._lock = threading.RLock()
+        self._boto_session = None
+        self._sagemaker_session = None
+        self._clients = {}
+        self._role = None
+        self._role_expires_at = 0
+        self.call_observers = []
+
+    def _call_started(self, context=None, **kwargs):
+        if self.call_observers and context is not None:
+            context['sm_magic_call_start'] = time.perf_counter()
+
+    def _call_finished(self, model=None, context=None, **kwargs):
+        start = (context or {}).get('sm_magic_call_start')
+        if start is not None:
+            end = time.perf_counter()
+            for observer in self.call_observers:
+                observer('{}.{}'.format(model.service_model.service_name, model.name), start, end)
+
+    def boto_session(self):
+        with self._lock:
+            if self._boto_session is None:
+                import boto3
+                self._boto_session = boto3.Session()
+                ## Clients copy the session's handlers, so every client created afterwards reports its calls.
+                self._boto_session.events.register('before-parameter-build', self._call_started, unique_id='sm-magic-before-call')
+                self._boto_session.events.register('after-call', self._call_finished, unique_id='sm-magic-after-call')
+            return self._boto_session
+
+    def client(self, service_name):
+        with self._lock:
+            if service_name not in self._clients:
+                from botocore.config import Config
+                if service_name in LIMITED_SERVICES:
+                    config = Config(max_pool_connections=self.max_pool_connections, retries={'total_max_attempts': 1})
+                    self._clients[service_name] = self.limiter.install(self.boto_session().client(service_name, config=config))
+                else:
+                    self._clients[service_name] = self.boto_session().client(
+                        service_name, config=Config(max_pool_connections=self.max_pool_connections))
+            return self._clients[service_name]
+
+    def session(self):
+        with self._lock:
+            if self._sagemaker_session is None:
+                from sagemaker import Session
+                self._sagemaker_session = Session(boto_session=self.boto_session(),
+                                                  sagemaker_client=self.client('sagemaker'))
+            return self._sagemaker_session
+
+    def role(self):
+        with self._lock:
+            if self._role is None or time.monotonic() >= self._role_expires_at:
+                from sagemaker import get_execution_role
+                self._role = get_execution_role(sagemaker_session=self.session())
+                self._role_expires_at = time.monotonic() + self.role_ttl
+            return self._role
+
+    def reset(self):
+        """
+            Drop every cached object, for example after the notebook credentials changed.
+        """
+        with self._lock:
+            self._boto_session = None
+            self._sagemaker_session = None
+            self._clients.clear()
+            self._role = None
+            self._role_expires_at = 0
+
+
+aws = AwsProvider()
@@ -0,0 +1,143 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import json
+import os
+import threading
+import time
+
+from .packaging import file_digest, scan
+from .staging import STAGING_DIR, digest
+
+CHANNELS_DIR = os.path.join(STAGING_DIR, 'channels')
+CHANNEL_PREFIX = 'sm-magic/channels'
+MULTIPART_CHUNK_SIZE = 64 * 2 ** 20
+MAX_WORKERS = 8
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+Staged = collections.namedtuple('Staged', ['s3_uri', 'files', 'uploaded', 'copied', 'bytes', 'seconds'])
+
+
+class _Progress(object):
+    def __init__(self, name, total, report):
+        self.name = name
+        self.total = total
+        self.report = report
+        self.done = 0
+        self.start = time.time()
+        self.reported_at = self.start
+        self._lock = threading.Lock()
+
+    def __call__(self, transferred):
+        with self._lock:
+            self.done += transferred
+            now = time.time()
+            if now - self.reported_at < PROGRESS_INTERVAL_SECONDS:
+                return
+            self.reported_at = now
+        self.report('{}: {:.1f}/{:.1f} MiB ({:.1f} MiB/s)'.format(
+            self.name, self.done / 2 ** 20, self.total / 2 ** 20, self.done / 2 ** 20 / (now - self.start)))
+
+
+class ChannelStager(object):
+    """
+        Uploads local channel data to S3 once per dataset content.
+
+        A local file or directory is hashed file by file with the incremental manifest used for
+        --source_dir, so unchanged files are not re-read. The dataset is uploaded under a prefix
+        named after the hash of its manifest and that prefix is reused for as long as the content
+        does not change. When it does, files whose content was uploaded before are copied server
+        side, and only new content is sent, using parallel multipart transfers.
+    """
+    def __init__(self, root=CHANNELS_DIR, max_workers=MAX_WORKERS, multipart_chunksize=MULTIPART_CHUNK_SIZE):
+        self.root = root
+        self.max_workers = max_workers
+        self.multipart_chunksize = multipart_chunksize
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+
+    def _read_json(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _write_json(self, path, value):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def _manifest(self, local_path):
+        manifest_path = os.path.join(self.root, 'manifest-{}.json'.format(digest(local_path)[:16]))
+        previous = self._read_json(manifest_path)
+        if os.path.isdir(local_path):
+            files = scan(local_path, previous)
+        else:
+            name, stat = os.path.basename(local_path), os.stat(local_path)
+            known = previous.get(name)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                files = {name: known}
+            else:
+                files = {name: [stat.st_size, stat.st_mtime_ns, file_digest(local_path)]}
+        self._write_json(manifest_path, files)
+        return files
+
+    def stage(self, local_path, s3_client, bucket, name='channel', report=print):
+        """
+            Return the Staged S3 prefix holding the content of `local_path`, uploading what is missing.
+        """
+        from boto3.s3.transfer import TransferConfig
+        from botocore.exceptions import ClientError
+        from concurrent.futures import ThreadPoolExecutor
+
+        start = time.time()
+        local_path = os.path.abspath(local_path)
+        directory = local_path if os.path.isdir(local_path) else os.path.dirname(local_path)
+        files = self._manifest(local_path)
+        dataset = digest(json.dumps(sorted((rel, meta[2]) for rel, meta in files.items())))
+        prefix = '{}/{}'.format(CHANNEL_PREFIX, dataset[:32])
+        s3_uri = 's3://{}/{}'.format(bucket, prefix)
+        total = sum(meta[0] for meta in files.values())
+
+        with self._lock:
+            index = self._read_json(self.index_path)
+        datasets, objects = index.setdefault('datasets', {}), index.setdefault('objects', {})
+        dataset_key = '{}/{}'.format(bucket, dataset)
+        if datasets.get(dataset_key) == s3_uri and s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix + '/', MaxKeys=1).get('KeyCount'):
+            return Staged(s3_uri, len(files), 0, 0, 0, time.time() - start)
+
+        config = TransferConfig(multipart_threshold=self.multipart_chunksize, multipart_chunksize=self.multipart_chunksize,
+                                max_concurrency=self.max_workers)
+        progress = _Progress(name, total, report)
+
+        def transfer(item):
+            rel, (size, _, sha) = item
+            key = '{}/{}'.format(prefix, rel.replace(os.sep, '/'))
+            source = objects.get(sha)
+            if source is not None and source['bucket'] == bucket:
+                try:
+                    s3_client.copy({'Bucket': bucket, 'Key': source['key']}, bucket, key, Config=config)
+                    progress(size)
+                    return sha, key, False
+                except ClientError:
+                    pass
+            s3_client.upload_file(os.path.join(directory, rel), bucket, key, Config=config, Callback=progress)
+            return sha, key, True
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sm-channel') as executor:
+            results = list(executor.map(transfer, sorted(files.items())))
+        uploaded_bytes = sum(files[rel][0] for rel, (_, _, uploaded) in zip(sorted(files), results) if uploaded)
+
+        with self._lock:
+            index = self._read_json(self.index_path)
+            index.setdefault('objects', {}).update({sha: {'bucket': bucket, 'key': key} for sha, key, _ in results})
+            index.setdefault('datasets', {})[dataset_key] = s3_uri
+            self._write_json(self.index_path, index)
+        uploaded = sum(1 for _, _, was_uploaded in results if was_uploaded)
+        return Staged(s3_uri, len(files), uploaded, len(results) - uploaded, uploaded_bytes, time.time() - start)
+
+
+channel_stager = ChannelStager()
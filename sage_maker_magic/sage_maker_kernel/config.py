@@ -0,0 +1,68 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import os
+import threading
+
+## Sections every magic resolves on each call; they are extracted once per file version.
+RUNTIME_SECTIONS = ('estimator.tfjob', 'estimator.pytorch', 'estimator.sklearn', 'processor.pyspark')
+
+
+def default_config_path():
+    return os.environ.get('DEFAULT_SM_CONFIG_PATH')
+
+
+class ConfigCache(object):
+    """
+        Process-wide cache of parsed HOCON configuration files.
+
+        Entries are keyed by path and invalidated when the file mtime or size changes,
+        so the file is parsed once per version instead of once per magic call.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def _file_key(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, path, key):
+        from pyhocon import ConfigFactory
+        root = ConfigFactory.parse_file(path)
+        sections = {}
+        for section in RUNTIME_SECTIONS:
+            if root.get(section, None) is not None:
+                sections[section] = root.get_config(section)
+        entry = {'key': key, 'root': root, 'sections': sections}
+        self._entries[path] = entry
+        return entry
+
+    def get(self, section=None, path=None):
+        """
+            Return the config tree for `section` (the whole file if None). Callers must not mutate it.
+        """
+        path = path or default_config_path()
+        key = self._file_key(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry['key'] != key:
+                entry = self._load(path, key)
+            if section is None:
+                return entry['root']
+            if section not in entry['sections']:
+                entry['sections'][section] = entry['root'].get_config(section)
+            return entry['sections'][section]
+
+    def reload(self, path=None):
+        path = path or default_config_path()
+        with self._lock:
+            self._entries.pop(path, None)
+            return self._load(path, self._file_key(path))['root']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+config_cache = ConfigCache()
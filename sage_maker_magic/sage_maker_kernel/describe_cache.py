@@ -0,0 +1,95 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+from .watch import TERMINAL_STATUSES
+
+## Order in which a job status may move; a cached status never moves back down this order.
+STATUS_RANK = {'InProgress': 0, 'Stopping': 1, 'Completed': 2, 'Failed': 2, 'Stopped': 2}
+IN_PROGRESS_TTL_SECONDS = 2.0
+MAX_ENTRIES = 4096
+
+
+class DescribeCache(object):
+    """
+        In-process cache of describe responses keyed by job kind and name.
+
+        Responses of running jobs are served for `ttl` seconds; once a job is Completed, Failed or
+        Stopped its response is pinned, since it will not change again. Concurrent lookups of the
+        same job share one describe call, and a response whose status ranks below the cached one
+        (for example a stale InProgress read after Stopping) never replaces it.
+    """
+    def __init__(self, ttl=IN_PROGRESS_TTL_SECONDS, max_entries=MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, job_name, describe, status_key):
+        key = (kind, job_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry['pinned'] or self.clock() < entry['expires_at']):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['response']
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+        if not owner:
+            return future.result()
+        try:
+            response = self._store(key, describe(job_name), status_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        future.set_result(response)
+        return response
+
+    def _store(self, key, response, status_key):
+        status = response.get(status_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and STATUS_RANK.get(entry['status'], 0) > STATUS_RANK.get(status, 0):
+                ## Keep the newer status but let the next lookup ask the service again.
+                entry['expires_at'] = self.clock()
+                return entry['response']
+            self._entries[key] = {
+                'response': response,
+                'status': status,
+                'pinned': status in TERMINAL_STATUSES,
+                'expires_at': self.clock() + self.ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return response
+
+    def invalidate(self, kind, job_name):
+        """
+            Expire the cached response of a running job, for example after stopping it. Pinned
+            responses of finished jobs are kept.
+        """
+        with self._lock:
+            entry = self._entries.get((kind, job_name))
+            if entry is not None and not entry['pinned']:
+                entry['expires_at'] = self.clock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+describe_cache = DescribeCache()
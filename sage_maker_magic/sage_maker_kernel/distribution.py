@@ -0,0 +1,102 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+SMDDP_INSTANCE_TYPES = ('ml.p3.16xlarge', 'ml.p3dn.24xlarge', 'ml.p4d.24xlarge', 'ml.p4de.24xlarge', 'ml.p5.48xlarge')
+
+GPUS_PER_INSTANCE = {
+    'ml.p2.xlarge': 1, 'ml.p2.8xlarge': 8, 'ml.p2.16xlarge': 16,
+    'ml.p3.2xlarge': 1, 'ml.p3.8xlarge': 4, 'ml.p3.16xlarge': 8, 'ml.p3dn.24xlarge': 8,
+    'ml.p4d.24xlarge': 8, 'ml.p4de.24xlarge': 8, 'ml.p5.48xlarge': 8,
+    'ml.g4dn.xlarge': 1, 'ml.g4dn.2xlarge': 1, 'ml.g4dn.4xlarge': 1, 'ml.g4dn.8xlarge': 1,
+    'ml.g4dn.12xlarge': 4, 'ml.g4dn.16xlarge': 1,
+    'ml.g5.xlarge': 1, 'ml.g5.2xlarge': 1, 'ml.g5.4xlarge': 1, 'ml.g5.8xlarge': 1,
+    'ml.g5.12xlarge': 4, 'ml.g5.16xlarge': 1, 'ml.g5.24xlarge': 4, 'ml.g5.48xlarge': 8,
+}
+
+## strategy: (minimum framework_version per runtime class, allowed instance types or None, uses MPI processes)
+STRATEGIES = {
+    'parameter_server': ({'TensorFlow': '1.11'}, None, False),
+    'horovod': ({'TensorFlow': '1.12', 'PyTorch': '1.0'}, None, True),
+    'smdistributed_dataparallel': ({'TensorFlow': '2.3.1', 'PyTorch': '1.6'}, SMDDP_INSTANCE_TYPES, False),
+    'smdistributed_modelparallel': ({'TensorFlow': '2.3', 'PyTorch': '1.6'}, None, True),
+    'multi_worker_mirrored': ({'TensorFlow': '2.9'}, None, False),
+    'pytorchddp': ({'PyTorch': '1.10'}, None, False),
+    'torch_distributed': ({'PyTorch': '1.11'}, None, False),
+}
+
+DISTRIBUTION_DEFAULTS = {
+    'mpi_processes_per_host': 4,
+    'mpi_custom_mpi_options': '--NCCL_DEBUG INFO',
+    'smp_partitions': 2,
+    'smp_microbatches': 4,
+}
+
+
+class DistributionError(ValueError):
+    """
+        A distribution strategy that cannot run with the framework, version or instance layout.
+    """
+
+
+def strategies_for(runtime_class_name):
+    return sorted(name for name, (versions, _, _) in STRATEGIES.items() if runtime_class_name in versions)
+
+
+def validate_distribution(strategy, runtime_class_name, framework_version, instance_type, instance_count, processes_per_host):
+    """
+        Raise DistributionError when `strategy` cannot run with this framework, version or instance
+        layout; return a list of warnings for layouts that run but do not scale.
+    """
+    from packaging.version import Version
+    versions, instance_types, uses_mpi = STRATEGIES[strategy]
+    if runtime_class_name not in versions:
+        raise DistributionError('{} distribution is not supported by {}, use one of {}'.format(
+            strategy, runtime_class_name, ', '.join(strategies_for(runtime_class_name)) or 'none'))
+    if framework_version and Version(str(framework_version)) < Version(versions[runtime_class_name]):
+        raise DistributionError('{} distribution needs {} framework_version >= {}, got {}'.format(
+            strategy, runtime_class_name, versions[runtime_class_name], framework_version))
+    if instance_types and instance_type not in instance_types:
+        raise DistributionError('{} distribution needs one of the instance types {}, got {}'.format(
+            strategy, ', '.join(instance_types), instance_type))
+    if uses_mpi:
+        if processes_per_host < 1:
+            raise DistributionError('mpi_processes_per_host must be at least 1, got {}'.format(processes_per_host))
+        gpus = GPUS_PER_INSTANCE.get(instance_type)
+        if gpus is not None and processes_per_host > gpus:
+            raise DistributionError('mpi_processes_per_host {} is more than the {} GPU(s) of {}'.format(
+                processes_per_host, gpus, instance_type))
+    warnings = []
+    if (instance_count or 1) < 2 and strategy in ('parameter_server', 'multi_worker_mirrored'):
+        warnings.append('{} distribution with instance_count 1 does not scale, set --instance_count > 1'.format(strategy))
+    return warnings
+
+
+def default_processes_per_host(instance_type, default):
+    """
+        The configured MPI processes per host, capped at the GPUs of `instance_type` when they are known.
+    """
+    gpus = GPUS_PER_INSTANCE.get(instance_type)
+    return min(default, gpus) if gpus else default
+
+
+def build_distribution(strategy, options):
+    """
+        Return the estimator `distribution` argument for `strategy` from the resolved options.
+    """
+    mpi = {
+        'enabled': True,
+        'processes_per_host': options['mpi_processes_per_host'],
+        'custom_mpi_options': options['mpi_custom_mpi_options'],
+    }
+    return {
+        'parameter_server': lambda: {'parameter_server': {'enabled': True}},
+        'horovod': lambda: {'mpi': mpi},
+        'smdistributed_dataparallel': lambda: {'smdistributed': {'dataparallel': {'enabled': True}}},
+        'smdistributed_modelparallel': lambda: {
+            'smdistributed': {'modelparallel': {'enabled': True, 'parameters': {
+                'partitions': options['smp_partitions'], 'microbatches': options['smp_microbatches']}}},
+            'mpi': mpi},
+        'multi_worker_mirrored': lambda: {'multi_worker_mirrored_strategy': {'enabled': True}},
+        'pytorchddp': lambda: {'pytorchddp': {'enabled': True}},
+        'torch_distributed': lambda: {'torch_distributed': {'enabled': True}},
+    }[strategy]()
@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT-0
 import sys
 import logging
+import time
 sys.path.append('/usr/local/share/extensions/')
 try:
     from asyncio import Future
@@ -11,6 +12,13 @@ except ImportError:
 
 from ipykernel.ipkernel import IPythonKernel
 
+MAGICS_EXTENSION = 'sage_maker_kernel.kernelmagics'
+ALIASES = (
+    ('list_training_jobs', 'aws sagemaker list-training-jobs'),
+    ('stop_training_job', 'aws sagemaker stop-training-job --training-job-name'),
+    ('describe_training_job', 'aws sagemaker describe-training-job --training-job-name'),
+)
+
 
 class UserCodeParser(object):
     def get_code_to_run(self, code):
@@ -27,6 +35,7 @@ class KernelBase(IPythonKernel):
         self.language_version = language_version
         self.language_info = language_info
         self._fatal_error = False
+        self._startup_error = None
 
         # Override
         self.session_language = session_language
@@ -41,11 +50,29 @@ class KernelBase(IPythonKernel):
         # Disable warnings for test env in HDI
         # requests.packages.urllib3.disable_warnings()
 
-        self._load_aliases_extension()
-        self._load_magics_extension()
-
+        self.startup_timings = {}
+        self._startup()
+
+    def _startup(self):
+        """
+            Define the aliases and register the magics directly on the shell, without going through cell
+            execution. The magics import the SageMaker SDK, boto3 and pyhocon on first use, so nothing
+            here talks to AWS. Each phase is timed into `startup_timings`.
+        """
+        start = time.perf_counter()
+        for phase, step in (('aliases', self._load_aliases_extension), ('magics', self._load_magics_extension)):
+            phase_start = time.perf_counter()
+            step()
+            self.startup_timings[phase] = time.perf_counter() - phase_start
+        self.startup_timings['total'] = time.perf_counter() - start
+        self.log.info('SageMaker kernel startup: %s', ', '.join(
+            '{} {:.3f}s'.format(phase, seconds) for phase, seconds in self.startup_timings.items()))
 
     def do_execute(self, code, silent, store_history=True, user_expressions=None, allow_stdin=False):
+        if self._startup_error:
+            ## Shown with the first cell only; the kernel keeps running plain Python without the magics.
+            self._show_user_error(self._startup_error)
+            self._startup_error = None
         return self._do_execute(code, silent, store_history, user_expressions, allow_stdin)
 
     def _do_execute(self, code, silent, store_history, user_expressions, allow_stdin):
@@ -98,20 +125,19 @@ class KernelBase(IPythonKernel):
         return self._complete_cell()
 
     def _load_aliases_extension(self):
-        list_training_jobs = "alias list_training_jobs aws sagemaker list-training-jobs"
-        self._execute_cell(list_training_jobs, True, False, shutdown_if_error=False,
-                           log_if_error="Failed to alias list_training_jobs.")
-        stop_training_job = "alias stop_training_job aws sagemaker stop-training-job --training-job-name"
-        self._execute_cell(stop_training_job, True, False, shutdown_if_error=False,
-                           log_if_error="Failed to alias stop_training_job.")
-        describe_training_job = "alias describe_training_job aws sagemaker describe-training-job --training-job-name"
-        self._execute_cell(describe_training_job, True, False, shutdown_if_error=False,
-                           log_if_error="Failed to alias describe_training_job.")
+        for name, cmd in ALIASES:
+            try:
+                self.shell.alias_manager.define_alias(name, cmd)
+            except Exception as e:
+                self.log.warning('Failed to alias %s: %s', name, e)
 
     def _load_magics_extension(self):
-        register_magics_code = "%load_ext sage_maker_kernel.kernelmagics"
-        self._execute_cell(register_magics_code, True, False, shutdown_if_error=False,
-                           log_if_error="Failed to load the SageMaker magics.")
+        try:
+            self.shell.extension_manager.load_extension(MAGICS_EXTENSION)
+        except Exception as e:
+            self._startup_error = 'Failed to load the SageMaker magics.\nException details:\n\t"{}"'.format(e)
+            self.log.error(self._startup_error)
+            return
 
         print('Loaded magics.')
 
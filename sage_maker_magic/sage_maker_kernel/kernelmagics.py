@@ -5,29 +5,73 @@ from IPython.core.magic import Magics, magics_class
 from IPython.core.magic import needs_local_scope, cell_magic, line_magic
 from IPython.core.magic_arguments import argument, magic_arguments, parse_argstring, defaults, argument_group
 
-import uuid
+import datetime
+import importlib
+import itertools
+import time
 import re
 import json
 import os
 
-from pyhocon import ConfigFactory, ConfigTree
+from .artifacts import artifact_cache
+from .aws import aws
+from .channels import channel_stager
+from .config import config_cache
+from .describe_cache import describe_cache
+from .distribution import (DISTRIBUTION_DEFAULTS, DistributionError, build_distribution, default_processes_per_host,
+                           strategies_for, validate_distribution)
+from .listing import JobIndex, compact, iter_jobs, jobs_table
+from .local import LOCAL_DIR, local_runner, sample_channel
+from .logs import TRAINING_LOG_GROUP, PROCESSING_LOG_GROUP, follow_logs, filter_logs
+from .metrics import (AXES, CONVERGENCE_TOLERANCE, align, metric_names, metrics_frame, metrics_store, search_training_jobs,
+                      summarize)
+from .packaging import SOURCE_DIR_PREFIX, source_packager
+from .profiling import profiler
+from .registry import job_registry
+from .spark_profile import SparkEventLogAnalyzer, iter_event_log_lines
+from .staging import code_staging, digest
+from .system_profile import (DEFAULT_RESOLUTION, PROFILER_INTERVALS_MS, SYSTEM_PREFIX, SystemMetricsAnalyzer,
+                             iter_system_metric_lines)
+from .watch import JobWatcher
 
-## Sage Maker
-from sagemaker import get_execution_role, Session
-import boto3
+## The SageMaker SDK, boto3 and pyhocon are imported on first use, not at
+## %load_ext time, so that kernel start and `--help` do not pay for them.
 
-## Sage Maker Estimator
-from sagemaker.pytorch import PyTorch
-from sagemaker.tensorflow import TensorFlow
-from sagemaker.sklearn.estimator import SKLearn
+SPARK_EVENTS_LOCAL_PATH = '/opt/ml/processing/spark-events'
+## Resolved estimator args that, with the code and channel data, determine a training result.
+FINGERPRINT_ARGS = ('hyperparameters', 'framework_version', 'py_version', 'image_uri', 'instance_type', 'instance_count',
+                    'distribution', 'channel_training', 'channel_testing')
+REUSE_MAX_AGE_DAYS = 7
+## Parsed options that steer the magic itself; they are not passed to the estimator or recorded with the job.
+MAGIC_OPTIONS = ('reuse', 'max_parallel', 'job_name', 'job_names', 'metric_names', 'metrics_axis', 'metric_goal',
+                 'convergence_tolerance', 'profiler_data', 'profile_resolution', 'local_sample', 'local_timeout', 'cancel',
+                 'tail', 'grep', 'from_start', 'name_contains', 'max_result', 'status_equals', 'created_after',
+                 'created_before', 'no_index', 'event_log', 'straggler_factor', 'skew_factor')
 
-## Sage Maker processing
-from sagemaker.spark.processing import PySparkProcessor
+
+def import_object(path):
+    """
+        Import and return the object named by a dotted ``package.module.Name`` path.
+    """
+    module_name, name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), name)
 
 
 def hyperparameters(string):
     return dict(re.findall(r"([a-zA-Z_][\w\-]*)\s*:\s*([\w\.\-]+)", string))
 
+def date_time(string):
+    """
+        Parse an ISO date/time as aware UTC; a value without an offset is taken as UTC, as the List* APIs do.
+    """
+    value = datetime.datetime.fromisoformat(string)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+def hyperparameter_grid(string):
+    return dict((k, v.split('|')) for k, v in re.findall(r"([a-zA-Z_][\w\-]*)\s*:\s*([\w\.\-\|]+)", string))
+
 def metric_definitions(string):
     return dict({
         "Name":re.findall(r"^\'[Name]+\s*:\s*([^\,]+)", string)[0],
@@ -44,33 +88,50 @@ class CommonMagics(Magics):
     def __init__(self, shell, data=None):
         super(CommonMagics, self).__init__(shell)
         self.args = {}
+        self.options = {}
         self.cell = None
-        self.RuntimeClass = None
+        self.runtime_class_path = None
+        self._runtime_class = None
+        self.config_section = None
+        self.status_keys = None
+        self.log_group = None
+        self.log_offsets = {}
+        self.job_kind = None
+        self.job_indexes = {}
+        self.watchers = {}
         self.method_matcher = {
             'submit': self._submit,
             'status': self._status,
             'delete': self._delete,
             'list': self._list,
             'logs': self._logs,
+            'watch': self._watch,
             'show_defaults': self._show_defaults
         }
 
+    @property
+    def RuntimeClass(self):
+        if self._runtime_class is None and self.runtime_class_path is not None:
+            self._runtime_class = import_object(self.runtime_class_path)
+        return self._runtime_class
+
+    @property
+    def runtime_class_name(self):
+        return self.runtime_class_path.rsplit('.', 1)[-1]
+
     def _get_config(self):
-        default_config_path = os.environ.get('DEFAULT_SM_CONFIG_PATH')
-        return ConfigFactory.parse_file(default_config_path)
+        return config_cache.get(self.config_section)
 
     @staticmethod
     def upload_content(content, path=None):
         if path is None:
-            local_file = '/tmp/tmp-%s.py' % str(uuid.uuid4())
-        else:
-            local_file = path
-        with open(local_file, 'w') as f:
+            return code_staging.stage(content)
+        with open(path, 'w') as f:
             f.write(content)
-        return local_file
+        return path
 
     def _get_latest_job_name(self):
-        return self.shell.user_ns.get('___{}_latest_job_name'.format(self.RuntimeClass.__name__), None)
+        return self.shell.user_ns.get('___{}_latest_job_name'.format(self.runtime_class_name), None)
 
     def _process_latest(self, func):
         if self._get_latest_job_name():
@@ -78,6 +139,111 @@ class CommonMagics(Magics):
         else:
             return "please submit at least one job"
 
+    def _describe_job(self, job_name):
+        return getattr(aws.session(), self.job_apis[0])(job_name)
+
+    def _stop_job(self, job_name):
+        return getattr(aws.session(), self.job_apis[1])(job_name)
+
+    def _describe(self, job_name):
+        with profiler.phase('describe'):
+            response = describe_cache.get(self.job_kind, job_name, self._describe_job, self.status_keys[0])
+        with profiler.phase('registry'):
+            job_registry.update_status(job_name, response.get(self.status_keys[0]))
+        return response
+
+    def _stop(self, job_name):
+        self._stop_job(job_name)
+        describe_cache.invalidate(self.job_kind, job_name)
+        return self._describe(job_name)
+
+    def _register_job(self, job_name, args, entry_point=None):
+        content_hash = None
+        if entry_point and os.path.isfile(entry_point):
+            with open(entry_point, 'rb') as f:
+                content_hash = digest(f.read())
+        job_registry.record(job_name, self.job_kind, self.runtime_class_name, args, content_hash)
+
+    def _watch(self):
+        """
+            Start (or with --cancel stop) a background watcher for --job_name or the latest job.
+        """
+        job_name = self.args.get('job_name') or self._get_latest_job_name()
+        if self.args.get('cancel'):
+            names = [job_name] if self.args.get('job_name') else list(self.watchers)
+            for name in names:
+                if name in self.watchers:
+                    self.watchers.pop(name).cancel()
+            return {'cancelled': names}
+        if not job_name:
+            return "please submit at least one job"
+        if job_name in self.watchers and not self.watchers[job_name].done:
+            return {'watching': job_name, 'status': self.watchers[job_name].status}
+        self.watchers[job_name] = JobWatcher(job_name, self._describe, self.status_keys).start()
+        return {'watching': job_name, 'watchers': sorted(self.watchers)}
+
+    def _logs(self):
+        """
+            Print CloudWatch lines of --job_name or the latest job written since the previous call.
+        """
+        job_name = self.args.get('job_name') or self._get_latest_job_name()
+        if not job_name:
+            return "please submit at least one job"
+        offsets = self.log_offsets.setdefault(job_name, {})
+        if self.args.get('from_start'):
+            offsets.clear()
+        lines = 0
+        with profiler.phase('logs.read'):
+            events = follow_logs(aws.client('logs'), self.log_group, job_name, offsets)
+            for stream, message in filter_logs(events, self.args.get('grep'), self.args.get('tail')):
+                print('[{}] {}'.format(stream.split('/', 1)[-1], message))
+                lines += 1
+        return {'job_name': job_name, 'lines': lines, 'streams': sorted(offsets)}
+
+    def _list(self):
+        """
+            List jobs as a table from the local index, synced incrementally, or with --no_index
+            straight from the API, newest first, reading only as many pages as needed.
+        """
+        client = aws.client('sagemaker')
+        name_contains = self.args.get('name_contains')
+        created_after, created_before = self.args.get('created_after'), self.args.get('created_before')
+        if self.args.get('no_index'):
+            summaries = iter_jobs(client, self.job_kind, NameContains=name_contains, StatusEquals=self.args.get('status_equals'),
+                                  CreationTimeAfter=created_after, CreationTimeBefore=created_before,
+                                  SortBy='CreationTime', SortOrder='Descending')
+            with profiler.phase('list.pages'):
+                jobs = [compact(self.job_kind, summary) for summary in itertools.islice(summaries, self.args.get('max_result'))]
+            return jobs_table(jobs)
+
+        key = (self.job_kind, name_contains, self.args.get('status_equals'), created_after, created_before)
+        if key not in self.job_indexes:
+            self.job_indexes[key] = JobIndex(*key)
+        index = self.job_indexes[key]
+        with profiler.phase('list.sync'):
+            synced = index.sync(client)
+        print('synced {} new or updated jobs, {} indexed'.format(synced, len(index.jobs)))
+        with profiler.phase('list.query'):
+            jobs = index.query(status=self.args.get('status_equals'),
+                               created_after=created_after.timestamp() if created_after else None,
+                               created_before=created_before.timestamp() if created_before else None,
+                               limit=self.args.get('max_result'))
+        return jobs_table(jobs)
+
+    def _dispatch(self):
+        """
+            Run the method named in the parsed args; with --profile print where its time went.
+        """
+        method = self.args.pop('method')
+        with profiler.profile(self.runtime_class_name, method, self.args.pop('profile', None)) as trace:
+            try:
+                result = self.method_matcher[method]()
+            except DistributionError as e:
+                result = 'invalid --distribution: {}'.format(e)
+        self._print_result(result)
+        if trace is not None:
+            print(trace.summary())
+
     def _clean_args(self):
         filtered = {k: v for k, v in self.args.items() if v is not None}
         self.args.clear()
@@ -86,55 +252,473 @@ class CommonMagics(Magics):
     def _show_defaults(self):
         print('defaults:\n', json.dumps(self._get_config(), sort_keys=True, indent=4, default=str))
 
+    @staticmethod
+    def _print_result(result):
+        if hasattr(result, 'to_string'):
+            print(result.to_string())
+        else:
+            print(json.dumps(result, sort_keys=True, indent=4, default=str))
+
 
 class CommonEstimatorMagics(CommonMagics):
     """
         Common Estimator magic class.
     """
+    job_apis = ('describe_training_job', 'stop_training_job')
+
     def __init__(self, shell, data=None):
         super(CommonEstimatorMagics, self).__init__(shell)
+        self.status_keys = ('TrainingJobStatus', 'SecondaryStatus')
+        self.log_group = TRAINING_LOG_GROUP
+        self.job_kind = 'training'
+        self.method_matcher['sweep'] = self._sweep
+        self.method_matcher['fetch'] = self._fetch
+        self.method_matcher['local'] = self._local
+        self.method_matcher['metrics'] = self._metrics
+        self.method_matcher['profile'] = self._profile
 
+    def _full_fill_args(self):
+        self.options = {key: self.args.pop(key) for key in MAGIC_OPTIONS if key in self.args}
+        with profiler.phase('upload_content'):
+            self.args['entry_point'] = self.args.get('entry_point') or self.upload_content(self.cell)
+        with profiler.phase('role'):
+            self.args['role'] = self.args.get('role') or aws.role()
+        self.args['estimator_name'] = self.args.get('estimator_name', '___{}_estimator'.format(self.runtime_class_name))
+        with profiler.phase('config'):
+            from pyhocon import ConfigFactory
+            self.args = ConfigFactory.from_dict(self.args).with_fallback(self._get_config())
+            distribution = self._distribution()
+            if distribution is not None:
+                self.args['distribution'] = distribution
+            profiler_config = self._profiler_config()
+            if profiler_config is not None:
+                self.args['profiler_config'] = profiler_config
+        with profiler.phase('channels'):
+            self._stage_channels()
 
-    def _get_config(self):
-        conf = super(CommonEstimatorMagics, self)._get_config()
-        return conf.get_config('estimator')
+    def _stage_channels(self):
+        """
+            Replace local --channel_training / --channel_testing paths with the S3 prefix their content is staged under.
+        """
+        for channel in ('channel_training', 'channel_testing'):
+            path = self.args.get(channel, None)
+            if not path or path.startswith('s3://') or not os.path.exists(path):
+                continue
+            staged = channel_stager.stage(path, aws.client('s3'), aws.session().default_bucket(), name=channel)
+            if staged.uploaded or staged.copied:
+                print('{}: {} -> {}, {} file(s) uploaded, {} copied, {:.1f} MiB in {:.1f}s ({:.1f} MiB/s)'.format(
+                    channel, path, staged.s3_uri, staged.uploaded, staged.copied, staged.bytes / 2 ** 20, staged.seconds,
+                    staged.bytes / 2 ** 20 / staged.seconds if staged.seconds else 0.0))
+            else:
+                print('{}: {} unchanged, reusing {}'.format(channel, path, staged.s3_uri))
+            self.args[channel] = staged.s3_uri
 
-    def _full_fill_args(self):
-        self.args['entry_point'] = self.args.get('entry_point', self.upload_content(self.cell))
-        self.args['role'] = self.args.get('role', get_execution_role())
-        self.args['estimator_name'] = self.args.get('estimator_name', '___{}_estimator'.format(self.RuntimeClass.__name__))
-        self.args = ConfigFactory.from_dict(self.args).with_fallback(self._get_config())
+    def _distribution(self):
+        """
+            Resolve --distribution into the estimator `distribution` argument, validated against the
+            framework version and instance layout. Strategy options default to `estimator.distribution`.
+        """
+        options = dict(DISTRIBUTION_DEFAULTS, **config_cache.get().get('estimator.distribution', {}))
+        for key in DISTRIBUTION_DEFAULTS:
+            value = self.args.pop(key, None)
+            if value is not None:
+                options[key] = value
+            elif key == 'mpi_processes_per_host':
+                ## Only an explicit --mpi_processes_per_host is rejected when it exceeds the GPUs; the default fits them.
+                options[key] = default_processes_per_host(self.args.get('instance_type', None), options[key])
+        strategy = self.args.get('distribution', None)
+        if strategy is None or isinstance(strategy, dict):
+            return strategy
+        for warning in validate_distribution(strategy, self.runtime_class_name, self.args.get('framework_version', None),
+                                             self.args.get('instance_type', None), self.args.get('instance_count', 1),
+                                             options['mpi_processes_per_host']):
+            print('warning:', warning)
+        return build_distribution(strategy, options)
+
+    def _profiler_config(self):
+        """
+            Build the estimator `profiler_config` from --profiler_interval_ms and --framework_profile_*, or None.
+        """
+        interval_ms = self.args.pop('profiler_interval_ms', None)
+        start_step = self.args.pop('framework_profile_start_step', None)
+        num_steps = self.args.pop('framework_profile_num_steps', None)
+        if interval_ms is None and start_step is None and num_steps is None:
+            return None
+        from sagemaker.debugger import FrameworkProfile, ProfilerConfig
+        framework_profile = None
+        if start_step is not None or num_steps is not None:
+            framework_profile = FrameworkProfile(start_step=start_step, num_steps=num_steps)
+        return ProfilerConfig(system_monitor_interval_millis=interval_ms, framework_profile_params=framework_profile)
+
+    def _package_args(self, source_dir):
+        """
+            Return the extra files to add to the source_dir archive and the entry point name inside it.
+        """
+        entry_point = self.args['entry_point']
+        if not os.path.isabs(entry_point):
+            return [], entry_point
+        rel = os.path.relpath(entry_point, os.path.abspath(source_dir))
+        if rel.startswith(os.pardir):
+            return [entry_point], os.path.basename(entry_point)
+        return [], rel
+
+    def _start_packaging(self):
+        """
+            Start packaging a local --source_dir on a worker thread, before the config and role are resolved.
+        """
+        source_dir = self.args.get('source_dir')
+        if not source_dir or source_dir.lower().startswith('s3://'):
+            return None
+        self.args['entry_point'] = self.args.get('entry_point') or self.upload_content(self.cell)
+        extra_files, _ = self._package_args(source_dir)
+        return source_packager.submit(source_dir, extra_files)
+
+    def _staged_code(self, package_future=None):
+        """
+            Return the code key of the resolved entry point and source_dir, and the estimator
+            arguments pointing at an earlier S3 upload of the same code (empty if there is none).
+            A local source_dir is packaged incrementally and uploaded under its content digest.
+        """
+        session = aws.session()
+        source_dir = self.args.get('source_dir', None)
+        if source_dir and source_dir.lower().startswith('s3://'):
+            return None, {}
+        if not source_dir:
+            code_key = code_staging.code_key(self.args['entry_point'], session.boto_region_name)
+            uploaded = code_staging.lookup(code_key)
+            if uploaded is None:
+                return code_key, {}
+            return code_key, {'source_dir': uploaded['s3_prefix'], 'entry_point': uploaded['script_name']}
+
+        extra_files, script_name = self._package_args(source_dir)
+        package = (package_future or source_packager.submit(source_dir, extra_files)).result()
+        code_key = code_staging.code_key(script_name, session.boto_region_name, package.digest)
+        uploaded = code_staging.lookup(code_key)
+        bucket, prefix, kms_key = self._code_location(session)
+        if uploaded is None or not uploaded['s3_prefix'].startswith('s3://{}/'.format('/'.join(filter(None, (bucket, prefix))))):
+            uploaded_code = source_packager.upload(package, aws.client('s3'), bucket, script_name, kms_key, prefix)
+            code_staging.remember(code_key, uploaded_code)
+            uploaded = {'s3_prefix': uploaded_code.s3_prefix}
+        return code_key, {'source_dir': uploaded['s3_prefix'], 'entry_point': script_name}
+
+    def _code_location(self, session):
+        """
+            Bucket, key prefix and KMS key for a local source_dir upload, resolved like the SDK:
+            `code_location`, then the bucket of an S3 `output_path`, then the session's default bucket.
+            `output_kms_key` encrypts the upload only when `code_location` is unset.
+        """
+        code_location = self.args.get('code_location', None)
+        if code_location:
+            bucket, _, prefix = code_location[len('s3://'):].partition('/')
+            return bucket, prefix.strip('/'), None
+        output_path = self.args.get('output_path', None)
+        if output_path and output_path.lower().startswith('s3://'):
+            bucket = output_path[len('s3://'):].partition('/')[0]
+        else:
+            bucket = session.default_bucket()
+        return bucket, SOURCE_DIR_PREFIX, self.args.get('output_kms_key', None)
+
+    def _remote_code_version(self, source_dir, quiet=False):
+        """
+            VersionId (or ETag) of the tarball an S3 --source_dir points at, or None if it cannot be read.
+        """
+        from botocore.exceptions import BotoCoreError, ClientError
+        bucket, _, key = source_dir[len('s3://'):].partition('/')
+        try:
+            head = aws.client('s3').head_object(Bucket=bucket, Key=key)
+        except (BotoCoreError, ClientError) as e:
+            if not quiet:
+                print('warning: cannot read {}: {}'.format(source_dir, e))
+            return None
+        return head.get('VersionId') or head.get('ETag')
+
+    def _fingerprint(self, code_key, quiet=False):
+        """
+            Digest of the code, resolved args and channels, or None when the version of an S3 --source_dir is unknown.
+        """
+        code = code_key
+        if code is None:
+            version = self._remote_code_version(self.args['source_dir'], quiet)
+            if version is None:
+                return None
+            code = digest('\0'.join([self.args['source_dir'], self.args['entry_point'], version]))
+        resolved = {key: self.args.get(key, None) for key in FINGERPRINT_ARGS}
+        return digest(json.dumps([self.runtime_class_name, code, resolved], sort_keys=True, default=str))
+
+    def _completed_job(self, fingerprint):
+        """
+            Newest Completed job submitted with `fingerprint` within `estimator.reuse.max_age_days`, or None.
+        """
+        max_age_days = config_cache.get().get('estimator.reuse.max_age_days', REUSE_MAX_AGE_DAYS)
+        for job_name in job_registry.jobs_with_fingerprint(fingerprint, since=time.time() - max_age_days * 86400):
+            if self._describe(job_name).get(self.status_keys[0]) == 'Completed':
+                return job_name
+        return None
+
+    def _bind_estimator(self, est):
+        self.shell.user_ns['___{}_latest_job_name'.format(self.runtime_class_name)] = est.latest_training_job.name
+        self.shell.user_ns[self.args['estimator_name']] = est
+        return {
+            '___{}_latest_job_name'.format(self.runtime_class_name): self._get_latest_job_name(),
+            'estimator_variable': self.args['estimator_name']
+        }
 
     def _submit(self):
         self._clean_args()
+        package_future = self._start_packaging()
         self._full_fill_args()
         print('submit:\n', json.dumps(self.args, sort_keys=True, indent=4, default=str))
-        est = self.RuntimeClass(**self.args)
+        with profiler.phase('staged_code'):
+            code_key, code_args = self._staged_code(package_future)
+        reuse = self.options.get('reuse')
+        fingerprint = None
+        if reuse:
+            with profiler.phase('fingerprint'):
+                fingerprint = self._fingerprint(code_key)
+        if reuse and fingerprint is None:
+            print('--reuse ignored: the version of {} is unknown, submitting a new job'.format(self.args['source_dir']))
+        elif reuse:
+            with profiler.phase('reuse'):
+                job_name = self._completed_job(fingerprint)
+            if job_name is not None:
+                print('reusing completed job {} with the same code, args and data'.format(job_name))
+                return dict(self._bind_estimator(self.RuntimeClass.attach(job_name, sagemaker_session=aws.session())),
+                            reused_job=job_name)
+        with profiler.phase('estimator'):
+            est = self.RuntimeClass(sagemaker_session=aws.session(), **dict(self.args, **code_args))
         channels = {
-            "training": self.args.get('channel_training'),
-            "testing": self.args.get('channel_testing')
+            "training": self.args.get('channel_training', None),
+            "testing": self.args.get('channel_testing', None)
         }
-        est.fit(inputs=channels, wait=False)
-        self.shell.user_ns['___{}_latest_job_name'.format(self.RuntimeClass.__name__)] = est.latest_training_job.name
-        self.shell.user_ns[self.args['estimator_name']] = est
+        with profiler.phase('fit'):
+            est.fit(inputs=channels, wait=False)
+        with profiler.phase('registry'):
+            if not code_args:
+                code_staging.remember(code_key, getattr(est, 'uploaded_code', None))
+            self._register_job(est.latest_training_job.name, self.args, self.args['entry_point'])
+            ## Recorded for a later --reuse; without --reuse now, an unreadable source_dir is not worth a warning.
+            if not reuse:
+                fingerprint = self._fingerprint(code_key, quiet=True)
+            if fingerprint is not None:
+                job_registry.record_fingerprint(fingerprint, est.latest_training_job.name)
+        return self._bind_estimator(est)
+
+    def _sweep_sets(self):
+        base = self.args.pop('hyperparameters', None) or {}
+        grid = self.args.pop('hyperparameter_grid', None) or {}
+        sets = self.args.pop('hyperparameter_sets', None) or []
+        keys = sorted(grid)
+        sets = sets + [dict(zip(keys, values)) for values in itertools.product(*[grid[k] for k in keys])] if keys else sets
+        return [dict(base, **hps) for hps in sets]
+
+    def _sweep(self):
+        """
+            Submit one training job per hyperparameter set, concurrently, from one resolved config.
+        """
+        import pandas as pd
+        from concurrent.futures import ThreadPoolExecutor
+        from sagemaker.utils import name_from_base
+
+        self._clean_args()
+        sweep_sets = self._sweep_sets()
+        if not sweep_sets:
+            return "please provide --hyperparameter_grid or --hyperparameter_sets"
+        package_future = self._start_packaging()
+        self._full_fill_args()
+        print('sweep:\n', json.dumps(self.args, sort_keys=True, indent=4, default=str))
+        max_parallel = self.options.get('max_parallel', 8)
+
+        base_args = dict(self.args)
+        estimator_name = base_args.pop('estimator_name')
+        channels = {
+            "training": base_args.get('channel_training'),
+            "testing": base_args.get('channel_testing')
+        }
+        sweep_name = name_from_base('{}-sweep'.format(self.runtime_class_name.lower()), max_length=58)
+
+        def launch(index, hps, code_args):
+            job_name = '{}-{:04d}'.format(sweep_name, index)
+            est = self.RuntimeClass(sagemaker_session=aws.session(), **dict(base_args, hyperparameters=hps, **code_args))
+            try:
+                est.fit(inputs=channels, wait=False, job_name=job_name)
+                self._register_job(job_name, dict(base_args, hyperparameters=hps), base_args['entry_point'])
+                return job_name, est, 'Submitted'
+            except Exception as e:
+                return job_name, est, 'Failed: {}'.format(e)
+
+        start = time.time()
+        code_key, code_args = self._staged_code(package_future)
+        results = []
+        if not code_args:
+            ## The first job uploads the entry point; the rest reuse its S3 source tarball.
+            results.append(launch(0, sweep_sets[0], {}))
+            uploaded_code = getattr(results[0][1], 'uploaded_code', None)
+            code_staging.remember(code_key, uploaded_code)
+            code_args = {'source_dir': uploaded_code.s3_prefix, 'entry_point': uploaded_code.script_name} if uploaded_code else {}
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            results += list(executor.map(profiler.propagate(lambda item: launch(item[0], item[1], code_args)),
+                                         enumerate(sweep_sets[len(results):], start=len(results))))
+        elapsed = time.time() - start
+
+        submitted = [(job_name, est) for job_name, est, status in results if status == 'Submitted']
+        if submitted:
+            self.shell.user_ns['___{}_latest_job_name'.format(self.runtime_class_name)] = submitted[-1][0]
+        self.shell.user_ns['___{}_sweep_job_names'.format(self.runtime_class_name)] = [job_name for job_name, _ in submitted]
+        self.shell.user_ns['{}_sweep'.format(estimator_name)] = dict(submitted)
+        print('submitted {} of {} jobs in {:.1f}s ({:.2f} jobs/s), estimators in `{}_sweep`'.format(
+            len(submitted), len(results), elapsed, len(submitted) / elapsed if elapsed else 0.0, estimator_name))
+
+        return pd.DataFrame([{'job_name': job_name, 'hyperparameters': hps, 'status': status}
+                             for (job_name, _, status), hps in zip(results, sweep_sets)])
 
+    def _local(self):
+        """
+            Run the entry point on the notebook host, once per hyperparameter set, with the SageMaker
+            environment contract (SM_CHANNEL_*, SM_MODEL_DIR, SM_HPS, hyperparameters as arguments).
+        """
+        import pandas as pd
+        from pyhocon import ConfigFactory
+
+        self._clean_args()
+        sample = self.args.pop('local_sample', None)
+        timeout = self.args.pop('local_timeout', None)
+        max_parallel = self.args.pop('max_parallel', None)
+        self.args['entry_point'] = self.args.get('entry_point') or self.upload_content(self.cell)
+        self.args = ConfigFactory.from_dict(self.args).with_fallback(self._get_config())
+        source_dir = self.args.get('source_dir', None)
+        if source_dir and source_dir.startswith('s3://'):
+            return "local runs need a local --source_dir"
+        base_hyperparameters = dict(self.args.get('hyperparameters', None) or {})
+        hyperparameter_sets = self._sweep_sets() or [base_hyperparameters]
+
+        input_dir = os.path.join(LOCAL_DIR, 'input')
+        channels = {}
+        for channel in ('training', 'testing'):
+            source = self.args.get('channel_{}'.format(channel), None)
+            if source:
+                target = os.path.join(input_dir, 'data', '{}-{}'.format(channel, digest('{}\0{}'.format(source, sample))[:12]))
+                channels[channel] = sample_channel(source, target, sample, aws.client('s3') if source.startswith('s3://') else None)
+        print('local:\n', json.dumps({'entry_point': self.args['entry_point'], 'source_dir': source_dir, 'channels': channels,
+                                      'runs': len(hyperparameter_sets)}, sort_keys=True, indent=4, default=str))
+
+        runs = local_runner.run(self.args['entry_point'], hyperparameter_sets, channels, source_dir,
+                                max_parallel=max_parallel, timeout=timeout, input_dir=input_dir)
+        self.shell.user_ns['___{}_local_runs'.format(self.runtime_class_name)] = runs
+        return pd.DataFrame([run._asdict() for run in runs], columns=['run', 'hyperparameters', 'returncode', 'seconds', 'model_dir'])
+
+    def _fetch(self):
+        """
+            Download and extract the model artifacts of --job_name or the latest job into the local artifact cache.
+        """
+        job_name = self.args.get('job_name') or self._get_latest_job_name()
+        if not job_name:
+            return "please submit at least one job"
+        response = self._describe(job_name)
+        model_artifacts = response.get('ModelArtifacts', {}).get('S3ModelArtifacts')
+        if not model_artifacts:
+            return 'job {} has no model artifacts, status {}'.format(job_name, response.get(self.status_keys[0]))
+        start = time.time()
+        artifact = artifact_cache.fetch(model_artifacts, aws.client('s3'))
+        elapsed = time.time() - start
+        if not artifact.cached:
+            print('fetched {:.1f} MiB in {:.1f}s ({:.1f} MiB/s)'.format(
+                artifact.bytes / 2 ** 20, elapsed, artifact.bytes / 2 ** 20 / elapsed if elapsed else 0.0))
+        self.shell.user_ns['___{}_model_dir'.format(self.runtime_class_name)] = artifact.path
         return {
-            '___{}_latest_job_name'.format(self.RuntimeClass.__name__): self._get_latest_job_name(),
-            'estimator_variable': self.args['estimator_name']
+            'job_name': job_name,
+            'model_artifacts': model_artifacts,
+            'model_dir': artifact.path,
+            'cached': artifact.cached,
+            'bytes': artifact.bytes,
         }
 
-    def _status(self):
-        return self._process_latest(Session().describe_training_job)
+    def _metrics_job_names(self):
+        if self.args.get('job_names'):
+            return self.args['job_names']
+        if self.args.get('job_name'):
+            return [self.args['job_name']]
+        latest = self._get_latest_job_name()
+        sweep = self.shell.user_ns.get('___{}_sweep_job_names'.format(self.runtime_class_name)) or []
+        return list(sweep) if latest in sweep else [latest] if latest else []
 
-    def _logs(self):
-        return self._process_latest(Session().logs_for_job)
+    def _metrics(self):
+        """
+            Fetch the metric series of --job_names, --job_name, the latest sweep or the latest job in
+            batched requests, align them on a common step (or --metrics_axis time) axis into
+            `___<Runtime>_metrics` and return the best, final and convergence step of each series.
+        """
+        from concurrent.futures import ThreadPoolExecutor
 
-    def _delete(self):
-        self._process_latest(Session().stop_training_job)
-        return self._process_latest(Session().describe_training_job)
+        job_names = self._metrics_job_names()
+        if not job_names:
+            return "please submit at least one job"
+        axis = self.args.get('metrics_axis') or 'step'
+        with profiler.phase('metrics.search'):
+            responses = search_training_jobs(aws.client('sagemaker'), job_names)
+        missing = [job_name for job_name in job_names if job_name not in responses]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+                responses.update(zip(missing, executor.map(profiler.propagate(self._describe), missing)))
+        jobs = [(job_name, responses[job_name], self.args.get('metric_names') or metric_names(responses[job_name]))
+                for job_name in job_names]
+        with profiler.phase('metrics.fetch'):
+            series, stats = metrics_store.fetch(aws.client('sagemaker-metrics'), jobs, axis)
+        print('{} series of {} jobs: {} cached, {} fetched in {} request(s)'.format(
+            len(series), len(jobs), stats['cached_jobs'], stats['fetched_jobs'], stats['requests']))
+        for job_name, metric, message in stats['errors']:
+            print('warning: {} {}: {}'.format(job_name, metric, message))
+        if stats['truncated']:
+            print('warning: truncated series: {}'.format(', '.join('{} {}'.format(*item) for item in stats['truncated'])))
+        with profiler.phase('metrics.align'):
+            aligned = align(series)
+            self.shell.user_ns['___{}_metrics'.format(self.runtime_class_name)] = metrics_frame(aligned, axis)
+            return summarize(aligned, self.args.get('metric_goal'), self.args.get('convergence_tolerance') or CONVERGENCE_TOLERANCE)
 
-    def _list(self):
-        return boto3.client('sagemaker').list_training_jobs(NameContains=self.args.get('name_contains'),MaxResults=self.args.get('max_result'))
+    def _profiler_output(self, job_name):
+        """
+            S3 prefix of the Debugger system metrics of `job_name` and their interval in ms, or (None, None).
+        """
+        response = self._describe(job_name)
+        config = response.get('ProfilerConfig') or {}
+        if not config.get('S3OutputPath') or config.get('DisableProfiler') or response.get('ProfilingStatus') == 'Disabled':
+            return None, None
+        return ('{}/{}/{}/'.format(config['S3OutputPath'].rstrip('/'), job_name, SYSTEM_PREFIX),
+                config.get('ProfilingIntervalInMilliseconds'))
+
+    def _profile(self):
+        """
+            Stream the Debugger system metrics of --profiler_data or of a job and report per-host CPU,
+            I/O wait, memory and GPU utilization percentiles, bottleneck flags and recommendations.
+        """
+        path, interval_ms = self.args.get('profiler_data'), None
+        if not path:
+            job_name = self.args.get('job_name') or self._get_latest_job_name()
+            if not job_name:
+                return "please submit at least one job or provide --profiler_data"
+            path, interval_ms = self._profiler_output(job_name)
+            if not path:
+                return "job {} was submitted with the profiler disabled".format(job_name)
+        resolution = interval_ms / 1000.0 if interval_ms else self.args.get('profile_resolution')
+        with profiler.phase('profile.read'):
+            analyzer = SystemMetricsAnalyzer(resolution=resolution).feed_all(
+                iter_system_metric_lines(path, aws.client('s3') if path.startswith('s3://') else None))
+        if not analyzer.records:
+            return "no system metrics under {} yet".format(path)
+        table = analyzer.utilization_table()
+        flags = analyzer.bottlenecks(table)
+        self.shell.user_ns['___{}_utilization'.format(self.runtime_class_name)] = table
+        for title, frame in (('utilization (%)', table), ('bottlenecks', flags)):
+            print('{}:\n{}\n'.format(title, frame.to_string(index=False, float_format='{:.1f}'.format) if len(frame) else 'none'))
+        for recommendation in analyzer.recommendations(flags):
+            print('recommendation:', recommendation)
+        return {'profiler_data': path, 'hosts': sorted(analyzer.hosts), 'records': analyzer.records,
+                'skipped': analyzer.skipped, 'seconds': analyzer.seconds}
+
+    def _status(self):
+        return self._process_latest(self._describe)
+
+    def _delete(self):
+        return self._process_latest(self._stop)
 
 
 @magics_class
@@ -144,29 +728,13 @@ class TensorFlowEstimatorMagics(CommonEstimatorMagics):
     """
     def __init__(self, shell, data=None):
         super(TensorFlowEstimatorMagics, self).__init__(shell)
-        self.RuntimeClass = TensorFlow
-
-    def _get_config(self):
-        conf = super(TensorFlowEstimatorMagics, self)._get_config()
-        return conf.get_config('tfjob')
-
-    def tf_distribution(self, choise):
-        distribution = {
-            "parameter_server": {"parameter_server": {"enabled": True}},
-            "horovod": {
-                "mpi": {
-                    "enabled": True,
-                    "processes_per_host": self.args['mpi_processes_per_host'],
-                    "custom_mpi_options": self.args['mpi_custom_mpi_options']
-                },
-            }
-        }
-        return distribution.get(choise, None)
-
+        self.runtime_class_path = 'sagemaker.tensorflow.TensorFlow'
+        self.config_section = 'estimator.tfjob'
 
     @magic_arguments()
     @argument_group(title='methods', description=None)
-    @argument('method', type=str, choices=['submit', 'list', 'status', 'logs', 'delete', 'show_defaults'])
+    @argument('method', type=str, choices=['submit', 'sweep', 'local', 'list', 'status', 'watch', 'logs', 'fetch', 'metrics', 'profile', 'delete', 'show_defaults'])
+    @argument('--profile', type=bool, help='Print the time spent in each phase and the AWS calls made; see %sm_profile.', nargs='?', const=True)
     @argument_group(title='submit', description=None)
     @argument('--estimator_name', type=str, help='estimator shell variable name')
     @argument('--entry_point', type=str, help='notebook local code file')
@@ -178,8 +746,16 @@ class TensorFlowEstimatorMagics(CommonEstimatorMagics):
     @argument('--instance_count', type=int, help='Number of Amazon EC2 instances to use for training.')
     @argument('--output_path', type=str, help='S3 location for saving the training result (model artifacts and output files). If not specified, results are stored to a default bucket. If the bucket with the specific name does not exist, the estimator creates the bucket during the fit() method execution.')
     @argument('--hyperparameters', type=hyperparameters, help='Hyperparameters are passed to your script as arguments and can be retrieved with an argparse.', metavar='FOO:1,BAR:0.555,BAZ:ABC | \'FOO : 1, BAR : 0.555, BAZ : ABC\'')
-    @argument('--channel_training', type=str, help='A string that represents the path to the directory that contains the input data for the training channel. ')
-    @argument('--channel_testing', type=str, help='A string that represents the path to the directory that contains the input data for the testing channel. ')
+    @argument('--channel_training', type=str, help='S3 URI or local file/directory with the input data for the training channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--channel_testing', type=str, help='S3 URI or local file/directory with the input data for the testing channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--reuse', type=bool, help='Attach to a Completed job submitted with the same code, resolved args and channel data instead of starting a new one (see estimator.reuse.max_age_days).', nargs='?', const=True)
+    @argument_group(title='sweep', description=None)
+    @argument('--hyperparameter_grid', type=hyperparameter_grid, help='Grid of hyperparameter values, one job is submitted per combination.', metavar='FOO:1|2,BAR:0.1|0.01')
+    @argument('--hyperparameter_sets', type=hyperparameters, nargs='*', help='Explicit hyperparameter sets, one job is submitted per set.', metavar='\'FOO:1,BAR:0.1\'')
+    @argument('--max_parallel', type=int, help='Maximum number of concurrent sweep submissions or local runs.', default=8)
+    @argument_group(title='local', description=None)
+    @argument('--local_sample', type=int, help='Run locally on only the first N files of each channel.')
+    @argument('--local_timeout', type=int, help='Kill local runs after this many seconds.')
     @argument_group(title='submit-spot', description=None)
     @argument('--use_spot_instances', type=bool, help='Specifies whether to use SageMaker Managed Spot instances for training. If enabled then the max_wait arg should also be set. More information: https://docs.aws.amazon.com/sagemaker/latest/dg/model-managed-spot-training.html ', nargs='?', const=True)
     @argument('--max_wait', type=int, help='Timeout in seconds waiting for spot training instances (default: None). After this amount of time Amazon SageMaker will stop waiting for Spot instances to become available (default: None).')
@@ -187,12 +763,39 @@ class TensorFlowEstimatorMagics(CommonEstimatorMagics):
     @argument('--enable_sagemaker_metrics', type=bool, help='Enables SageMaker Metrics Time Series. For more information see: https://docs.aws.amazon.com/sagemaker/latest/dg/API_AlgorithmSpecification.html# SageMaker-Type-AlgorithmSpecification-EnableSageMakerMetricsTimeSeries ', nargs='?', const=True)
     @argument('--metric_definitions', type=metric_definitions, nargs='*', help='A list of dictionaries that defines the metric(s) used to evaluate the training jobs. Each dictionary contains two keys: ‘Name’ for the name of the metric, and ‘Regex’ for the regular expression used to extract the metric from the logs. This should be defined only for jobs that don’t use an Amazon algorithm.', metavar="\'Name: ganloss, Regex: GAN_loss=(.*?);\'")
     @argument_group(title='submit-distribution', description=None)
-    @argument('--distribution', type=str, choices=['parameter_server', 'horovod'], help='To run your training job with multiple instances in a distributed fashion, set instance_count to a number larger than 1. We support two different types of distributed training, parameter server and Horovod. The distribution parameter is used to configure which distributed training strategy to use.')
-    @argument('--mpi_processes_per_host', type=int, help="horovod mpi_processes_per_host", default=4)
-    @argument('--mpi_custom_mpi_options', type=str, help="horovod custom_mpi_options", default="--NCCL_DEBUG INFO")
+    @argument('--distribution', type=str, choices=strategies_for('TensorFlow'), help='To run your training job with multiple instances in a distributed fashion, set instance_count to a number larger than 1. The distribution parameter is used to configure which distributed training strategy to use; it is validated against framework_version, instance_type and instance_count.')
+    @argument('--mpi_processes_per_host', type=int, help="horovod / smdistributed_modelparallel mpi processes_per_host, at most the GPUs of instance_type (default: estimator.distribution config)")
+    @argument('--mpi_custom_mpi_options', type=str, help="horovod / smdistributed_modelparallel mpi custom_mpi_options (default: estimator.distribution config)")
+    @argument('--smp_partitions', type=int, help="smdistributed_modelparallel number of model partitions (default: estimator.distribution config)")
+    @argument('--smp_microbatches', type=int, help="smdistributed_modelparallel number of microbatches (default: estimator.distribution config)")
+    @argument_group(title='submit-profiler', description=None)
+    @argument('--profiler_interval_ms', type=int, choices=PROFILER_INTERVALS_MS, help='SageMaker Debugger system monitoring interval in ms (CPU, GPU, memory and I/O utilization); read it back with the profile method.')
+    @argument('--framework_profile_start_step', type=int, help='SageMaker Debugger framework profiling: first step to profile.')
+    @argument('--framework_profile_num_steps', type=int, help='SageMaker Debugger framework profiling: number of steps to profile.')
+    @argument('--disable_profiler', type=bool, help='Turn SageMaker Debugger monitoring and profiling off.', nargs='?', const=True)
+    @argument_group(title='watch', description=None)
+    @argument('--job_name', type=str, help='Job to watch, fetch, read metrics of or profile, defaults to the latest submitted job.')
+    @argument('--cancel', type=bool, help='Stop watching --job_name, or every watched job.', nargs='?', const=True)
+    @argument_group(title='logs', description=None)
+    @argument('--tail', type=int, help='Print only the last N new log lines.')
+    @argument('--grep', type=str, help='Print only log lines matching this regular expression.')
+    @argument('--from_start', type=bool, help='Read the logs from the beginning instead of from the previous call.', nargs='?', const=True)
+    @argument_group(title='profile', description=None)
+    @argument('--profiler_data', type=str, help='Local path (for example recorded fixtures) or S3 URI (file or prefix) of Debugger system metrics, defaults to the profiler output of --job_name or the latest job.')
+    @argument('--profile_resolution', type=float, help='Seconds per utilization sample when the job interval is unknown.', default=DEFAULT_RESOLUTION)
+    @argument_group(title='metrics', description=None)
+    @argument('--job_names', type=str, nargs='*', help='Jobs to read metrics of, defaults to --job_name, the latest sweep or the latest submitted job.')
+    @argument('--metric_names', type=str, nargs='*', help='Metrics to read, defaults to the metric definitions of each job.')
+    @argument('--metrics_axis', type=str, choices=sorted(AXES), help='Align series on the training step or on seconds since the first point.', default='step')
+    @argument('--metric_goal', type=str, choices=['minimize', 'maximize'], help='Whether lower or higher is better, defaults from the metric name.')
+    @argument('--convergence_tolerance', type=float, help='Converged once within this fraction of the value range from the best value.', default=CONVERGENCE_TOLERANCE)
     @argument_group(title='list', description=None)
     @argument('--name_contains', type=str, help='', default='tensorflow')
-    @argument('--max_result', type=str, help='', default=10)
+    @argument('--max_result', type=int, help='Maximum number of jobs to show.', default=10)
+    @argument('--status_equals', type=str, choices=['InProgress', 'Completed', 'Failed', 'Stopping', 'Stopped'], help='Only list jobs with this status.')
+    @argument('--created_after', type=date_time, help='Only list jobs created after this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--created_before', type=date_time, help='Only list jobs created before this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--no_index', type=bool, help='Page through the API instead of the incrementally synced local job index.', nargs='?', const=True)
     @cell_magic
     @line_magic
     @needs_local_scope
@@ -202,8 +805,7 @@ class TensorFlowEstimatorMagics(CommonEstimatorMagics):
         """
         self.cell = cell
         self.args = vars(parse_argstring(self.tfjob, line))
-        self.args['distribution'] = self.tf_distribution(self.args['distribution'])
-        print(json.dumps(self.method_matcher[self.args.pop('method')](), sort_keys=True, indent=4, default=str))
+        self._dispatch()
 
 @magics_class
 class PyTorchEstimatorMagics(CommonEstimatorMagics):
@@ -212,15 +814,13 @@ class PyTorchEstimatorMagics(CommonEstimatorMagics):
     """
     def __init__(self, shell, data=None):
         super(PyTorchEstimatorMagics, self).__init__(shell)
-        self.RuntimeClass = PyTorch
-
-    def _get_config(self):
-        conf = super(PyTorchEstimatorMagics, self)._get_config()
-        return conf.get_config('pytorch')
+        self.runtime_class_path = 'sagemaker.pytorch.PyTorch'
+        self.config_section = 'estimator.pytorch'
 
     @magic_arguments()
     @argument_group(title='methods', description=None)
-    @argument('method', type=str, choices=['submit', 'list', 'status', 'logs', 'delete', 'show_defaults'])
+    @argument('method', type=str, choices=['submit', 'sweep', 'local', 'list', 'status', 'watch', 'logs', 'fetch', 'metrics', 'profile', 'delete', 'show_defaults'])
+    @argument('--profile', type=bool, help='Print the time spent in each phase and the AWS calls made; see %sm_profile.', nargs='?', const=True)
     @argument_group(title='submit', description=None)
     @argument('--estimator_name', type=str, help='estimator shell variable name')
     @argument('--entry_point', type=str, help='notebook local code file')
@@ -232,17 +832,56 @@ class PyTorchEstimatorMagics(CommonEstimatorMagics):
     @argument('--instance_count', type=int, help='Number of Amazon EC2 instances to use for training.')
     @argument('--output_path', type=str, help='S3 location for saving the training result (model artifacts and output files). If not specified, results are stored to a default bucket. If the bucket with the specific name does not exist, the estimator creates the bucket during the fit() method execution.')
     @argument('--hyperparameters', type=hyperparameters, help='Hyperparameters are passed to your script as arguments and can be retrieved with an argparse.', metavar='FOO:1,BAR:0.555,BAZ:ABC | \'FOO : 1, BAR : 0.555, BAZ : ABC\'')
-    @argument('--channel_training', type=str, help='A string that represents the path to the directory that contains the input data for the training channel. ')
-    @argument('--channel_testing', type=str, help='A string that represents the path to the directory that contains the input data for the testing channel. ')
+    @argument('--channel_training', type=str, help='S3 URI or local file/directory with the input data for the training channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--channel_testing', type=str, help='S3 URI or local file/directory with the input data for the testing channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--reuse', type=bool, help='Attach to a Completed job submitted with the same code, resolved args and channel data instead of starting a new one (see estimator.reuse.max_age_days).', nargs='?', const=True)
+    @argument_group(title='sweep', description=None)
+    @argument('--hyperparameter_grid', type=hyperparameter_grid, help='Grid of hyperparameter values, one job is submitted per combination.', metavar='FOO:1|2,BAR:0.1|0.01')
+    @argument('--hyperparameter_sets', type=hyperparameters, nargs='*', help='Explicit hyperparameter sets, one job is submitted per set.', metavar='\'FOO:1,BAR:0.1\'')
+    @argument('--max_parallel', type=int, help='Maximum number of concurrent sweep submissions or local runs.', default=8)
+    @argument_group(title='local', description=None)
+    @argument('--local_sample', type=int, help='Run locally on only the first N files of each channel.')
+    @argument('--local_timeout', type=int, help='Kill local runs after this many seconds.')
     @argument_group(title='submit-spot', description=None)
     @argument('--use_spot_instances', type=bool, help='Specifies whether to use SageMaker Managed Spot instances for training. If enabled then the max_wait arg should also be set. More information: https://docs.aws.amazon.com/sagemaker/latest/dg/model-managed-spot-training.html ', nargs='?', const=True)
     @argument('--max_wait', type=int, help='Timeout in seconds waiting for spot training instances (default: None). After this amount of time Amazon SageMaker will stop waiting for Spot instances to become available (default: None).')
     @argument_group(title='submit-metrics', description=None)
     @argument('--enable_sagemaker_metrics', type=bool, help='Enables SageMaker Metrics Time Series. For more information see: https://docs.aws.amazon.com/sagemaker/latest/dg/API_AlgorithmSpecification.html# SageMaker-Type-AlgorithmSpecification-EnableSageMakerMetricsTimeSeries ', nargs='?', const=True)
     @argument('--metric_definitions', type=metric_definitions, nargs='*', help='A list of dictionaries that defines the metric(s) used to evaluate the training jobs. Each dictionary contains two keys: ‘Name’ for the name of the metric, and ‘Regex’ for the regular expression used to extract the metric from the logs. This should be defined only for jobs that don’t use an Amazon algorithm.', metavar="\'Name: loss, Regex: Loss = (.*?);\'")
+    @argument_group(title='submit-distribution', description=None)
+    @argument('--distribution', type=str, choices=strategies_for('PyTorch'), help='To run your training job with multiple instances in a distributed fashion, set instance_count to a number larger than 1. The distribution parameter is used to configure which distributed training strategy to use; it is validated against framework_version, instance_type and instance_count.')
+    @argument('--mpi_processes_per_host', type=int, help="horovod / smdistributed_modelparallel mpi processes_per_host, at most the GPUs of instance_type (default: estimator.distribution config)")
+    @argument('--mpi_custom_mpi_options', type=str, help="horovod / smdistributed_modelparallel mpi custom_mpi_options (default: estimator.distribution config)")
+    @argument('--smp_partitions', type=int, help="smdistributed_modelparallel number of model partitions (default: estimator.distribution config)")
+    @argument('--smp_microbatches', type=int, help="smdistributed_modelparallel number of microbatches (default: estimator.distribution config)")
+    @argument_group(title='submit-profiler', description=None)
+    @argument('--profiler_interval_ms', type=int, choices=PROFILER_INTERVALS_MS, help='SageMaker Debugger system monitoring interval in ms (CPU, GPU, memory and I/O utilization); read it back with the profile method.')
+    @argument('--framework_profile_start_step', type=int, help='SageMaker Debugger framework profiling: first step to profile.')
+    @argument('--framework_profile_num_steps', type=int, help='SageMaker Debugger framework profiling: number of steps to profile.')
+    @argument('--disable_profiler', type=bool, help='Turn SageMaker Debugger monitoring and profiling off.', nargs='?', const=True)
+    @argument_group(title='watch', description=None)
+    @argument('--job_name', type=str, help='Job to watch, fetch, read metrics of or profile, defaults to the latest submitted job.')
+    @argument('--cancel', type=bool, help='Stop watching --job_name, or every watched job.', nargs='?', const=True)
+    @argument_group(title='logs', description=None)
+    @argument('--tail', type=int, help='Print only the last N new log lines.')
+    @argument('--grep', type=str, help='Print only log lines matching this regular expression.')
+    @argument('--from_start', type=bool, help='Read the logs from the beginning instead of from the previous call.', nargs='?', const=True)
+    @argument_group(title='profile', description=None)
+    @argument('--profiler_data', type=str, help='Local path (for example recorded fixtures) or S3 URI (file or prefix) of Debugger system metrics, defaults to the profiler output of --job_name or the latest job.')
+    @argument('--profile_resolution', type=float, help='Seconds per utilization sample when the job interval is unknown.', default=DEFAULT_RESOLUTION)
+    @argument_group(title='metrics', description=None)
+    @argument('--job_names', type=str, nargs='*', help='Jobs to read metrics of, defaults to --job_name, the latest sweep or the latest submitted job.')
+    @argument('--metric_names', type=str, nargs='*', help='Metrics to read, defaults to the metric definitions of each job.')
+    @argument('--metrics_axis', type=str, choices=sorted(AXES), help='Align series on the training step or on seconds since the first point.', default='step')
+    @argument('--metric_goal', type=str, choices=['minimize', 'maximize'], help='Whether lower or higher is better, defaults from the metric name.')
+    @argument('--convergence_tolerance', type=float, help='Converged once within this fraction of the value range from the best value.', default=CONVERGENCE_TOLERANCE)
     @argument_group(title='list', description=None)
     @argument('--name_contains', type=str, help='', default='pytorch')
-    @argument('--max_result', type=str, help='', default=10)
+    @argument('--max_result', type=int, help='Maximum number of jobs to show.', default=10)
+    @argument('--status_equals', type=str, choices=['InProgress', 'Completed', 'Failed', 'Stopping', 'Stopped'], help='Only list jobs with this status.')
+    @argument('--created_after', type=date_time, help='Only list jobs created after this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--created_before', type=date_time, help='Only list jobs created before this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--no_index', type=bool, help='Page through the API instead of the incrementally synced local job index.', nargs='?', const=True)
     @cell_magic
     @line_magic
     @needs_local_scope
@@ -252,7 +891,7 @@ class PyTorchEstimatorMagics(CommonEstimatorMagics):
         """
         self.cell = cell
         self.args = vars(parse_argstring(self.pytorch, line))
-        print(json.dumps(self.method_matcher[self.args.pop('method')](), sort_keys=True, indent=4, default=str))
+        self._dispatch()
 
 
 @magics_class
@@ -262,15 +901,13 @@ class SKLearnEstimatorMagics(CommonEstimatorMagics):
     """
     def __init__(self, shell, data=None):
         super(SKLearnEstimatorMagics, self).__init__(shell)
-        self.RuntimeClass = SKLearn
-
-    def _get_config(self):
-        conf = super(SKLearnEstimatorMagics, self)._get_config()
-        return conf.get_config('sklearn')
+        self.runtime_class_path = 'sagemaker.sklearn.estimator.SKLearn'
+        self.config_section = 'estimator.sklearn'
 
     @magic_arguments()
     @argument_group(title='methods', description=None)
-    @argument('method', type=str, choices=['submit', 'list', 'status', 'logs', 'delete', 'show_defaults'])
+    @argument('method', type=str, choices=['submit', 'sweep', 'local', 'list', 'status', 'watch', 'logs', 'fetch', 'metrics', 'profile', 'delete', 'show_defaults'])
+    @argument('--profile', type=bool, help='Print the time spent in each phase and the AWS calls made; see %sm_profile.', nargs='?', const=True)
     @argument_group(title='submit', description=None)
     @argument('--estimator_name', type=str, help='estimator shell variable name')
     @argument('--entry_point', type=str, help='notebook local code file')
@@ -282,17 +919,50 @@ class SKLearnEstimatorMagics(CommonEstimatorMagics):
     @argument('--instance_count', type=int, help='Number of Amazon EC2 instances to use for training.')
     @argument('--output_path', type=str, help='S3 location for saving the training result (model artifacts and output files). If not specified, results are stored to a default bucket. If the bucket with the specific name does not exist, the estimator creates the bucket during the fit() method execution.')
     @argument('--hyperparameters', type=hyperparameters, help='Hyperparameters are passed to your script as arguments and can be retrieved with an argparse.', metavar='FOO:1,BAR:0.555,BAZ:ABC | \'FOO : 1, BAR : 0.555, BAZ : ABC\'')
-    @argument('--channel_training', type=str, help='A string that represents the path to the directory that contains the input data for the training channel. ')
-    @argument('--channel_testing', type=str, help='A string that represents the path to the directory that contains the input data for the testing channel. ')
+    @argument('--channel_training', type=str, help='S3 URI or local file/directory with the input data for the training channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--channel_testing', type=str, help='S3 URI or local file/directory with the input data for the testing channel. Local data is uploaded once per content and reused while unchanged.')
+    @argument('--reuse', type=bool, help='Attach to a Completed job submitted with the same code, resolved args and channel data instead of starting a new one (see estimator.reuse.max_age_days).', nargs='?', const=True)
+    @argument_group(title='sweep', description=None)
+    @argument('--hyperparameter_grid', type=hyperparameter_grid, help='Grid of hyperparameter values, one job is submitted per combination.', metavar='FOO:1|2,BAR:0.1|0.01')
+    @argument('--hyperparameter_sets', type=hyperparameters, nargs='*', help='Explicit hyperparameter sets, one job is submitted per set.', metavar='\'FOO:1,BAR:0.1\'')
+    @argument('--max_parallel', type=int, help='Maximum number of concurrent sweep submissions or local runs.', default=8)
+    @argument_group(title='local', description=None)
+    @argument('--local_sample', type=int, help='Run locally on only the first N files of each channel.')
+    @argument('--local_timeout', type=int, help='Kill local runs after this many seconds.')
     @argument_group(title='submit-spot', description=None)
     @argument('--use_spot_instances', type=bool, help='Specifies whether to use SageMaker Managed Spot instances for training. If enabled then the max_wait arg should also be set. More information: https://docs.aws.amazon.com/sagemaker/latest/dg/model-managed-spot-training.html ', nargs='?', const=True)
     @argument('--max_wait', type=int, help='Timeout in seconds waiting for spot training instances (default: None). After this amount of time Amazon SageMaker will stop waiting for Spot instances to become available (default: None).')
     @argument_group(title='submit-metrics', description=None)
     @argument('--enable_sagemaker_metrics', type=bool, help='Enables SageMaker Metrics Time Series. For more information see: https://docs.aws.amazon.com/sagemaker/latest/dg/API_AlgorithmSpecification.html# SageMaker-Type-AlgorithmSpecification-EnableSageMakerMetricsTimeSeries ', nargs='?', const=True)
     @argument('--metric_definitions', type=metric_definitions, nargs='*', help='A list of dictionaries that defines the metric(s) used to evaluate the training jobs. Each dictionary contains two keys: ‘Name’ for the name of the metric, and ‘Regex’ for the regular expression used to extract the metric from the logs. This should be defined only for jobs that don’t use an Amazon algorithm.', metavar="\'Name: loss, Regex: Loss = (.*?);\'")
+    @argument_group(title='submit-profiler', description=None)
+    @argument('--profiler_interval_ms', type=int, choices=PROFILER_INTERVALS_MS, help='SageMaker Debugger system monitoring interval in ms (CPU, GPU, memory and I/O utilization); read it back with the profile method.')
+    @argument('--framework_profile_start_step', type=int, help='SageMaker Debugger framework profiling: first step to profile.')
+    @argument('--framework_profile_num_steps', type=int, help='SageMaker Debugger framework profiling: number of steps to profile.')
+    @argument('--disable_profiler', type=bool, help='Turn SageMaker Debugger monitoring and profiling off.', nargs='?', const=True)
+    @argument_group(title='watch', description=None)
+    @argument('--job_name', type=str, help='Job to watch, fetch, read metrics of or profile, defaults to the latest submitted job.')
+    @argument('--cancel', type=bool, help='Stop watching --job_name, or every watched job.', nargs='?', const=True)
+    @argument_group(title='logs', description=None)
+    @argument('--tail', type=int, help='Print only the last N new log lines.')
+    @argument('--grep', type=str, help='Print only log lines matching this regular expression.')
+    @argument('--from_start', type=bool, help='Read the logs from the beginning instead of from the previous call.', nargs='?', const=True)
+    @argument_group(title='profile', description=None)
+    @argument('--profiler_data', type=str, help='Local path (for example recorded fixtures) or S3 URI (file or prefix) of Debugger system metrics, defaults to the profiler output of --job_name or the latest job.')
+    @argument('--profile_resolution', type=float, help='Seconds per utilization sample when the job interval is unknown.', default=DEFAULT_RESOLUTION)
+    @argument_group(title='metrics', description=None)
+    @argument('--job_names', type=str, nargs='*', help='Jobs to read metrics of, defaults to --job_name, the latest sweep or the latest submitted job.')
+    @argument('--metric_names', type=str, nargs='*', help='Metrics to read, defaults to the metric definitions of each job.')
+    @argument('--metrics_axis', type=str, choices=sorted(AXES), help='Align series on the training step or on seconds since the first point.', default='step')
+    @argument('--metric_goal', type=str, choices=['minimize', 'maximize'], help='Whether lower or higher is better, defaults from the metric name.')
+    @argument('--convergence_tolerance', type=float, help='Converged once within this fraction of the value range from the best value.', default=CONVERGENCE_TOLERANCE)
     @argument_group(title='list', description=None)
     @argument('--name_contains', type=str, help='', default='scikit-learn')
-    @argument('--max_result', type=str, help='', default=10)
+    @argument('--max_result', type=int, help='Maximum number of jobs to show.', default=10)
+    @argument('--status_equals', type=str, choices=['InProgress', 'Completed', 'Failed', 'Stopping', 'Stopped'], help='Only list jobs with this status.')
+    @argument('--created_after', type=date_time, help='Only list jobs created after this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--created_before', type=date_time, help='Only list jobs created before this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--no_index', type=bool, help='Page through the API instead of the incrementally synced local job index.', nargs='?', const=True)
     @cell_magic
     @line_magic
     @needs_local_scope
@@ -302,53 +972,76 @@ class SKLearnEstimatorMagics(CommonEstimatorMagics):
         """
         self.cell = cell
         self.args = vars(parse_argstring(self.sklearn, line))
-        print(json.dumps(self.method_matcher[self.args.pop('method')](), sort_keys=True, indent=4, default=str))
+        self._dispatch()
 
 
 class CommonProcessorMagics(CommonMagics):
     """
     Common Processor magic class.
     """
+    job_apis = ('describe_processing_job', 'stop_processing_job')
+
     def __init__(self, shell, data=None):
         super(CommonProcessorMagics, self).__init__(shell)
-
-    def _get_config(self):
-        conf = super(CommonProcessorMagics, self)._get_config()
-        return conf.get_config('processor')
+        self.status_keys = ('ProcessingJobStatus',)
+        self.log_group = PROCESSING_LOG_GROUP
+        self.job_kind = 'processing'
 
     def _full_fill_args(self):
-        self.args['submit_app'] = self.args.get('submit_app', self.upload_content(self.cell))
-        self.args['role'] = self.args.get('role', get_execution_role())
-        self.args['wait'] = self.args.get('logs', None)
-        self.args = ConfigFactory.from_dict(self.args).with_fallback(self._get_config())
+        self.options = {key: self.args.pop(key) for key in MAGIC_OPTIONS if key in self.args}
+        ## --job_name names the processing job on submit, so it is a job arg here.
+        if 'job_name' in self.options:
+            self.args['job_name'] = self.options['job_name']
+        with profiler.phase('upload_content'):
+            self.args['submit_app'] = self.args.get('submit_app') or self.upload_content(self.cell)
+        with profiler.phase('role'):
+            self.args['role'] = self.args.get('role') or aws.role()
+        with profiler.phase('config'):
+            from pyhocon import ConfigFactory
+            self.args = ConfigFactory.from_dict(self.args).with_fallback(self._get_config())
+        ## Never block the kernel on the job: progress comes from a background watcher and `logs`.
+        self.args['wait'] = False
+        self.args['logs'] = False
 
         processor_args = {k: v for k, v in self.args.items() if k in ['role', 'instance_type', 'instance_count', 'framework_version', 'py_version', 'container_version', 'image_uri', 'volume_size_in_gb', 'volume_kms_key', 'output_kms_key', 'max_runtime_in_seconds', 'base_job_name', 'sagemaker_session', 'env', 'tags', 'network_config']}
         run_args = {k: v for k, v in self.args.items() if k in ['submit_app', 'submit_py_files', 'submit_jars', 'submit_files', 'inputs', 'outputs', 'arguments', 'wait', 'logs', 'job_name', 'experiment_config', 'configuration', 'spark_event_logs_s3_uri', 'kms_key']}
         return processor_args, run_args
 
+    def _start_packaging(self):
+        """
+            Zip local directories given in --submit_py_files on a worker thread; files and S3 URIs pass through.
+        """
+        return [source_packager.submit(path, fmt='zip') if os.path.isdir(path) else path
+                for path in self.args.get('submit_py_files') or []]
+
     def _submit(self):
         self._clean_args()
+        py_files = self._start_packaging()
         processor_args, run_args = self._full_fill_args()
+        if py_files:
+            with profiler.phase('packaging'):
+                run_args['submit_py_files'] = [path if isinstance(path, str) else path.result().path for path in py_files]
         print('submit:\n', json.dumps(self.args, sort_keys=True, indent=4, default=str))
-        processor = self.RuntimeClass(**processor_args)
-        processor.run(**run_args)
-        self.shell.user_ns['___{}_latest_job_name'.format(self.RuntimeClass.__name__)] = processor._current_job_name
+        processor_args['sagemaker_session'] = aws.session()
+        with profiler.phase('processor'):
+            processor = self.RuntimeClass(**processor_args)
+        with profiler.phase('run'):
+            processor.run(**run_args)
+        job_name = processor._current_job_name
+        self.shell.user_ns['___{}_latest_job_name'.format(self.runtime_class_name)] = job_name
+        with profiler.phase('registry'):
+            self._register_job(job_name, self.args, run_args.get('submit_app'))
+        self.watchers[job_name] = JobWatcher(job_name, self._describe, self.status_keys).start()
         return {
-            '___{}_latest_job_name'.format(self.RuntimeClass.__name__): self._get_latest_job_name()
+            '___{}_latest_job_name'.format(self.runtime_class_name): self._get_latest_job_name(),
+            'watchers': sorted(self.watchers)
         }
 
     def _status(self):
-        return self._process_latest(Session().describe_processing_job)
-
-    def _logs(self):
-        return "There are two options for provide processing logs --spark_event_logs_s3_uri and --logs"
+        return self._process_latest(self._describe)
 
     def _delete(self):
-        self._process_latest(Session().stop_processing_job)
-        return self._process_latest(Session().describe_processing_job)
-
-    def _list(self):
-        return boto3.client('sagemaker').list_processing_jobs(NameContains=self.args.get('name_contains'),MaxResults=self.args.get('max_result'))
+        return self._process_latest(self._stop)
 
 
 @magics_class
@@ -358,14 +1051,40 @@ class PySparkProcessorMagics(CommonProcessorMagics):
     """
     def __init__(self, shell, data=None):
         super(PySparkProcessorMagics, self).__init__(shell)
-        self.RuntimeClass = PySparkProcessor
+        self.runtime_class_path = 'sagemaker.spark.processing.PySparkProcessor'
+        self.config_section = 'processor.pyspark'
+        self.method_matcher['profile'] = self._profile
 
-    def _get_config(self):
-        conf = super(PySparkProcessorMagics, self)._get_config()
-        return conf.get_config('pyspark')
+    def _event_log_path(self, job_name):
+        for output in self._describe(job_name).get('ProcessingOutputConfig', {}).get('Outputs', []):
+            s3_output = output.get('S3Output', {})
+            if s3_output.get('LocalPath', '').rstrip('/') == SPARK_EVENTS_LOCAL_PATH:
+                return s3_output['S3Uri']
+        return None
+
+    def _profile(self):
+        """
+            Stream the Spark event logs of --event_log or of a job's --spark_event_logs_s3_uri and report
+            per-stage statistics, straggler tasks and skewed partitions.
+        """
+        path = self.args.get('event_log')
+        if not path:
+            job_name = self.args.get('job_name') or self._get_latest_job_name()
+            if not job_name:
+                return "please submit at least one job or provide --event_log"
+            path = self._event_log_path(job_name)
+            if not path:
+                return "job {} was not submitted with --spark_event_logs_s3_uri".format(job_name)
+        analyzer = SparkEventLogAnalyzer().feed_all(iter_event_log_lines(path, aws.client('s3') if path.startswith('s3://') else None))
+        for title, table in (('stages', analyzer.stage_table()),
+                             ('straggler tasks (ms)', analyzer.stragglers(self.args.get('straggler_factor'))),
+                             ('skewed partitions (shuffle read bytes)', analyzer.skewed_partitions(self.args.get('skew_factor')))):
+            print('{}:\n{}\n'.format(title, table.to_string(index=False) if len(table) else 'none'))
+        return {'event_log': path, 'tasks': analyzer.tasks, 'failed_tasks': analyzer.failed_tasks, 'stages': len(analyzer.stages)}
 
     @magic_arguments()
-    @argument('method', type=str, choices=['submit', 'list', 'status', 'delete', 'show_defaults'])
+    @argument('method', type=str, choices=['submit', 'list', 'status', 'watch', 'logs', 'profile', 'delete', 'show_defaults'])
+    @argument('--profile', type=bool, help='Print the time spent in each phase and the AWS calls made; see %sm_profile.', nargs='?', const=True)
     @argument_group(title='processor', description=None)
     @argument('--base_job_name', type=str, help='Prefix for processing name. If not specified, the processor generates a default job name, based on the training image name and current timestamp.')
     @argument('--submit_app', type=str, help='Path (local or S3) to Python file to submit to Spark as the primary application')
@@ -378,10 +1097,25 @@ class PySparkProcessorMagics(CommonProcessorMagics):
     @argument('--submit_files', type=str, nargs='*', help='List of .zip, .egg, or .py files to place on the PYTHONPATH for Python apps.')
     @argument('--arguments', type=arguments, help='A list of string arguments to be passed to a processing job', metavar="\'--foo bar --baz 123\'")
     @argument('--spark_event_logs_s3_uri', type=str, help='S3 path where spark application events will be published to.')
-    @argument('--logs', type=bool, help='Whether to show the logs produced by the job.', nargs='?', const=True)
+    @argument('--logs', type=bool, help='Deprecated, submit no longer blocks on the job. Progress is shown by a background watcher, read the logs with `%%pyspark logs`.', nargs='?', const=True)
+    @argument_group(title='watch', description=None)
+    @argument('--job_name', type=str, help='Job to watch, defaults to the latest submitted job.')
+    @argument('--cancel', type=bool, help='Stop watching --job_name, or every watched job.', nargs='?', const=True)
+    @argument_group(title='logs', description=None)
+    @argument('--tail', type=int, help='Print only the last N new log lines.')
+    @argument('--grep', type=str, help='Print only log lines matching this regular expression.')
+    @argument('--from_start', type=bool, help='Read the logs from the beginning instead of from the previous call.', nargs='?', const=True)
+    @argument_group(title='profile', description=None)
+    @argument('--event_log', type=str, help='Local path or S3 URI (file or prefix) of Spark event logs, defaults to the --spark_event_logs_s3_uri of the job.')
+    @argument('--straggler_factor', type=float, help='Report tasks slower than this multiple of their stage median.', default=3.0)
+    @argument('--skew_factor', type=float, help='Report partitions reading more shuffle data than this multiple of their stage median.', default=3.0)
     @argument_group(title='list', description=None)
     @argument('--name_contains', type=str, help='', default='spark')
-    @argument('--max_result', type=str, help='', default=10)
+    @argument('--max_result', type=int, help='Maximum number of jobs to show.', default=10)
+    @argument('--status_equals', type=str, choices=['InProgress', 'Completed', 'Failed', 'Stopping', 'Stopped'], help='Only list jobs with this status.')
+    @argument('--created_after', type=date_time, help='Only list jobs created after this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--created_before', type=date_time, help='Only list jobs created before this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--no_index', type=bool, help='Page through the API instead of the incrementally synced local job index.', nargs='?', const=True)
     @cell_magic
     @line_magic
     @needs_local_scope
@@ -391,12 +1125,130 @@ class PySparkProcessorMagics(CommonProcessorMagics):
         """
         self.cell = cell
         self.args = vars(parse_argstring(self.pyspark, line))
+        self._dispatch()
+
 
-        print(json.dumps(self.method_matcher[self.args.pop('method')](), sort_keys=True, indent=4, default=str))
+@magics_class
+class ConfigMagics(Magics):
+    """
+    SageMaker magics configuration class.
+    """
+    @magic_arguments()
+    @argument('method', type=str, choices=['show', 'reload'], nargs='?', default='show')
+    @argument('--section', type=str, help='Config section to print, for example estimator.tfjob. Prints the whole file if not set.')
+    @line_magic
+    def sm_config(self, line):
+        """
+        SageMaker magics configuration command. `reload` drops the cached DEFAULT_SM_CONFIG_PATH file and parses it again.
+        """
+        args = parse_argstring(self.sm_config, line)
+        if args.method == 'reload':
+            config_cache.reload()
+        print(json.dumps(config_cache.get(args.section), sort_keys=True, indent=4, default=str))
+
+
+@magics_class
+class JobsMagics(Magics):
+    """
+    SageMaker job registry magic class.
+    """
+    job_apis = {
+        'training': ('describe_training_job', 'stop_training_job', 'TrainingJobStatus'),
+        'processing': ('describe_processing_job', 'stop_processing_job', 'ProcessingJobStatus'),
+    }
+
+    def _describe(self, job):
+        describe, _, status_key = self.job_apis[job['kind']]
+        response = describe_cache.get(job['kind'], job['name'], getattr(aws.session(), describe), status_key)
+        job_registry.update_status(job['name'], response.get(status_key))
+        return response
+
+    @magic_arguments()
+    @argument('method', type=str, choices=['query', 'status', 'delete'], nargs='?', default='query')
+    @argument('job_name', type=str, nargs='?', help='Job name for status and delete.')
+    @argument('--runtime_class', type=str, help='Only jobs of this runtime, for example PyTorch or PySparkProcessor.')
+    @argument('--status', type=str, help='Only jobs whose last known status is this one.')
+    @argument('--name_contains', type=str, help='Only jobs whose name contains this string.')
+    @argument('--since', type=date_time, help='Only jobs submitted after this ISO date/time.', metavar='2021-01-31T12:00')
+    @argument('--limit', type=int, help='Maximum number of jobs to show.', default=50)
+    @line_magic
+    def sm_jobs(self, line):
+        """
+        Query the local registry of submitted jobs, or show status / stop a registered job by name.
+        """
+        import pandas as pd
+        args = parse_argstring(self.sm_jobs, line)
+        if args.method == 'query':
+            jobs = job_registry.query(runtime_class=args.runtime_class, status=args.status, name_contains=args.name_contains,
+                                      since=args.since.timestamp() if args.since else None, limit=args.limit)
+            frame = pd.DataFrame(jobs, columns=['name', 'runtime_class', 'status', 'submitted_at', 'content_hash'])
+            frame['submitted_at'] = pd.to_datetime(frame['submitted_at'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+            frame['content_hash'] = frame['content_hash'].str[:12]
+            return CommonMagics._print_result(frame)
+
+        job = job_registry.get(args.job_name) if args.job_name else None
+        if job is None:
+            return CommonMagics._print_result('unknown job {}, see %sm_jobs query'.format(args.job_name))
+        if args.method == 'delete':
+            getattr(aws.session(), self.job_apis[job['kind']][1])(job['name'])
+            describe_cache.invalidate(job['kind'], job['name'])
+        CommonMagics._print_result(self._describe(job))
+
+
+@magics_class
+class ThrottleMagics(Magics):
+    """
+    SageMaker API rate limiter magic class.
+    """
+    @magic_arguments()
+    @argument('method', type=str, choices=['show', 'reset'], nargs='?', default='show')
+    @line_magic
+    def sm_throttle(self, line):
+        """
+        Show per-API calls, throttles, retries and seconds spent waiting in the rate limiter, or reset the counters.
+        """
+        import pandas as pd
+        args = parse_argstring(self.sm_throttle, line)
+        if args.method == 'reset':
+            aws.limiter.reset_stats()
+        frame = pd.DataFrame.from_dict(aws.limiter.stats(), orient='index',
+                                       columns=['calls', 'throttled', 'retries', 'failed', 'wait_s', 'rate'])
+        CommonMagics._print_result(frame.rename_axis('api').sort_index())
+
+
+@magics_class
+class ProfileMagics(Magics):
+    """
+    Magic invocation profiling class.
+    """
+    @magic_arguments()
+    @argument('method', type=str, choices=['show', 'on', 'off', 'trace', 'clear'], nargs='?', default='show')
+    @argument('--last', type=int, help='Only the last N profiled invocations.')
+    @argument('--path', type=str, help='Chrome trace JSON file written by `trace`.', default='sm-magic-trace.json')
+    @line_magic
+    def sm_profile(self, line):
+        """
+        Show the rolling history of profiled magic invocations, profile every invocation (`on` / `off`),
+        or write the history as Chrome trace JSON for chrome://tracing or Perfetto.
+        """
+        args = parse_argstring(self.sm_profile, line)
+        if args.method in ('on', 'off'):
+            profiler.always = args.method == 'on'
+        elif args.method == 'clear':
+            profiler.clear()
+        elif args.method == 'trace':
+            return CommonMagics._print_result('wrote {} events to {}'.format(profiler.chrome_trace(args.path, args.last), args.path))
+        CommonMagics._print_result(profiler.table(args.last))
 
 
 def load_ipython_extension(ipython):
     ipython.register_magics(TensorFlowEstimatorMagics)
     ipython.register_magics(PyTorchEstimatorMagics)
     ipython.register_magics(SKLearnEstimatorMagics)
-    ipython.register_magics(PySparkProcessorMagics)
\ No newline at end of file
+    ipython.register_magics(PySparkProcessorMagics)
+    ipython.register_magics(ConfigMagics)
+    ipython.register_magics(JobsMagics)
+    ipython.register_magics(ThrottleMagics)
+    ipython.register_magics(ProfileMagics)
+    if profiler.aws_call not in aws.call_observers:
+        aws.call_observers.append(profiler.aws_call)
\ No newline at end of file
@@ -0,0 +1,119 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import datetime
+import json
+import os
+import threading
+
+from .staging import STAGING_DIR, digest
+
+## operation, summaries key, name key, status key, end time key
+JOB_KINDS = {
+    'training': ('list_training_jobs', 'TrainingJobSummaries', 'TrainingJobName', 'TrainingJobStatus', 'TrainingEndTime'),
+    'processing': ('list_processing_jobs', 'ProcessingJobSummaries', 'ProcessingJobName', 'ProcessingJobStatus', 'ProcessingEndTime'),
+}
+PAGE_SIZE = 100
+SYNC_OVERLAP_SECONDS = 1
+
+
+def _epoch(value):
+    return value.timestamp() if isinstance(value, datetime.datetime) else value
+
+
+def iter_jobs(client, kind, **filters):
+    """
+        Lazily yield job summaries of `kind`, following NextToken page by page.
+
+        `filters` (NameContains, StatusEquals, CreationTimeAfter, ...) are passed to the API.
+    """
+    operation, summaries_key = JOB_KINDS[kind][:2]
+    filters = {k: v for k, v in filters.items() if v is not None}
+    paginator = client.get_paginator(operation)
+    for page in paginator.paginate(PaginationConfig={'PageSize': PAGE_SIZE}, **filters):
+        for summary in page.get(summaries_key, []):
+            yield summary
+
+
+def compact(kind, summary):
+    _, _, name_key, status_key, end_key = JOB_KINDS[kind]
+    return {
+        'name': summary[name_key],
+        'status': summary.get(status_key),
+        'created': _epoch(summary.get('CreationTime')),
+        'ended': _epoch(summary.get(end_key)),
+        'modified': _epoch(summary.get('LastModifiedTime')),
+    }
+
+
+class JobIndex(object):
+    """
+        Local index of job summaries for one job kind and set of list filters.
+
+        The first sync pages through the jobs matching the filters, which the API applies; later
+        syncs only ask for jobs modified since the newest LastModifiedTime seen, which returns both
+        new jobs and jobs whose status changed. The status filter is left out of those, so jobs that
+        leave the status are updated too, and `query` filters on it locally.
+    """
+    def __init__(self, kind, name_contains=None, status=None, created_after=None, created_before=None, root=STAGING_DIR):
+        self.kind = kind
+        self.filters = {'NameContains': name_contains, 'StatusEquals': status,
+                        'CreationTimeAfter': created_after, 'CreationTimeBefore': created_before}
+        scope = json.dumps([name_contains, status, _epoch(created_after), _epoch(created_before)])
+        self.path = os.path.join(root, 'jobs-{}-{}.json'.format(kind, digest(scope)[:12]))
+        self._lock = threading.Lock()
+        self.jobs = {}
+        self.last_modified = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            return
+        self.jobs = state.get('jobs', {})
+        self.last_modified = state.get('last_modified')
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({'jobs': self.jobs, 'last_modified': self.last_modified}, f)
+        os.replace(tmp_path, self.path)
+
+    def sync(self, client):
+        """
+            Fetch jobs modified since the last sync and return how many were added or updated.
+        """
+        with self._lock:
+            filters = dict(self.filters)
+            if self.last_modified is not None:
+                filters['StatusEquals'] = None
+                filters['LastModifiedTimeAfter'] = datetime.datetime.fromtimestamp(self.last_modified - SYNC_OVERLAP_SECONDS,
+                                                                                   tz=datetime.timezone.utc)
+            fetched = 0
+            for summary in iter_jobs(client, self.kind, **filters):
+                job = compact(self.kind, summary)
+                self.jobs[job['name']] = job
+                if job['modified'] is not None:
+                    self.last_modified = max(self.last_modified or 0, job['modified'])
+                fetched += 1
+            if fetched:
+                self._save()
+            return fetched
+
+    def query(self, status=None, created_after=None, created_before=None, limit=None):
+        jobs = [job for job in self.jobs.values()
+                if (status is None or job['status'] == status)
+                and (created_after is None or (job['created'] or 0) > created_after)
+                and (created_before is None or (job['created'] or 0) < created_before)]
+        jobs.sort(key=lambda job: job['created'] or 0, reverse=True)
+        return jobs[:limit] if limit else jobs
+
+
+def jobs_table(jobs):
+    import pandas as pd
+    frame = pd.DataFrame(jobs, columns=['name', 'status', 'created', 'ended'])
+    for column in ('created', 'ended'):
+        frame[column] = pd.to_datetime(frame[column], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
+    return frame
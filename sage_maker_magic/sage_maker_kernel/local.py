@@ -0,0 +1,141 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+from .staging import STAGING_DIR, digest
+
+LOCAL_DIR = os.path.join(STAGING_DIR, 'local')
+CURRENT_HOST = 'algo-1'
+
+LocalRun = collections.namedtuple('LocalRun', ['run', 'hyperparameters', 'returncode', 'seconds', 'model_dir', 'output_dir'])
+
+
+def cli_args(hyperparameters):
+    """
+        Hyperparameters as `--name value` arguments, the way the SageMaker training toolkit passes them.
+    """
+    args = []
+    for name, value in sorted(hyperparameters.items()):
+        args += ['--{}'.format(name), value if isinstance(value, str) else json.dumps(value)]
+    return args
+
+
+def sm_environment(hyperparameters, channels, model_dir, output_dir, module_dir, input_dir=''):
+    """
+        SM_* variables a training script reads inside a SageMaker training container.
+    """
+    env = {
+        'SM_MODEL_DIR': model_dir,
+        'SM_OUTPUT_DATA_DIR': output_dir,
+        'SM_OUTPUT_DIR': output_dir,
+        'SM_MODULE_DIR': module_dir,
+        'SM_INPUT_DIR': input_dir,
+        'SM_CHANNELS': json.dumps(sorted(channels)),
+        'SM_HPS': json.dumps(hyperparameters),
+        'SM_USER_ARGS': json.dumps(cli_args(hyperparameters)),
+        'SM_CURRENT_HOST': CURRENT_HOST,
+        'SM_HOSTS': json.dumps([CURRENT_HOST]),
+        'SM_NUM_CPUS': str(os.cpu_count() or 1),
+        'SM_NUM_GPUS': '0',
+    }
+    for name, path in channels.items():
+        env['SM_CHANNEL_{}'.format(name.upper())] = path
+    for name, value in hyperparameters.items():
+        env['SM_HP_{}'.format(name.upper())] = value if isinstance(value, str) else json.dumps(value)
+    return env
+
+
+def sample_channel(source, target, sample, s3_client=None):
+    """
+        Materialize channel `source` (local path or S3 URI) under `target`, keeping only the first
+        `sample` files in name order if set. Local files are linked, S3 objects downloaded.
+    """
+    os.makedirs(target, exist_ok=True)
+    if source.startswith('s3://'):
+        bucket, _, prefix = source[len('s3://'):].partition('/')
+        paginator = s3_client.get_paginator('list_objects_v2')
+        keys = (obj['Key'] for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+                for obj in page.get('Contents', []) if not obj['Key'].endswith('/'))
+        for i, key in enumerate(keys):
+            if sample is not None and i >= sample:
+                break
+            path = os.path.join(target, key[len(prefix):].lstrip('/') or os.path.basename(key))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if not os.path.exists(path):
+                s3_client.download_file(bucket, key, path)
+        return target
+    if sample is None:
+        return os.path.abspath(source)
+    if os.path.isfile(source):
+        files = [(os.path.basename(source), os.path.abspath(source))]
+    else:
+        files = sorted((os.path.relpath(os.path.join(root, name), source), os.path.abspath(os.path.join(root, name)))
+                       for root, _, names in os.walk(source) for name in names)
+    for rel, path in files[:sample]:
+        link = os.path.join(target, rel)
+        os.makedirs(os.path.dirname(link), exist_ok=True)
+        if not os.path.lexists(link):
+            os.symlink(path, link)
+    return target
+
+
+class LocalRunner(object):
+    """
+        Runs a training entry point as local subprocesses, one per hyperparameter set, with the
+        SageMaker environment contract and no container. Output lines are streamed as they are
+        written, prefixed with the run number when several runs share the cell.
+    """
+    def __init__(self, root=LOCAL_DIR, python=sys.executable):
+        self.root = root
+        self.python = python
+        self._print_lock = threading.Lock()
+
+    def _stream(self, process, prefix):
+        for line in iter(process.stdout.readline, ''):
+            with self._print_lock:
+                print('{}{}'.format(prefix, line), end='')
+                sys.stdout.flush()
+
+    def run_one(self, index, entry_point, hyperparameters, channels, source_dir=None, timeout=None, prefix='', input_dir=''):
+        run_dir = os.path.join(self.root, '{}-{:04d}'.format(digest(json.dumps([entry_point, hyperparameters], sort_keys=True))[:12], index))
+        shutil.rmtree(run_dir, ignore_errors=True)
+        model_dir, output_dir = os.path.join(run_dir, 'model'), os.path.join(run_dir, 'output')
+        os.makedirs(model_dir)
+        os.makedirs(output_dir)
+        module_dir = os.path.abspath(source_dir) if source_dir else os.path.dirname(os.path.abspath(entry_point))
+        script = entry_point if os.path.isabs(entry_point) else os.path.join(module_dir, entry_point)
+        env = dict(os.environ, **sm_environment(hyperparameters, channels, model_dir, output_dir, module_dir, input_dir))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [module_dir, os.environ.get('PYTHONPATH')]))
+        env['PYTHONUNBUFFERED'] = '1'
+        start = time.time()
+        process = subprocess.Popen([self.python, script] + cli_args(hyperparameters), cwd=module_dir, env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        reader = threading.Thread(target=self._stream, args=(process, prefix), daemon=True)
+        reader.start()
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            returncode = process.wait()
+        reader.join()
+        return LocalRun(index, hyperparameters, returncode, time.time() - start, model_dir, output_dir)
+
+    def run(self, entry_point, hyperparameter_sets, channels, source_dir=None, max_parallel=None, timeout=None, input_dir=''):
+        from concurrent.futures import ThreadPoolExecutor
+        hyperparameter_sets = hyperparameter_sets or [{}]
+        workers = max(1, min(len(hyperparameter_sets), max_parallel or os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sm-local') as executor:
+            futures = [executor.submit(self.run_one, i, entry_point, hps, channels, source_dir, timeout,
+                                       '[{}] '.format(i) if len(hyperparameter_sets) > 1 else '', input_dir)
+                       for i, hps in enumerate(hyperparameter_sets)]
+            return [future.result() for future in futures]
+
+
+local_runner = LocalRunner()
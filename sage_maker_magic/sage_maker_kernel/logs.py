@@ -0,0 +1,46 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import re
+
+TRAINING_LOG_GROUP = '/aws/sagemaker/TrainingJobs'
+PROCESSING_LOG_GROUP = '/aws/sagemaker/ProcessingJobs'
+
+
+def log_streams(client, log_group, job_name):
+    paginator = client.get_paginator('describe_log_streams')
+    for page in paginator.paginate(logGroupName=log_group, logStreamNamePrefix=job_name + '/'):
+        for stream in page.get('logStreams', []):
+            yield stream['logStreamName']
+
+
+def follow_logs(client, log_group, job_name, offsets):
+    """
+        Yield (stream, message) for every CloudWatch event of `job_name` newer than `offsets`.
+
+        `offsets` maps stream name to the last nextForwardToken seen and is updated in place,
+        so the next call only reads events written since.
+    """
+    for stream in log_streams(client, log_group, job_name):
+        token = offsets.get(stream)
+        while True:
+            kwargs = {'nextToken': token} if token else {'startFromHead': True}
+            response = client.get_log_events(logGroupName=log_group, logStreamName=stream, **kwargs)
+            for event in response.get('events', []):
+                yield stream, event['message']
+            next_token = response.get('nextForwardToken')
+            if not next_token or next_token == token:
+                break
+            token = offsets[stream] = next_token
+
+
+def filter_logs(events, grep=None, tail=None):
+    """
+        Apply the --grep regex and keep only the last --tail lines while `events` is consumed.
+    """
+    if grep:
+        pattern = re.compile(grep)
+        events = ((stream, message) for stream, message in events if pattern.search(message))
+    if tail:
+        events = collections.deque(events, maxlen=tail)
+    return events
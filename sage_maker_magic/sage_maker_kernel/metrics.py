@@ -0,0 +1,234 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import json
+import os
+import time
+
+from .staging import STAGING_DIR, digest
+from .watch import TERMINAL_STATUSES
+
+METRICS_DIR = os.path.join(STAGING_DIR, 'metrics')
+## BatchGetMetrics accepts at most this many queries per request.
+MAX_QUERIES_PER_CALL = 100
+## A Search expression holds at most this many filters.
+MAX_SEARCH_FILTERS = 20
+## Metrics of a finished job can still arrive for a while; they are cached only after this.
+SETTLE_SECONDS = 600
+## metrics axis -> (XAxisType, Period)
+AXES = {'step': ('IterationNumber', 'IterationNumber'), 'time': ('Timestamp', 'OneMinute')}
+MAXIMIZE_HINTS = ('acc', 'auc', 'f1', 'precision', 'recall', 'map', 'iou', 'bleu', 'r2', 'score')
+CONVERGENCE_TOLERANCE = 0.01
+
+Series = collections.namedtuple('Series', ['job_name', 'metric', 'x', 'y'])
+
+
+def metric_names(response):
+    """
+        Names of the metrics a training job defines or reported, in definition order.
+    """
+    names = [d['Name'] for d in response.get('AlgorithmSpecification', {}).get('MetricDefinitions', [])]
+    names += [m['MetricName'] for m in response.get('FinalMetricDataList', [])]
+    return list(collections.OrderedDict.fromkeys(names))
+
+
+def search_training_jobs(client, job_names):
+    """
+        Describe-like records of `job_names` from Search, matching up to `MAX_SEARCH_FILTERS` names
+        per request. Jobs the search index does not hold yet (it lags creation) are left out.
+    """
+    found, wanted = {}, set(job_names)
+    for start in range(0, len(job_names), MAX_SEARCH_FILTERS):
+        filters = [{'Name': 'TrainingJobName', 'Operator': 'Equals', 'Value': name}
+                   for name in job_names[start:start + MAX_SEARCH_FILTERS]]
+        kwargs = {'Resource': 'TrainingJob', 'SearchExpression': {'Filters': filters, 'Operator': 'Or'}, 'MaxResults': 100}
+        while True:
+            page = client.search(**kwargs)
+            for result in page.get('Results', []):
+                job = result.get('TrainingJob')
+                if job and job.get('TrainingJobName') in wanted:
+                    found[job['TrainingJobName']] = job
+            if not page.get('NextToken'):
+                break
+            kwargs['NextToken'] = page['NextToken']
+    return found
+
+
+def goal_for(metric):
+    return 'maximize' if any(hint in metric.lower() for hint in MAXIMIZE_HINTS) else 'minimize'
+
+
+class MetricsStore(object):
+    """
+        Batched retrieval of training job metric series.
+
+        The series of every (job, metric) pair are requested with BatchGetMetrics, up to
+        `MAX_QUERIES_PER_CALL` per request, so a sweep of hundreds of jobs costs a handful of calls.
+        Series of jobs that finished more than `settle_seconds` ago are kept as JSON under `root`
+        and are not requested again.
+    """
+    def __init__(self, root=METRICS_DIR, settle_seconds=SETTLE_SECONDS, clock=time.time):
+        self.root = root
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+
+    def _path(self, job_arn, axis, stat):
+        return os.path.join(self.root, '{}.json'.format(digest(json.dumps([job_arn, axis, stat]))[:32]))
+
+    def _load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _save(self, path, series):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            ## dumps, unlike dump, uses the C encoder; series hold thousands of floats.
+            f.write(json.dumps(series))
+        os.replace(tmp_path, path)
+
+    def _settled(self, response):
+        if response.get('TrainingJobStatus') not in TERMINAL_STATUSES:
+            return False
+        ended = response.get('TrainingEndTime') or response.get('LastModifiedTime')
+        return ended is not None and self.clock() - ended.timestamp() >= self.settle_seconds
+
+    def fetch(self, client, jobs, axis='step', stat='Avg'):
+        """
+            Return the Series of `jobs`, a list of (job_name, describe response, metric names), and
+            fetch statistics: cached and fetched job counts, requests made and per-series errors.
+        """
+        import numpy as np
+
+        x_axis_type, period = AXES[axis]
+        stats = {'cached_jobs': 0, 'fetched_jobs': 0, 'requests': 0, 'truncated': [], 'errors': []}
+        found, queries, owners = {}, [], []
+        for job_name, response, names in jobs:
+            path = self._path(response['TrainingJobArn'], axis, stat)
+            cached = self._load(path) if self._settled(response) else None
+            if cached is not None and set(names) <= set(cached):
+                found[job_name] = {name: cached[name] for name in names}
+                stats['cached_jobs'] += 1
+                continue
+            found[job_name] = {}
+            stats['fetched_jobs'] += 1
+            for name in names:
+                queries.append({'MetricName': name, 'ResourceArn': response['TrainingJobArn'], 'MetricStat': stat,
+                                'Period': period, 'XAxisType': x_axis_type})
+                owners.append((job_name, name))
+
+        complete = {}
+        for start in range(0, len(queries), MAX_QUERIES_PER_CALL):
+            results = client.batch_get_metrics(MetricQueries=queries[start:start + MAX_QUERIES_PER_CALL])['MetricQueryResults']
+            stats['requests'] += 1
+            for (job_name, name), result in zip(owners[start:start + MAX_QUERIES_PER_CALL], results):
+                status = result.get('Status')
+                if status not in ('Complete', 'Truncated'):
+                    stats['errors'].append((job_name, name, result.get('Message', status)))
+                    complete[job_name] = False
+                    continue
+                if status == 'Truncated':
+                    stats['truncated'].append((job_name, name))
+                    complete[job_name] = False
+                found[job_name][name] = [result.get('XAxisValues', []), result.get('MetricValues', [])]
+                complete.setdefault(job_name, True)
+
+        for job_name, response, _ in jobs:
+            if complete.get(job_name) and self._settled(response):
+                self._save(self._path(response['TrainingJobArn'], axis, stat), found[job_name])
+
+        series = []
+        for job_name, _, names in jobs:
+            for name in names:
+                if name not in found[job_name]:
+                    continue
+                x, y = (np.asarray(values, dtype=float) for values in found[job_name][name])
+                order = np.argsort(x, kind='stable')
+                x, y = x[order], y[order]
+                if axis == 'time' and len(x):
+                    x = x - x[0]
+                series.append(Series(job_name, name, x, y))
+        return series, stats
+
+
+def align(series):
+    """
+        Place the series of each metric on the union of their x values.
+
+        Returns an ordered dict of metric -> (x, job names, values), where values has one row per
+        x and one column per job, NaN where a job has no point.
+    """
+    import numpy as np
+
+    by_metric = collections.OrderedDict()
+    for s in series:
+        by_metric.setdefault(s.metric, []).append(s)
+    aligned = collections.OrderedDict()
+    for metric, group in by_metric.items():
+        x = np.unique(np.concatenate([s.x for s in group]))
+        values = np.full((len(x), len(group)), np.nan)
+        for column, s in enumerate(group):
+            values[np.searchsorted(x, s.x), column] = s.y
+        aligned[metric] = (x, [s.job_name for s in group], values)
+    return aligned
+
+
+def metrics_frame(aligned, axis='step'):
+    """
+        The aligned series as one DataFrame indexed by step (or seconds) with (metric, job) columns.
+    """
+    import pandas as pd
+
+    if not aligned:
+        return pd.DataFrame()
+    frames = collections.OrderedDict((metric, pd.DataFrame(values, index=x, columns=jobs))
+                                     for metric, (x, jobs, values) in aligned.items())
+    frame = pd.concat(frames, axis=1)
+    frame.index.name = 'step' if axis == 'step' else 'seconds'
+    return frame
+
+
+def summarize(aligned, goal=None, tolerance=CONVERGENCE_TOLERANCE):
+    """
+        Final and best value, the step of the best value and the convergence step (first step
+        within `tolerance` of the value range from the best value) of every job and metric,
+        computed per metric over all jobs at once. `goal` defaults from the metric name.
+    """
+    import numpy as np
+    import pandas as pd
+
+    columns = ['metric', 'job_name', 'rank', 'goal', 'best', 'best_step', 'final', 'converged_step', 'points']
+    frames = []
+    for metric, (x, jobs, values) in aligned.items():
+        valid = ~np.isnan(values)
+        points = valid.sum(axis=0)
+        keep = points > 0
+        if not keep.any():
+            continue
+        values, valid, points = values[:, keep], valid[:, keep], points[keep]
+        jobs = [job for job, kept in zip(jobs, keep) if kept]
+        metric_goal = goal or goal_for(metric)
+        sign = -1.0 if metric_goal == 'maximize' else 1.0
+        columns_index = np.arange(values.shape[1])
+
+        final = values[len(x) - 1 - valid[::-1].argmax(axis=0), columns_index]
+        best_index = np.where(valid, sign * values, np.inf).argmin(axis=0)
+        best = values[best_index, columns_index]
+        span = np.where(valid, values, -np.inf).max(axis=0) - np.where(valid, values, np.inf).min(axis=0)
+        within = valid & (np.abs(values - best) <= tolerance * span)
+        converged_index = within.argmax(axis=0)
+
+        frame = pd.DataFrame({'metric': metric, 'job_name': jobs, 'goal': metric_goal, 'best': best,
+                              'best_step': x[best_index], 'final': final, 'converged_step': x[converged_index],
+                              'points': points})
+        frame['rank'] = (sign * frame['best']).rank(method='min').astype(int)
+        frames.append(frame.sort_values(['rank', 'job_name']))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+metrics_store = MetricsStore()
@@ -0,0 +1,134 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import hashlib
+import json
+import os
+import tarfile
+import threading
+import zipfile
+
+from .staging import STAGING_DIR, digest
+
+PACKAGES_DIR = os.path.join(STAGING_DIR, 'packages')
+SOURCE_DIR_PREFIX = 'sm-magic/sourcedir'
+
+Package = collections.namedtuple('Package', ['path', 'digest'])
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan(directory, previous=None):
+    """
+        Manifest of `directory` as {relative path: [size, mtime_ns, sha256]}.
+
+        Files whose size and mtime match `previous` keep their recorded hash, so only new or
+        modified files are read.
+    """
+    previous = previous or {}
+    files = {}
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, directory)
+            stat = os.stat(path)
+            known = previous.get(rel)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                files[rel] = known
+            else:
+                files[rel] = [stat.st_size, stat.st_mtime_ns, file_digest(path)]
+    return files
+
+
+class SourcePackager(object):
+    """
+        Incremental packaging of local code directories.
+
+        A manifest of file hashes and mtimes is kept per directory and format; the archive is
+        rebuilt only when the manifest or the extra files change, otherwise the archive built
+        last time is returned. `submit` runs packaging and compression on a worker thread so it
+        can overlap with config and role resolution.
+    """
+    def __init__(self, root=PACKAGES_DIR, max_workers=2):
+        self.root = root
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._dir_locks = collections.defaultdict(threading.Lock)
+
+    def submit(self, directory, extra_files=(), fmt='gztar'):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sm-package')
+        return self._executor.submit(self.package, directory, extra_files, fmt)
+
+    def package(self, directory, extra_files=(), fmt='gztar'):
+        """
+            Return the Package of `directory` plus `extra_files` (added at the archive root).
+            'gztar' puts the directory contents at the root, as sourcedir.tar.gz expects;
+            'zip' keeps the directory name, so the archive can go on a PYTHONPATH.
+        """
+        directory = os.path.abspath(directory)
+        state_path = os.path.join(self.root, '{}.json'.format(digest(directory + '\0' + fmt)[:16]))
+        with self._dir_locks[state_path]:
+            os.makedirs(self.root, exist_ok=True)
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+            except (IOError, ValueError):
+                state = {}
+            files = scan(directory, state.get('files'))
+            extras = sorted((os.path.basename(path), file_digest(path), path) for path in extra_files)
+            package_digest = digest(json.dumps([fmt, sorted((rel, meta[2]) for rel, meta in files.items()),
+                                                [extra[:2] for extra in extras]]))
+            archive = os.path.join(self.root, '{}.{}'.format(package_digest[:32], 'tar.gz' if fmt == 'gztar' else 'zip'))
+            if not os.path.exists(archive):
+                self._build(archive, directory, sorted(files), extras, fmt)
+            previous_archive = state.get('archive')
+            if previous_archive and previous_archive != archive and os.path.exists(previous_archive):
+                os.remove(previous_archive)
+            with open(state_path, 'w') as f:
+                json.dump({'files': files, 'archive': archive, 'digest': package_digest}, f)
+            return Package(archive, package_digest)
+
+    @staticmethod
+    def _build(archive, directory, relpaths, extras, fmt):
+        tmp_path = '{}.{}.tmp'.format(archive, threading.get_ident())
+        prefix = '' if fmt == 'gztar' else os.path.basename(directory)
+        if fmt == 'gztar':
+            with tarfile.open(tmp_path, 'w:gz') as tar:
+                for rel in relpaths:
+                    tar.add(os.path.join(directory, rel), arcname=rel)
+                for name, _, path in extras:
+                    tar.add(path, arcname=name)
+        else:
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for rel in relpaths:
+                    zf.write(os.path.join(directory, rel), arcname=os.path.join(prefix, rel))
+                for name, _, path in extras:
+                    zf.write(path, arcname=name)
+        os.replace(tmp_path, archive)
+
+    @staticmethod
+    def upload(package, s3_client, bucket, script_name, kms_key=None, prefix=SOURCE_DIR_PREFIX):
+        """
+            Upload a gztar Package under a content-addressed key below `prefix` and return its UploadedCode.
+        """
+        from sagemaker.fw_utils import UploadedCode
+        key = '/'.join(part for part in (prefix.strip('/'), package.digest, 'sourcedir.tar.gz') if part)
+        extra_args = {'ServerSideEncryption': 'aws:kms'}
+        if kms_key:
+            extra_args['SSEKMSKeyId'] = kms_key
+        s3_client.upload_file(package.path, bucket, key, ExtraArgs=extra_args)
+        return UploadedCode(s3_prefix='s3://{}/{}'.format(bucket, key), script_name=script_name)
+
+
+source_packager = SourcePackager()
@@ -0,0 +1,178 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+HISTORY_SIZE = 100
+
+Span = collections.namedtuple('Span', ['name', 'category', 'start', 'end', 'thread'])
+
+_NOOP = contextlib.nullcontext()
+
+
+class Trace(object):
+    def __init__(self, magic, method):
+        self.magic = magic
+        self.method = method
+        self.thread = threading.get_ident()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def seconds(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def phases(self):
+        totals = collections.OrderedDict()
+        for span in self.spans:
+            if span.category == 'phase':
+                totals[span.name] = totals.get(span.name, 0.0) + span.end - span.start
+        return totals
+
+    def aws_calls(self):
+        calls = collections.OrderedDict()
+        for span in self.spans:
+            if span.category == 'aws':
+                count, seconds = calls.get(span.name, (0, 0.0))
+                calls[span.name] = (count + 1, seconds + span.end - span.start)
+        return calls
+
+    def summary(self):
+        lines = ['{} {}: {:.3f}s'.format(self.magic, self.method, self.seconds)]
+        for name, seconds in self.phases().items():
+            lines.append('  {:<24} {:8.3f}s {:5.1f}%'.format(name, seconds, 100.0 * seconds / self.seconds if self.seconds else 0.0))
+        calls = self.aws_calls()
+        if calls:
+            lines.append('  aws calls: {}'.format(sum(count for count, _ in calls.values())))
+            for name, (count, seconds) in calls.items():
+                lines.append('    {:<30} x{:<4} {:8.3f}s'.format(name, count, seconds))
+        return '\n'.join(lines)
+
+
+class _Phase(object):
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(Span(self.name, 'phase', self.start, time.perf_counter(), threading.get_ident()))
+        return False
+
+
+class Profiler(object):
+    """
+        Per-phase timing of magic invocations.
+
+        While an invocation is profiled, `phase(name)` records a span and every AWS API call made by
+        the shared clients is recorded with its duration; otherwise `phase` returns a shared no-op
+        context, so instrumented code costs one attribute check. The trace belongs to the thread
+        running the invocation: background watchers are not counted, and work the invocation hands
+        to a thread pool is only counted when wrapped with `propagate`. Profiled invocations are
+        kept in a rolling history and can be exported as Chrome trace JSON (chrome://tracing, Perfetto).
+    """
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.always = False
+        self.history = collections.deque(maxlen=history_size)
+        self._local = threading.local()
+
+    @property
+    def _active(self):
+        return getattr(self._local, 'trace', None)
+
+    def propagate(self, func):
+        """
+            Wrap `func` so that, run on a worker thread, it records into the calling thread's trace.
+        """
+        trace = self._active
+        if trace is None:
+            return func
+
+        def traced(*args, **kwargs):
+            previous, self._local.trace = self._active, trace
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.trace = previous
+        return traced
+
+    def phase(self, name):
+        trace = self._active
+        if trace is None:
+            return _NOOP
+        return _Phase(trace, name)
+
+    def aws_call(self, operation, start, end):
+        trace = self._active
+        if trace is not None:
+            trace.add(Span(operation, 'aws', start, end, threading.get_ident()))
+
+    @contextlib.contextmanager
+    def profile(self, magic, method, enabled=False):
+        """
+            Profile one magic invocation if `enabled` or profiling is always on; yields the Trace or None.
+        """
+        if not (enabled or self.always) or self._active is not None:
+            yield None
+            return
+        trace = self._local.trace = Trace(magic, method)
+        try:
+            yield trace
+        finally:
+            trace.end = time.perf_counter()
+            self._local.trace = None
+            self.history.append(trace)
+
+    def table(self, last=None):
+        import pandas as pd
+        traces = list(self.history)[-last:] if last else list(self.history)
+        rows = []
+        for trace in traces:
+            phases = trace.phases()
+            slowest = max(phases.items(), key=lambda item: item[1]) if phases else ('', 0.0)
+            rows.append({
+                'started': time.strftime('%H:%M:%S', time.localtime(trace.started_at)),
+                'magic': trace.magic,
+                'method': trace.method,
+                'seconds': trace.seconds,
+                'aws_calls': sum(count for count, _ in trace.aws_calls().values()),
+                'slowest_phase': slowest[0],
+                'slowest_phase_s': slowest[1],
+            })
+        return pd.DataFrame(rows, columns=['started', 'magic', 'method', 'seconds', 'aws_calls', 'slowest_phase', 'slowest_phase_s'])
+
+    def chrome_trace(self, path, last=None):
+        traces = list(self.history)[-last:] if last else list(self.history)
+        events = []
+        for trace in traces:
+            base_us = trace.started_at * 1e6 - trace.start * 1e6
+            events.append({'name': '{} {}'.format(trace.magic, trace.method), 'cat': 'magic', 'ph': 'X', 'pid': os.getpid(),
+                           'tid': trace.thread, 'ts': base_us + trace.start * 1e6, 'dur': trace.seconds * 1e6})
+            for span in trace.spans:
+                events.append({'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': os.getpid(), 'tid': span.thread,
+                               'ts': base_us + span.start * 1e6, 'dur': (span.end - span.start) * 1e6})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+    def clear(self):
+        self.history.clear()
+
+
+profiler = Profiler()
@@ -0,0 +1,118 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import json
+import os
+import sqlite3
+import threading
+import time
+
+REGISTRY_PATH = os.environ.get('SM_MAGIC_REGISTRY_PATH', os.path.join(os.path.expanduser('~'), '.sagemaker-magic', 'jobs.sqlite'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    runtime_class TEXT NOT NULL,
+    args TEXT,
+    content_hash TEXT,
+    submitted_at REAL NOT NULL,
+    status TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_submitted_at ON jobs (submitted_at);
+CREATE INDEX IF NOT EXISTS jobs_runtime_class ON jobs (runtime_class, submitted_at);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (fingerprint, name)
+);
+CREATE INDEX IF NOT EXISTS fingerprints_created_at ON fingerprints (fingerprint, created_at);
+"""
+COLUMNS = ('name', 'kind', 'runtime_class', 'args', 'content_hash', 'submitted_at', 'status', 'updated_at')
+
+
+class JobRegistry(object):
+    """
+        SQLite record of every job submitted from the magics, kept outside the kernel so it
+        survives restarts. One connection is shared by the magics and guarded by a lock. The
+        last status written per job is remembered, so repeated describes of an unchanged job
+        do not write to disk.
+    """
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+        self._statuses = {}
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def record(self, name, kind, runtime_class, args=None, content_hash=None, status='Submitted'):
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO jobs (name, kind, runtime_class, args, content_hash, submitted_at, status, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (name, kind, runtime_class, json.dumps(args, sort_keys=True, default=str), content_hash, now, status, now))
+            self._statuses[name] = status
+
+    def update_status(self, name, status):
+        with self._lock:
+            if name in self._statuses and self._statuses[name] == status:
+                return
+            with self.connection:
+                self.connection.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE name = ? AND status IS NOT ?',
+                                        (status, time.time(), name, status))
+            self._statuses[name] = status
+
+    def record_fingerprint(self, fingerprint, name):
+        with self._lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO fingerprints (fingerprint, name, created_at) VALUES (?, ?, ?)',
+                                    (fingerprint, name, time.time()))
+
+    def jobs_with_fingerprint(self, fingerprint, since=None):
+        """
+            Names of the jobs submitted with `fingerprint` (after `since`), newest first.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT name FROM fingerprints WHERE fingerprint = ? AND created_at >= ? ORDER BY created_at DESC',
+                (fingerprint, since or 0)).fetchall()
+        return [row['name'] for row in rows]
+
+    def get(self, name):
+        with self._lock:
+            row = self.connection.execute('SELECT * FROM jobs WHERE name = ?', (name,)).fetchone()
+        return self._as_dict(row) if row is not None else None
+
+    def query(self, runtime_class=None, status=None, name_contains=None, since=None, limit=50):
+        clauses, params = [], []
+        for clause, value in (('runtime_class = ?', runtime_class), ('status = ?', status),
+                              ('name LIKE ?', '%{}%'.format(name_contains) if name_contains else None),
+                              ('submitted_at >= ?', since)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = 'SELECT * FROM jobs{} ORDER BY submitted_at DESC LIMIT ?'.format(
+            ' WHERE ' + ' AND '.join(clauses) if clauses else '')
+        with self._lock:
+            rows = self.connection.execute(sql, params + [limit]).fetchall()
+        return [self._as_dict(row) for row in rows]
+
+    @staticmethod
+    def _as_dict(row):
+        job = dict(zip(COLUMNS, (row[column] for column in COLUMNS)))
+        job['args'] = json.loads(job['args']) if job['args'] else {}
+        return job
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,205 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import gzip
+import json
+import os
+
+## Columns of the per-task chunk buffer.
+STAGE, TASK, PARTITION, DURATION, RUN_TIME, SHUFFLE_READ, SHUFFLE_WRITE, SPILL, INPUT = range(9)
+CHUNK_SIZE = 65536
+SAMPLE_SIZE = 4096
+TOP_K = 20
+
+
+def iter_event_log_lines(path, s3_client=None):
+    """
+        Yield raw lines of every event log file under `path`: a local file or directory, or an
+        S3 object or prefix. S3 objects are streamed, never downloaded as a whole.
+    """
+    if path.startswith('s3://'):
+        bucket, _, prefix = path[len('s3://'):].partition('/')
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in sorted(page.get('Contents', []), key=lambda o: o['Key']):
+                body = s3_client.get_object(Bucket=bucket, Key=obj['Key'])['Body']
+                if obj['Key'].endswith('.gz'):
+                    lines = gzip.GzipFile(fileobj=body)
+                else:
+                    lines = body.iter_lines()
+                for line in lines:
+                    yield line
+        return
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+    for file_path in files:
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rb') as f:
+            for line in f:
+                yield line
+
+
+class SparkEventLogAnalyzer(object):
+    """
+        Incremental, bounded-memory analysis of Spark event logs.
+
+        SparkListenerTaskEnd events are buffered into fixed-size chunks and reduced with NumPy:
+        per-stage totals and maxima are accumulated exactly, medians and percentiles come from
+        a uniform per-stage reservoir sample of `sample_size` tasks, and only the `top_k` slowest and largest-shuffle tasks of
+        each stage are kept as straggler and skew candidates.
+    """
+    def __init__(self, chunk_size=CHUNK_SIZE, sample_size=SAMPLE_SIZE, top_k=TOP_K, seed=0):
+        import numpy as np
+        self.np = np
+        self.chunk_size = chunk_size
+        self.sample_size = sample_size
+        self.top_k = top_k
+        self.rng = np.random.default_rng(seed)
+        self.stage_names = {}
+        self.stages = {}
+        self.tasks = 0
+        self.failed_tasks = 0
+        self._buffer = []
+
+    def feed(self, line):
+        if b'SparkListenerTaskEnd' in line[:64]:
+            self._task_end(json.loads(line))
+        elif b'SparkListenerStage' in line[:64]:
+            event = json.loads(line)
+            info = event.get('Stage Info', {})
+            if 'Stage ID' in info and info.get('Stage Name'):
+                self.stage_names[info['Stage ID']] = info['Stage Name']
+
+    def feed_all(self, lines):
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode('utf-8')
+            self.feed(line)
+        return self.finish()
+
+    def _task_end(self, event):
+        info = event.get('Task Info', {})
+        metrics = event.get('Task Metrics') or {}
+        if info.get('Failed'):
+            self.failed_tasks += 1
+        shuffle_read = metrics.get('Shuffle Read Metrics', {})
+        self._buffer.append((
+            event.get('Stage ID', -1),
+            info.get('Task ID', -1),
+            info.get('Index', -1),
+            info.get('Finish Time', 0) - info.get('Launch Time', 0),
+            metrics.get('Executor Run Time', 0),
+            shuffle_read.get('Remote Bytes Read', 0) + shuffle_read.get('Local Bytes Read', 0),
+            metrics.get('Shuffle Write Metrics', {}).get('Shuffle Bytes Written', 0),
+            metrics.get('Memory Bytes Spilled', 0) + metrics.get('Disk Bytes Spilled', 0),
+            metrics.get('Input Metrics', {}).get('Bytes Read', 0),
+        ))
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def _top(self, rows, column):
+        if len(rows) <= self.top_k:
+            return rows
+        return rows[self.np.argpartition(rows[:, column], -self.top_k)[-self.top_k:]]
+
+    def _reservoir(self, sample, seen, rows):
+        """
+            Algorithm R over a chunk: return a uniform sample of the `seen` stage rows `sample` was
+            drawn from plus `rows`.
+        """
+        np = self.np
+        fill = max(0, min(self.sample_size - len(sample), len(rows)))
+        if fill:
+            sample = np.concatenate([sample, rows[:fill]])
+            seen, rows = seen + fill, rows[fill:]
+        if not len(rows):
+            return sample
+        ## The stage's i-th row (0-based) takes slot r, drawn from [0, i], when r < sample_size.
+        slots = self.rng.integers(0, seen + np.arange(len(rows)) + 1)
+        hits = np.flatnonzero(slots < self.sample_size)[::-1]
+        ## A slot drawn by several rows ends up with the last of them, as in the sequential algorithm.
+        slots, last = np.unique(slots[hits], return_index=True)
+        sample[slots] = rows[hits[last]]
+        return sample
+
+    def _flush(self):
+        np = self.np
+        if not self._buffer:
+            return
+        chunk = np.asarray(self._buffer, dtype=np.float64)
+        self._buffer = []
+        self.tasks += len(chunk)
+        stage_ids, inverse = np.unique(chunk[:, STAGE], return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = {column: np.bincount(inverse, weights=chunk[:, column])
+                for column in (DURATION, RUN_TIME, SHUFFLE_READ, SHUFFLE_WRITE, SPILL, INPUT)}
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.cumsum(counts)[:-1]
+        for i, (stage_id, rows) in enumerate(zip(stage_ids, np.split(chunk[order], bounds))):
+            stage = self.stages.setdefault(int(stage_id), {
+                'tasks': 0, 'sums': dict.fromkeys(sums, 0.0), 'max_duration': 0.0, 'max_shuffle_read': 0.0,
+                'sample': np.empty((0, 2)), 'slowest': np.empty((0, chunk.shape[1])), 'largest': np.empty((0, chunk.shape[1]))})
+            stage['sample'] = self._reservoir(stage['sample'], stage['tasks'], rows[:, [DURATION, SHUFFLE_READ]])
+            stage['tasks'] += int(counts[i])
+            for column in sums:
+                stage['sums'][column] += float(sums[column][i])
+            stage['max_duration'] = max(stage['max_duration'], float(rows[:, DURATION].max()))
+            stage['max_shuffle_read'] = max(stage['max_shuffle_read'], float(rows[:, SHUFFLE_READ].max()))
+            stage['slowest'] = self._top(np.concatenate([stage['slowest'], rows]), DURATION)
+            stage['largest'] = self._top(np.concatenate([stage['largest'], rows]), SHUFFLE_READ)
+
+    def finish(self):
+        self._flush()
+        return self
+
+    def stage_table(self):
+        import pandas as pd
+        np = self.np
+        rows = []
+        for stage_id, stage in sorted(self.stages.items()):
+            durations, reads = stage['sample'][:, 0], stage['sample'][:, 1]
+            median_duration, p95_duration = np.percentile(durations, [50, 95])
+            median_read = float(np.median(reads))
+            rows.append({
+                'stage': stage_id,
+                'name': self.stage_names.get(stage_id, '')[:40],
+                'tasks': stage['tasks'],
+                'total_task_s': stage['sums'][DURATION] / 1000.0,
+                'median_task_s': median_duration / 1000.0,
+                'p95_task_s': p95_duration / 1000.0,
+                'max_task_s': stage['max_duration'] / 1000.0,
+                'shuffle_read_mb': stage['sums'][SHUFFLE_READ] / 2 ** 20,
+                'shuffle_write_mb': stage['sums'][SHUFFLE_WRITE] / 2 ** 20,
+                'spill_mb': stage['sums'][SPILL] / 2 ** 20,
+                'input_mb': stage['sums'][INPUT] / 2 ** 20,
+                'straggler_ratio': stage['max_duration'] / median_duration if median_duration else 0.0,
+                'skew_ratio': stage['max_shuffle_read'] / median_read if median_read else 0.0,
+            })
+        return pd.DataFrame(rows)
+
+    def _outliers(self, key, column, factor, minimum):
+        import pandas as pd
+        np = self.np
+        rows = []
+        for stage_id, stage in sorted(self.stages.items()):
+            median = float(np.median(stage['sample'][:, 0 if column == DURATION else 1]))
+            candidates = stage[key]
+            hits = candidates[(candidates[:, column] > factor * median) & (candidates[:, column] > minimum)]
+            for task in hits[np.argsort(-hits[:, column])]:
+                rows.append({'stage': stage_id, 'task': int(task[TASK]), 'partition': int(task[PARTITION]),
+                             'value': float(task[column]), 'stage_median': median,
+                             'ratio': float(task[column]) / median if median else float('inf')})
+        return pd.DataFrame(rows, columns=['stage', 'task', 'partition', 'value', 'stage_median', 'ratio'])
+
+    def stragglers(self, factor=3.0, min_duration_ms=1000):
+        """
+            Tasks slower than `factor` times their stage median (durations in ms).
+        """
+        return self._outliers('slowest', DURATION, factor, min_duration_ms)
+
+    def skewed_partitions(self, factor=3.0, min_bytes=2 ** 20):
+        """
+            Partitions reading more than `factor` times their stage median of shuffle bytes.
+        """
+        return self._outliers('largest', SHUFFLE_READ, factor, min_bytes)
@@ -0,0 +1,111 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+STAGING_DIR = os.environ.get('SM_MAGIC_STAGING_DIR', os.path.join(tempfile.gettempdir(), 'sm-magic'))
+MAX_STAGED_FILES = 64
+MAX_INDEX_ENTRIES = 1024
+
+
+def digest(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class CodeStaging(object):
+    """
+        Content-addressed staging of cell entry points and an index of uploaded source tarballs.
+
+        A cell body is written once to `cell_<digest>.py`, so identical cells map to the same file;
+        staged files are evicted least-recently-used beyond `max_files`. The index maps a code key
+        (entry point content and name, or source package digest, and region) to the S3 sourcedir.tar.gz
+        uploaded for it, so unchanged code is never uploaded twice.
+    """
+    def __init__(self, root=STAGING_DIR, max_files=MAX_STAGED_FILES, max_entries=MAX_INDEX_ENTRIES):
+        self.root = root
+        self.max_files = max_files
+        self.max_entries = max_entries
+        self.index_path = os.path.join(root, 'uploads.json')
+        self._lock = threading.Lock()
+        self._index = None
+
+    def stage(self, content):
+        os.makedirs(self.root, exist_ok=True)
+        local_file = os.path.join(self.root, 'cell_{}.py'.format(digest(content)[:16]))
+        if os.path.exists(local_file):
+            os.utime(local_file)
+        else:
+            with open(local_file, 'w') as f:
+                f.write(content)
+        self._evict()
+        return local_file
+
+    def _evict(self):
+        staged = [os.path.join(self.root, name) for name in os.listdir(self.root)
+                  if name.startswith('cell_') and name.endswith('.py')]
+        if len(staged) <= self.max_files:
+            return
+        staged.sort(key=lambda path: os.stat(path).st_mtime, reverse=True)
+        for path in staged[self.max_files:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def code_key(entry_point, region=None, package_digest=None):
+        if package_digest is not None:
+            return digest('\0'.join([package_digest, entry_point, region or '']))
+        with open(entry_point, 'rb') as f:
+            return digest('\0'.join([digest(f.read()), os.path.basename(entry_point), region or '']))
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(self.index_path) as f:
+                    self._index = json.load(f)
+            except (IOError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        entries = sorted(self._index.items(), key=lambda item: item[1]['used_at'], reverse=True)
+        self._index = dict(entries[:self.max_entries])
+        tmp_path = '{}.{}.tmp'.format(self.index_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, code_key):
+        """
+            Return {'s3_prefix', 'script_name'} of an earlier upload of the same code, or None.
+        """
+        if code_key is None:
+            return None
+        with self._lock:
+            entry = self._load().get(code_key)
+            if entry is not None:
+                entry['used_at'] = time.time()
+                self._save()
+            return entry
+
+    def remember(self, code_key, uploaded_code):
+        if code_key is None or uploaded_code is None:
+            return
+        with self._lock:
+            self._load()[code_key] = {
+                's3_prefix': uploaded_code.s3_prefix,
+                'script_name': uploaded_code.script_name,
+                'used_at': time.time()
+            }
+            self._save()
+
+
+code_staging = CodeStaging()
@@ -0,0 +1,281 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import gzip
+import json
+import os
+import re
+
+## Debugger writes system metrics under <S3OutputPath>/<job name>/ + this prefix.
+SYSTEM_PREFIX = 'profiler-output/system'
+## System monitor intervals Debugger accepts.
+PROFILER_INTERVALS_MS = (100, 200, 500, 1000, 5000, 60000)
+## Dimension (or name) of a system metric record -> reported kind.
+KINDS = {'CPUUtilization': 'cpu', 'I/OWaitPercentage': 'io_wait', 'GPUUtilization': 'gpu',
+         'GPUMemoryUtilization': 'gpu_memory', 'MemoryUsedPercent': 'memory'}
+KIND_NAMES = ('cpu', 'io_wait', 'gpu', 'gpu_memory', 'memory')
+## Columns of the record chunk buffer.
+HOST, KIND, DEVICE, TIME, VALUE = range(5)
+CHUNK_SIZE = 65536
+DEFAULT_RESOLUTION = 0.5
+PERCENTILES = (50, 95, 99)
+## Utilization percentages the bottleneck flags are raised at.
+CPU_BUSY = 90.0
+CPU_IDLE = 30.0
+GPU_LOW = 70.0
+GPU_MEMORY_LOW = 50.0
+GPU_SPREAD = 20.0
+IO_WAIT_HIGH = 30.0
+MEMORY_HIGH = 90.0
+NODE_FILE_NAME = re.compile(r'\.(algo-\d+)\.json')
+
+RECOMMENDATIONS = {
+    'cpu_bottleneck': 'GPUs wait on the CPU: use more data loader workers and prefetching, move augmentation to the GPU, '
+                      'or pick an instance type with more vCPUs per GPU.',
+    'io_bottleneck': 'Training waits on storage: stream input with FastFile or Pipe mode, shard and prefetch the data, '
+                     'or use a larger (faster) training volume.',
+    'low_gpu_utilization': 'GPUs are underused: increase the batch size while GPU memory allows, '
+                           'or use a smaller or single-GPU instance type.',
+    'gpu_imbalance': 'Work is unevenly spread over the GPUs of a host: check the distribution strategy and per-device batch sizes.',
+    'single_core_bound': 'One core is saturated while the others idle: parallelize data loading and preprocessing.',
+    'cpu_saturated': 'CPU is saturated: use a larger instance type or distribute over more instances.',
+    'underutilized': 'CPU and memory stay low: a smaller instance type would do.',
+    'memory_pressure': 'Memory is close to capacity: reduce the batch size or in-memory caching, or use an instance with more memory.',
+}
+
+
+def iter_system_metric_lines(path, s3_client=None):
+    """
+        Yield (node, raw line) of every system metrics file under `path`: a local file or
+        directory, for example recorded fixtures, or an S3 object or prefix. S3 objects are
+        streamed, never downloaded as a whole. The node comes from the file name
+        (`<timestamp>.algo-1.json`) and is None if the name has none.
+    """
+    def node_of(name):
+        match = NODE_FILE_NAME.search(os.path.basename(name))
+        return match.group(1) if match else None
+
+    if path.startswith('s3://'):
+        bucket, _, prefix = path[len('s3://'):].partition('/')
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in sorted(page.get('Contents', []), key=lambda o: o['Key']):
+                if not obj['Key'].endswith(('.json', '.json.gz')):
+                    continue
+                body = s3_client.get_object(Bucket=bucket, Key=obj['Key'])['Body']
+                lines = gzip.GzipFile(fileobj=body) if obj['Key'].endswith('.gz') else body.iter_lines()
+                node = node_of(obj['Key'])
+                for line in lines:
+                    yield node, line
+        return
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+                       if name.endswith(('.json', '.json.gz')))
+    else:
+        files = [path]
+    for file_path in files:
+        opener = gzip.open if file_path.endswith('.gz') else open
+        node = node_of(file_path)
+        with opener(file_path, 'rb') as f:
+            for line in f:
+                yield node, line
+
+
+class SystemMetricsAnalyzer(object):
+    """
+        Incremental, bounded-memory reduction of Debugger system metrics.
+
+        Records are buffered into fixed-size chunks and reduced with NumPy to per host, kind and
+        time slot (`resolution` seconds) sums, counts and device maxima, so memory grows with the
+        length of the job, not with its number of cores and GPUs. Per-device means are kept
+        exactly for imbalance checks. Utilization percentiles are taken over the slot means.
+    """
+    def __init__(self, resolution=DEFAULT_RESOLUTION, chunk_size=CHUNK_SIZE):
+        import numpy as np
+        self.np = np
+        self.resolution = resolution
+        self.chunk_size = chunk_size
+        self.hosts = {}
+        self.devices = {}
+        self.records = 0
+        self.skipped = 0
+        self.slots = np.empty((0, 6))
+        self._device_totals = {}
+        self._buffer = []
+
+    def _intern(self, table, name):
+        index = table.get(name)
+        if index is None:
+            index = table[name] = len(table)
+        return index
+
+    def feed(self, line, node=None):
+        self.feed_records(self._parse([line]), node)
+
+    def feed_records(self, records, node=None):
+        for record in records:
+            try:
+                kind = KINDS.get(record.get('Dimension')) or KINDS.get(record.get('Name'))
+                value, timestamp = float(record['Value']), float(record['Timestamp'])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                kind = None
+            if kind is None:
+                self.skipped += 1
+                continue
+            host = self._intern(self.hosts, record.get('NodeID') or node or 'algo-1')
+            device = self._intern(self.devices, record.get('Name') or kind)
+            self._buffer.append((host, KIND_NAMES.index(kind), device, timestamp, value))
+            if len(self._buffer) >= self.chunk_size:
+                self._flush()
+
+    def _parse(self, lines):
+        """
+            Decode JSON lines with one json.loads call for the batch, line by line only if one is malformed.
+        """
+        lines = [line.encode('utf-8') if isinstance(line, str) else line for line in lines]
+        try:
+            return json.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    self.skipped += 1
+            return records
+
+    def feed_all(self, lines):
+        batch, batch_node = [], None
+        for node, line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if node != batch_node or len(batch) >= self.chunk_size:
+                self.feed_records(self._parse(batch), batch_node)
+                batch, batch_node = [], node
+            batch.append(line)
+        self.feed_records(self._parse(batch), batch_node)
+        return self.finish()
+
+    def _group(self, keys, values, counts=None, maxima=None):
+        """
+            Sum, count and max of `values` per unique row of the integer `keys`.
+        """
+        np = self.np
+        keys = keys.astype(np.int64)
+        low = keys.min(axis=0)
+        ## One flat code per key row: a 1-d unique is much faster than unique(axis=0).
+        codes = np.ravel_multi_index((keys - low).T, tuple(keys.max(axis=0) - low + 1))
+        _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        unique = keys[first]
+        sums = np.bincount(inverse, weights=values, minlength=len(unique))
+        totals = np.bincount(inverse, weights=counts, minlength=len(unique)) if counts is not None else \
+            np.bincount(inverse, minlength=len(unique)).astype(float)
+        peaks = np.full(len(unique), -np.inf)
+        np.maximum.at(peaks, inverse, values if maxima is None else maxima)
+        return unique, sums, totals, peaks
+
+    def _flush(self):
+        np = self.np
+        if not self._buffer:
+            return
+        chunk = np.asarray(self._buffer, dtype=np.float64)
+        self._buffer = []
+        self.records += len(chunk)
+        slot = np.floor(chunk[:, TIME] / self.resolution)
+        keys, sums, counts, peaks = self._group(np.column_stack([chunk[:, HOST], chunk[:, KIND], slot]), chunk[:, VALUE])
+        self.slots = np.concatenate([self.slots, np.column_stack([keys, sums, counts, peaks])])
+        device_keys, device_sums, device_counts, _ = self._group(chunk[:, [HOST, KIND, DEVICE]], chunk[:, VALUE])
+        for key, total, count in zip(map(tuple, device_keys.astype(int)), device_sums, device_counts):
+            sums_counts = self._device_totals.setdefault(key, [0.0, 0.0])
+            sums_counts[0] += total
+            sums_counts[1] += count
+
+    def finish(self):
+        self._flush()
+        if len(self.slots):
+            ## A slot split over two chunks appears twice; merge them.
+            keys, sums, counts, peaks = self._group(self.slots[:, :3], self.slots[:, 3], self.slots[:, 4], self.slots[:, 5])
+            self.slots = self.np.column_stack([keys, sums, counts, peaks])
+        return self
+
+    @property
+    def seconds(self):
+        if not len(self.slots):
+            return 0.0
+        return float(self.slots[:, 2].max() - self.slots[:, 2].min() + 1) * self.resolution
+
+    def utilization_table(self):
+        """
+            Per host and kind: percentiles, mean and max of the slot means, the 95th percentile of
+            the busiest device per slot, and the spread between the device means.
+        """
+        import pandas as pd
+        np = self.np
+        host_names = {index: name for name, index in self.hosts.items()}
+        columns = ['host', 'kind', 'p50', 'p95', 'p99', 'mean', 'max', 'busiest_device_p95', 'devices', 'device_spread', 'samples']
+        rows = []
+        order = np.lexsort((self.slots[:, 2], self.slots[:, 1], self.slots[:, 0]))
+        slots = self.slots[order]
+        groups, starts = np.unique(slots[:, :2], axis=0, return_index=True)
+        for (host, kind), rows_slice in zip(groups.astype(int), np.split(slots, starts[1:])):
+            means = rows_slice[:, 3] / rows_slice[:, 4]
+            device_means = [total / count for (h, k, _), (total, count) in self._device_totals.items() if h == host and k == kind]
+            p50, p95, p99 = np.percentile(means, PERCENTILES)
+            rows.append({
+                'host': host_names[host],
+                'kind': KIND_NAMES[kind],
+                'p50': p50,
+                'p95': p95,
+                'p99': p99,
+                'mean': float(means.mean()),
+                'max': float(means.max()),
+                'busiest_device_p95': float(np.percentile(rows_slice[:, 5], 95)),
+                'devices': len(device_means),
+                'device_spread': max(device_means) - min(device_means),
+                'samples': len(means),
+            })
+        return pd.DataFrame(rows, columns=columns)
+
+    def bottlenecks(self, table=None):
+        """
+            Bottleneck flags per host with the evidence behind them; see RECOMMENDATIONS.
+        """
+        import pandas as pd
+        table = self.utilization_table() if table is None else table
+        rows = []
+        for host, host_table in table.groupby('host', sort=True):
+            stats = {row.kind: row for row in host_table.itertuples(index=False)}
+            cpu, gpu, gpu_memory = stats.get('cpu'), stats.get('gpu'), stats.get('gpu_memory')
+            io_wait, memory = stats.get('io_wait'), stats.get('memory')
+            flags = []
+            if io_wait is not None and io_wait.p95 >= IO_WAIT_HIGH:
+                flags.append(('io_bottleneck', 'I/O wait p95 {:.0f}%'.format(io_wait.p95)))
+            if gpu is not None:
+                if gpu.p95 < GPU_LOW:
+                    if cpu is not None and cpu.p50 >= CPU_BUSY:
+                        flags.append(('cpu_bottleneck', 'GPU p95 {:.0f}%, CPU p50 {:.0f}%'.format(gpu.p95, cpu.p50)))
+                    elif not flags:
+                        flags.append(('low_gpu_utilization', 'GPU p95 {:.0f}%{}'.format(
+                            gpu.p95, ', GPU memory p95 {:.0f}%'.format(gpu_memory.p95) if gpu_memory is not None else '')))
+                if gpu.devices > 1 and gpu.device_spread >= GPU_SPREAD:
+                    flags.append(('gpu_imbalance', 'GPU means differ by {:.0f} points over {} GPUs'.format(gpu.device_spread, gpu.devices)))
+            elif cpu is not None:
+                if cpu.p50 >= CPU_BUSY:
+                    flags.append(('cpu_saturated', 'CPU p50 {:.0f}%'.format(cpu.p50)))
+                elif cpu.p95 < CPU_IDLE and (memory is None or memory.p95 < CPU_IDLE):
+                    flags.append(('underutilized', 'CPU p95 {:.0f}%{}'.format(
+                        cpu.p95, ', memory p95 {:.0f}%'.format(memory.p95) if memory is not None else '')))
+            if cpu is not None and cpu.devices > 1 and cpu.busiest_device_p95 >= CPU_BUSY and cpu.p50 < CPU_BUSY / 2:
+                flags.append(('single_core_bound', 'busiest core p95 {:.0f}%, CPU p50 {:.0f}%'.format(cpu.busiest_device_p95, cpu.p50)))
+            if memory is not None and memory.p99 >= MEMORY_HIGH:
+                flags.append(('memory_pressure', 'memory p99 {:.0f}%'.format(memory.p99)))
+            rows += [{'host': host, 'flag': flag, 'evidence': evidence} for flag, evidence in flags]
+        return pd.DataFrame(rows, columns=['host', 'flag', 'evidence'])
+
+    @staticmethod
+    def recommendations(flags):
+        """
+            One line per raised flag with the hosts it was raised for.
+        """
+        return ['{} ({}): {}'.format(flag, ', '.join(sorted(group['host'])), RECOMMENDATIONS[flag])
+                for flag, group in flags.groupby('flag', sort=False)]
@@ -0,0 +1,154 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import itertools
+import random
+import threading
+import time
+
+THROTTLING_CODES = frozenset([
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestThrottledException', 'RequestThrottled',
+    'TooManyRequestsException', 'RequestLimitExceeded', 'ProvisionedThroughputExceededException', 'SlowDown',
+])
+TRANSIENT_CODES = frozenset(['InternalFailure', 'InternalServerError', 'ServiceUnavailable', 'RequestTimeout'])
+## Operations that may have taken effect when they fail with a transient or connection error, so
+## retrying them could start or stop a second job; they are only retried when throttled.
+NON_IDEMPOTENT_PREFIXES = ('Create', 'Stop')
+
+## operation: (requests per second, burst). Operations not listed use DEFAULT_BUDGET.
+API_BUDGETS = {
+    'CreateTrainingJob': (2.0, 4),
+    'CreateProcessingJob': (2.0, 4),
+    'StopTrainingJob': (2.0, 4),
+    'StopProcessingJob': (2.0, 4),
+    'DescribeTrainingJob': (8.0, 16),
+    'DescribeProcessingJob': (8.0, 16),
+    'ListTrainingJobs': (2.0, 4),
+    'ListProcessingJobs': (2.0, 4),
+    'DescribeLogStreams': (5.0, 5),
+    'GetLogEvents': (10.0, 10),
+}
+DEFAULT_BUDGET = (5.0, 10)
+MAX_ATTEMPTS = 8
+BASE_DELAY = 0.2
+MAX_DELAY = 20.0
+MIN_RATE_FRACTION = 0.1
+RECOVERY_FRACTION = 0.1
+
+
+class TokenBucket(object):
+    """
+        Token bucket whose refill rate halves on every throttle and recovers additively on success.
+
+        `reserve` always takes a token, possibly going into debt, and returns how long the caller
+        must sleep before using it, so concurrent callers queue up instead of racing.
+    """
+    def __init__(self, rate, burst):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+class RateLimiter(object):
+    """
+        Client-side rate limiter for AWS API calls with one token bucket per operation.
+
+        Throttling errors slow the operation's bucket down and are retried with full-jitter
+        exponential backoff, as are transient service and connection errors of idempotent
+        operations; everything else is raised unchanged. Per-operation counters record calls, throttles, retries and time spent waiting.
+    """
+    def __init__(self, budgets=None, default_budget=DEFAULT_BUDGET, max_attempts=MAX_ATTEMPTS,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY, sleep=time.sleep):
+        self.budgets = dict(API_BUDGETS, **(budgets or {}))
+        self.default_budget = default_budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._counters = {}
+
+    def bucket(self, operation):
+        with self._lock:
+            if operation not in self._buckets:
+                self._buckets[operation] = TokenBucket(*self.budgets.get(operation, self.default_budget))
+            return self._buckets[operation]
+
+    def _count(self, operation, **increments):
+        with self._lock:
+            counters = self._counters.setdefault(operation, dict.fromkeys(
+                ('calls', 'throttled', 'retries', 'failed', 'wait_s'), 0))
+            for key, value in increments.items():
+                counters[key] += value
+
+    def _wait(self, operation, seconds):
+        if seconds > 0:
+            self.sleep(seconds)
+            self._count(operation, wait_s=seconds)
+
+    def call(self, operation, func, *args, **kwargs):
+        from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+        bucket = self.bucket(operation)
+        idempotent = not operation.startswith(NON_IDEMPOTENT_PREFIXES)
+        for attempt in itertools.count(1):
+            self._wait(operation, bucket.reserve())
+            try:
+                result = func(*args, **kwargs)
+            except (ClientError, ConnectionError, HTTPClientError) as e:
+                code = e.response.get('Error', {}).get('Code') if isinstance(e, ClientError) else 'Connection'
+                if code in THROTTLING_CODES:
+                    bucket.throttled()
+                    self._count(operation, throttled=1)
+                elif not idempotent or (code not in TRANSIENT_CODES and code != 'Connection'):
+                    raise
+                if attempt >= self.max_attempts:
+                    self._count(operation, failed=1)
+                    raise
+                self._count(operation, retries=1)
+                self._wait(operation, random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                continue
+            bucket.succeeded()
+            self._count(operation, calls=1)
+            return result
+
+    def install(self, client):
+        """
+            Route every API call of a botocore `client` through the limiter, including calls made
+            by its paginators and waiters and by the SageMaker session that wraps it.
+        """
+        make_api_call = client._make_api_call
+
+        def limited_api_call(operation_name, api_params):
+            return self.call(operation_name, make_api_call, operation_name, api_params)
+
+        client._make_api_call = limited_api_call
+        return client
+
+    def stats(self):
+        with self._lock:
+            return {operation: dict(counters, rate=self._buckets[operation].rate)
+                    for operation, counters in self._counters.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters.clear()
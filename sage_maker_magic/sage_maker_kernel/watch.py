@@ -0,0 +1,105 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import asyncio
+import threading
+import time
+
+TERMINAL_STATUSES = ('Completed', 'Failed', 'Stopped')
+
+
+class JobWatcher(object):
+    """
+        Polls a SageMaker job without holding the kernel thread.
+
+        The blocking describe call runs in the loop's default executor, the poll interval
+        backs off exponentially while the status is unchanged and resets on every transition.
+        A failed describe (throttling, network) is shown as a transition and retried with backoff.
+        Transitions are pushed to an updating display; `cancel()` stops the poller.
+    """
+    def __init__(self, job_name, describe, status_keys, min_interval=5.0, max_interval=60.0, backoff=1.5):
+        self.job_name = job_name
+        self.describe = describe
+        self.status_keys = status_keys
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.transitions = []
+        self.last_response = None
+        self.errors = 0
+        self.task = None
+        self._display = None
+        self._started_at = None
+
+    @property
+    def status(self):
+        return self.transitions[-1][1] if self.transitions else None
+
+    @property
+    def done(self):
+        return self.task is not None and self.task.done()
+
+    def _status_of(self, response):
+        return ' / '.join(str(response[k]) for k in self.status_keys if response.get(k))
+
+    def _render(self):
+        lines = ['{}: {}'.format(self.job_name, self.status or 'waiting for first status')]
+        for at, status in self.transitions:
+            lines.append('  +{:7.0f}s  {}'.format(at - self._started_at, status))
+        return '\n'.join(lines)
+
+    def _update_display(self):
+        from IPython.display import Pretty, display
+        if self._display is None:
+            self._display = display(Pretty(self._render()), display_id=True)
+        else:
+            self._display.update(Pretty(self._render()))
+
+    def _transition(self, status):
+        if status == self.status:
+            return False
+        self.transitions.append((time.time(), status))
+        self._update_display()
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        interval = self.min_interval
+        while True:
+            try:
+                self.last_response = await loop.run_in_executor(None, self.describe, self.job_name)
+            except Exception as e:
+                self.errors += 1
+                self._transition('describe failed, retrying: {}: {}'.format(type(e).__name__, e))
+                interval = min(interval * self.backoff, self.max_interval)
+                await asyncio.sleep(interval)
+                continue
+            if self._transition(self._status_of(self.last_response)):
+                interval = self.min_interval
+            else:
+                interval = min(interval * self.backoff, self.max_interval)
+            if self.last_response.get(self.status_keys[0]) in TERMINAL_STATUSES:
+                return self.last_response
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """
+            Schedule the poller on the running event loop (the kernel's loop inside Jupyter),
+            or on a daemon thread with its own loop when none is running.
+        """
+        self._started_at = time.time()
+        self._update_display()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            self.task = asyncio.run_coroutine_threadsafe(self._run(), loop)
+            self.task.add_done_callback(lambda _: loop.call_soon_threadsafe(loop.stop))
+        else:
+            self.task = loop.create_task(self._run())
+        return self
+
+    def cancel(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            self._transition('watch cancelled')
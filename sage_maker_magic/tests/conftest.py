@@ -0,0 +1,35 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+WORKDIR = tempfile.mkdtemp(prefix='sm-magic-tests-')
+## The magics read these at import time; they must point at scratch space before any test imports them.
+os.environ.setdefault('SM_MAGIC_STAGING_DIR', os.path.join(WORKDIR, 'staging'))
+os.environ.setdefault('SM_MAGIC_REGISTRY_PATH', os.path.join(WORKDIR, 'jobs.sqlite'))
+os.environ.setdefault('DEFAULT_SM_CONFIG_PATH', os.path.join(ROOT, '..', 'config', 'default.conf'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'test')
+os.environ.setdefault('SAGEMAKER_SUPPRESS_V2_WARNING', '1')
+sys.path.insert(0, ROOT)
+
+import pytest
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def shell():
+    """
+        In-process IPython shell with the magics loaded.
+    """
+    from IPython.testing.globalipapp import start_ipython
+    ip = start_ipython()
+    ip.run_line_magic('load_ext', 'sage_maker_kernel.kernelmagics')
+    return ip
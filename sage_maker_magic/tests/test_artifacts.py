@@ -0,0 +1,45 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+from sage_maker_kernel.artifacts import ArtifactCache
+
+ETAG = '"model"'
+
+
+class RangedS3(object):
+    def __init__(self, body):
+        self.body = body
+
+    def head_object(self, Bucket, Key):
+        return {'ETag': ETAG, 'ContentLength': len(self.body)}
+
+    def get_object(self, Bucket, Key, Range, IfMatch=None):
+        first, last = (int(value) for value in Range[len('bytes='):].split('-'))
+        return {'Body': io.BytesIO(self.body[first:last + 1])}
+
+
+def test_digest_covers_the_whole_object_when_tar_stops_early(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        data = b'weights' * 100
+        info = tarfile.TarInfo('model.pth')
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    ## Padding past the end-of-archive marker, which tarfile's stream mode never reads.
+    body = buffer.getvalue() + b'\0' * 64 * 1024
+
+    cache = ArtifactCache(root=str(tmp_path), part_size=1024, max_workers=2)
+    artifact = cache.fetch('s3://bucket/output/model.tar', RangedS3(body))
+
+    with open(os.path.join(artifact.path, 'model.pth'), 'rb') as f:
+        assert f.read() == data
+    [meta_name] = [name for name in os.listdir(str(tmp_path)) if name.endswith('.json')]
+    with open(os.path.join(str(tmp_path), meta_name)) as f:
+        meta = json.load(f)
+    assert meta['sha256'] == hashlib.sha256(body).hexdigest()
+    assert meta['downloaded_bytes'] == len(body)
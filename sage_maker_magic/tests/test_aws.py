@@ -0,0 +1,99 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import collections
+import datetime
+
+import pytest
+
+ROLE = 'arn:aws:iam::123456789012:role/test'
+SUBMIT_LINE = ('submit --source_dir s3://bucket/code/sourcedir.tar.gz --entry_point train.py '
+               '--output_path s3://bucket/output --framework_version 1.13 --py_version py39 '
+               '--channel_training s3://bucket/train --channel_testing s3://bucket/test')
+CALLS = 5
+
+
+def describe_response(job_name):
+    return {
+        'TrainingJobName': job_name,
+        'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:123456789012:training-job/{}'.format(job_name),
+        'TrainingJobStatus': 'InProgress',
+        'SecondaryStatus': 'Training',
+        'AlgorithmSpecification': {'TrainingInputMode': 'File'},
+        'ResourceConfig': {'InstanceCount': 1, 'VolumeSizeInGB': 30},
+        'StoppingCondition': {'MaxRuntimeInSeconds': 86400},
+        'ModelArtifacts': {'S3ModelArtifacts': 's3://bucket/output/{}/output/model.tar.gz'.format(job_name)},
+        'CreationTime': datetime.datetime.now(datetime.timezone.utc),
+    }
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """
+        The shared AwsProvider, reset, with client constructions on its boto3 session and execution
+        role lookups counted. The SDK's telemetry (an STS call and plain HTTP) is switched off.
+    """
+    import sagemaker
+    import sagemaker.telemetry.telemetry_logging as telemetry
+    from sage_maker_kernel.aws import aws
+
+    aws.reset()
+    counts = {'clients': collections.Counter(), 'roles': 0}
+
+    def get_execution_role(sagemaker_session=None):
+        counts['roles'] += 1
+        return ROLE
+
+    monkeypatch.setattr(sagemaker, 'get_execution_role', get_execution_role)
+    monkeypatch.setattr(telemetry, '_send_telemetry_request', lambda *args, **kwargs: None)
+    session = aws.boto_session()
+    create_client = session.client
+
+    def client(service_name, *args, **kwargs):
+        counts['clients'][service_name] += 1
+        return create_client(service_name, *args, **kwargs)
+
+    monkeypatch.setattr(session, 'client', client)
+    yield aws, counts
+    aws.reset()
+
+
+def test_magic_calls_share_one_client_and_one_role_lookup(shell, provider):
+    from botocore.stub import Stubber
+
+    aws, counts = provider
+    stubber = Stubber(aws.client('sagemaker'))
+    s3_stubber = Stubber(aws.client('s3'))
+    first_round = None
+    with stubber, s3_stubber:
+        for i in range(CALLS):
+            s3_stubber.add_response('head_object', {'ETag': '"code"'}, {'Bucket': 'bucket', 'Key': 'code/sourcedir.tar.gz'})
+            stubber.add_response('create_training_job', {'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:123456789012:training-job/x'})
+            shell.run_line_magic('pytorch', SUBMIT_LINE)
+            job_name = shell.user_ns['___PyTorch_latest_job_name']
+            stubber.add_response('describe_training_job', describe_response(job_name), {'TrainingJobName': job_name})
+            shell.run_line_magic('pytorch', 'status')
+            stubber.add_response('list_training_jobs', {'TrainingJobSummaries': []})
+            shell.run_line_magic('pytorch', 'list --no_index')
+            first_round = first_round or dict(counts['clients'])
+        stubber.assert_no_pending_responses()
+        s3_stubber.assert_no_pending_responses()
+
+    ## The SDK session builds its own S3 and runtime clients once; nothing is built again per call.
+    assert dict(counts['clients']) == first_round
+    assert counts['clients']['sagemaker'] == 1
+    assert counts['roles'] == 1
+
+
+def test_submit_without_reuse_does_not_warn_about_an_unreadable_source_dir(shell, provider, capsys):
+    from botocore.stub import Stubber
+
+    aws, _ = provider
+    stubber = Stubber(aws.client('sagemaker'))
+    s3_stubber = Stubber(aws.client('s3'))
+    with stubber, s3_stubber:
+        stubber.add_response('create_training_job', {'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:123456789012:training-job/x'})
+        s3_stubber.add_client_error('head_object', '403', 'Forbidden', 403)
+        shell.run_line_magic('pytorch', SUBMIT_LINE)
+        stubber.assert_no_pending_responses()
+        s3_stubber.assert_no_pending_responses()
+    assert 'warning: cannot read' not in capsys.readouterr().out
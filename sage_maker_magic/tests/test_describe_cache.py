@@ -0,0 +1,120 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import random
+import threading
+import time
+
+import pytest
+
+from sage_maker_kernel.describe_cache import STATUS_RANK, DescribeCache
+from sage_maker_kernel.watch import TERMINAL_STATUSES
+
+STATUS_KEY = 'TrainingJobStatus'
+PROGRESSIONS = (('InProgress', 'Completed'), ('InProgress', 'Failed'), ('InProgress', 'Stopping', 'Stopped'))
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_cached_status_never_goes_backwards(seed):
+    """
+        Describes that lag the job (eventually consistent reads return any status it already had) never
+        move the cached status back, and a finished job is not described again.
+    """
+    rng = random.Random(seed)
+    clock = Clock()
+    cache = DescribeCache(ttl=2.0, clock=clock)
+    progression = rng.choice(PROGRESSIONS)
+    reached = [0]
+    calls = []
+
+    def describe(job_name):
+        calls.append(job_name)
+        reached[0] = min(len(progression) - 1, reached[0] + rng.randint(0, 1))
+        return {STATUS_KEY: progression[rng.randint(0, reached[0])]}
+
+    seen = []
+    for _ in range(200):
+        clock.now += rng.choice((0.0, 0.5, 1.0, 3.0))
+        status = cache.get('training', 'job', describe, STATUS_KEY)[STATUS_KEY]
+        if seen:
+            assert STATUS_RANK[status] >= STATUS_RANK[seen[-1]]
+        if seen and seen[-1] in TERMINAL_STATUSES:
+            assert status == seen[-1]
+        seen.append(status)
+        if rng.random() < 0.1:
+            cache.invalidate('training', 'job')
+    terminal = [i for i, status in enumerate(seen) if status in TERMINAL_STATUSES]
+    if terminal:
+        assert len(calls) <= terminal[0] + 1
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_concurrent_describes_coalesce_into_one_call(seed):
+    rng = random.Random(seed)
+    cache = DescribeCache(ttl=60.0)
+    threads_count = rng.randint(2, 32)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def describe(job_name):
+        calls.append(job_name)
+        started.set()
+        release.wait(5)
+        return {STATUS_KEY: 'InProgress', 'call': len(calls)}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('training', 'job', describe, STATUS_KEY)))
+               for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    ## Let the other lookups reach the in-flight describe before it returns.
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ['job']
+    assert len(results) == threads_count
+    assert all(result is results[0] for result in results)
+    assert cache.misses == 1
+
+
+def test_concurrent_describe_errors_reach_every_caller_and_are_not_cached():
+    cache = DescribeCache(ttl=60.0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def failing_describe(job_name):
+        calls.append(job_name)
+        started.set()
+        release.wait(5)
+        raise RuntimeError('ThrottlingException')
+
+    errors = []
+
+    def lookup():
+        try:
+            cache.get('training', 'job', failing_describe, STATUS_KEY)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ['job']
+    assert len(errors) == 8
+    assert cache.get('training', 'job', lambda job_name: {STATUS_KEY: 'Completed'}, STATUS_KEY) == {STATUS_KEY: 'Completed'}
@@ -0,0 +1,39 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import pytest
+
+from sage_maker_kernel.distribution import DistributionError, default_processes_per_host, validate_distribution
+
+ROLE = 'arn:aws:iam::123456789012:role/test'
+SUBMIT_LINE = ('submit --source_dir s3://bucket/code/sourcedir.tar.gz --entry_point train.py --framework_version 1.13 '
+               '--py_version py39 --distribution horovod --instance_type ml.p3.2xlarge')
+
+
+@pytest.mark.parametrize('instance_type, processes', [('ml.p3.2xlarge', 1), ('ml.p3.8xlarge', 4), ('ml.p3.16xlarge', 4),
+                                                      ('ml.c5.xlarge', 4)])
+def test_default_processes_per_host_fit_the_gpus(instance_type, processes):
+    assert default_processes_per_host(instance_type, 4) == processes
+    assert validate_distribution('horovod', 'PyTorch', '1.13', instance_type, 1, processes) == []
+
+
+def test_explicit_processes_per_host_over_the_gpus_are_rejected():
+    with pytest.raises(DistributionError, match='more than the 1 GPU'):
+        validate_distribution('horovod', 'PyTorch', '1.13', 'ml.p3.2xlarge', 1, 2)
+
+
+@pytest.fixture
+def magics(shell, monkeypatch):
+    from sage_maker_kernel.aws import aws
+
+    monkeypatch.setattr(aws, 'role', lambda: ROLE)
+    return shell.magics_manager.registry['PyTorchEstimatorMagics']
+
+
+def test_default_distribution_on_a_single_gpu_instance(magics):
+    magics.args = {'distribution': 'horovod', 'instance_type': 'ml.p3.2xlarge', 'framework_version': '1.13'}
+    assert magics._distribution()['mpi']['processes_per_host'] == 1
+
+
+def test_magic_prints_an_invalid_distribution(shell, magics, capsys):
+    shell.run_line_magic('pytorch', SUBMIT_LINE + ' --mpi_processes_per_host 2')
+    assert 'invalid --distribution: mpi_processes_per_host 2 is more than the 1 GPU(s) of ml.p3.2xlarge' in capsys.readouterr().out
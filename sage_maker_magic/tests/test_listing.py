@@ -0,0 +1,41 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import datetime
+
+from sage_maker_kernel.listing import PAGE_SIZE, JobIndex
+
+UTC = datetime.timezone.utc
+AFTER = datetime.datetime(2021, 1, 1, tzinfo=UTC)
+BEFORE = datetime.datetime(2021, 2, 1, tzinfo=UTC)
+
+
+def summary(name, status, modified):
+    return {'TrainingJobName': name, 'TrainingJobArn': 'arn:aws:sagemaker:us-east-1:123456789012:training-job/' + name,
+            'TrainingJobStatus': status, 'CreationTime': AFTER + datetime.timedelta(days=1),
+            'LastModifiedTime': datetime.datetime.fromtimestamp(modified, tz=UTC)}
+
+
+def test_first_sync_sends_the_filters_and_later_syncs_track_status_changes(tmp_path):
+    import boto3
+    from botocore.stub import Stubber
+
+    client = boto3.client('sagemaker', region_name='us-east-1')
+    index = JobIndex('training', 'pytorch', 'InProgress', AFTER, BEFORE, root=str(tmp_path))
+    with Stubber(client) as stubber:
+        stubber.add_response('list_training_jobs', {'TrainingJobSummaries': [summary('pytorch-1', 'InProgress', 1.6e9)]},
+                             {'MaxResults': PAGE_SIZE, 'NameContains': 'pytorch', 'StatusEquals': 'InProgress',
+                              'CreationTimeAfter': AFTER, 'CreationTimeBefore': BEFORE})
+        assert index.sync(client) == 1
+        ## Later syncs drop StatusEquals, so a job that left the status is seen and filtered out locally.
+        stubber.add_response('list_training_jobs', {'TrainingJobSummaries': [summary('pytorch-1', 'Completed', 1.6e9 + 60)]},
+                             {'MaxResults': PAGE_SIZE, 'NameContains': 'pytorch', 'CreationTimeAfter': AFTER,
+                              'CreationTimeBefore': BEFORE,
+                              'LastModifiedTimeAfter': datetime.datetime.fromtimestamp(1.6e9 - 1, tz=UTC)})
+        assert index.sync(client) == 1
+        stubber.assert_no_pending_responses()
+
+    assert index.query(status='InProgress') == []
+    assert [job['name'] for job in index.query(status='Completed')] == ['pytorch-1']
+    ## Each filter set keeps its own index file.
+    assert JobIndex('training', 'pytorch', root=str(tmp_path)).path != index.path
+    assert JobIndex('training', 'pytorch', 'InProgress', AFTER, BEFORE, root=str(tmp_path)).jobs == index.jobs
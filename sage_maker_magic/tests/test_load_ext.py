@@ -0,0 +1,26 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+
+## Load time itself is measured by benchmarks/bench_magics.py and bench_kernel_startup.py, not asserted here.
+HEAVY_MODULES = ('sagemaker', 'boto3', 'pyhocon', 'pandas')
+
+LOAD_EXT = """
+import json, sys
+sys.path.insert(0, {root!r})
+from IPython.testing.globalipapp import start_ipython
+ip = start_ipython()
+ip.run_line_magic('load_ext', 'sage_maker_kernel.kernelmagics')
+assert '--hyperparameters' in ip.magics_manager.registry['PyTorchEstimatorMagics'].pytorch.parser.format_help()
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def test_cold_load_ext_and_help_import_no_sdk():
+    out = subprocess.run([sys.executable, '-c', LOAD_EXT.format(root=ROOT, heavy=HEAVY_MODULES)], check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
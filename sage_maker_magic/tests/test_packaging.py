@@ -0,0 +1,52 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import pytest
+
+from sage_maker_kernel.packaging import SOURCE_DIR_PREFIX
+
+
+class RecordingS3(object):
+    def __init__(self):
+        self.uploads = []
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        self.uploads.append((bucket, key, ExtraArgs))
+
+
+@pytest.fixture
+def magics(shell, monkeypatch, tmp_path):
+    from sage_maker_kernel.aws import aws
+
+    s3 = RecordingS3()
+    monkeypatch.setattr(aws, 'client', lambda service_name: s3)
+    monkeypatch.setattr(aws, 'session', lambda: type('Session', (), {'boto_region_name': 'us-east-1'})())
+    source_dir = tmp_path / 'code'
+    source_dir.mkdir()
+    (source_dir / 'train.py').write_text('print(1)\n')
+    magics = shell.magics_manager.registry['PyTorchEstimatorMagics']
+    return magics, s3, str(source_dir)
+
+
+@pytest.mark.parametrize('args, bucket, prefix, kms_key', [
+    ({'output_path': 's3://out-bucket/output', 'output_kms_key': 'alias/out'}, 'out-bucket', SOURCE_DIR_PREFIX, 'alias/out'),
+    ({'code_location': 's3://code-bucket/team/code/', 'output_path': 's3://out-bucket/output', 'output_kms_key': 'alias/out'},
+     'code-bucket', 'team/code', None),
+    ({'code_location': 's3://code-bucket'}, 'code-bucket', '', None),
+])
+def test_source_dir_upload_follows_code_location_then_output_path(magics, args, bucket, prefix, kms_key):
+    magics, s3, source_dir = magics
+    magics.args = dict(args, source_dir=source_dir, entry_point='train.py')
+    _, code_args = magics._staged_code()
+
+    [(uploaded_bucket, key, extra_args)] = s3.uploads
+    assert uploaded_bucket == bucket
+    assert key.startswith(prefix + '/' if prefix else '') and key.endswith('/sourcedir.tar.gz')
+    assert extra_args.get('SSEKMSKeyId') == kms_key
+    assert code_args['source_dir'] == 's3://{}/{}'.format(bucket, key)
+
+    ## The same code is not uploaded again to the same place, but is for a new destination.
+    magics._staged_code()
+    assert len(s3.uploads) == 1
+    magics.args['code_location'] = 's3://other-bucket/code'
+    magics._staged_code()
+    assert s3.uploads[-1][0] == 'other-bucket'
@@ -0,0 +1,24 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+from IPython.core.magic_arguments import parse_argstring
+
+ROLE = 'arn:aws:iam::123456789012:role/test'
+
+
+def test_pyspark_magic_options_are_not_job_args(shell, monkeypatch):
+    from sage_maker_kernel.aws import aws
+
+    monkeypatch.setattr(aws, 'role', lambda: ROLE)
+    magics = shell.magics_manager.registry['PySparkProcessorMagics']
+    magics.args = vars(parse_argstring(magics.pyspark, 'submit --submit_app s3://bucket/app.py --job_name spark-1 '
+                                                       '--instance_count 2 --tail 5'))
+    magics.args.pop('method')
+    magics._clean_args()
+    processor_args, run_args = magics._full_fill_args()
+
+    assert magics.options == {'job_name': 'spark-1', 'tail': 5, 'name_contains': 'spark', 'max_result': 10,
+                              'straggler_factor': 3.0, 'skew_factor': 3.0}
+    for option in ('tail', 'name_contains', 'max_result', 'straggler_factor', 'skew_factor'):
+        assert option not in magics.args
+    assert magics.args['job_name'] == run_args['job_name'] == 'spark-1'
+    assert processor_args['instance_count'] == 2 and processor_args['role'] == ROLE
@@ -0,0 +1,37 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sage_maker_kernel.profiling import Profiler
+
+
+def test_calls_from_background_threads_are_not_counted():
+    profiler = Profiler()
+    watcher_started, invocation_done = threading.Event(), threading.Event()
+
+    def watcher():
+        ## A background watcher keeps describing while the invocation is profiled.
+        watcher_started.set()
+        while not invocation_done.is_set():
+            profiler.aws_call('sagemaker.DescribeTrainingJob', 0.0, 0.001)
+            with profiler.phase('watch'):
+                pass
+
+    thread = threading.Thread(target=watcher, daemon=True)
+    thread.start()
+    assert watcher_started.wait(5)
+    with profiler.profile('PyTorch', 'sweep', enabled=True) as trace:
+        with profiler.phase('launch'):
+            profiler.aws_call('sagemaker.CreateTrainingJob', 0.0, 0.001)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(profiler.propagate(lambda i: profiler.aws_call('sagemaker.CreateTrainingJob', 0.0, 0.001)),
+                                  range(3)))
+                ## Pool threads run nothing of the invocation once the propagated call returns.
+                executor.submit(profiler.aws_call, 'sagemaker.DescribeTrainingJob', 0.0, 0.001).result()
+    invocation_done.set()
+    thread.join(5)
+
+    assert list(trace.aws_calls()) == ['sagemaker.CreateTrainingJob']
+    assert trace.aws_calls()['sagemaker.CreateTrainingJob'][0] == 4
+    assert list(trace.phases()) == ['launch']
@@ -0,0 +1,63 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import json
+
+import numpy as np
+
+from sage_maker_kernel.spark_profile import SparkEventLogAnalyzer, iter_event_log_lines
+
+CHUNK_SIZE = 1000
+SAMPLE_SIZE = 4096
+TASKS = 20000
+
+
+def task_end(stage, task_id, duration, shuffle_read):
+    return json.dumps({
+        'Event': 'SparkListenerTaskEnd', 'Stage ID': stage, 'Stage Attempt ID': 0,
+        'Task Info': {'Task ID': task_id, 'Index': task_id, 'Launch Time': 0, 'Finish Time': duration, 'Failed': False},
+        'Task Metrics': {'Executor Run Time': duration,
+                         'Shuffle Read Metrics': {'Remote Bytes Read': shuffle_read, 'Local Bytes Read': 0}},
+    })
+
+
+def write_drifting_event_log(path):
+    """
+        Two interleaved stages whose task durations grow and shuffle reads shrink with every task,
+        so a sample that favours recent chunks misses both medians.
+    """
+    durations, reads = {0: [], 1: []}, {0: [], 1: []}
+    with open(path, 'w') as f:
+        for task_id in range(TASKS):
+            stage = 0 if task_id % 3 == 0 else 1
+            duration, shuffle_read = 1000 + task_id, (1000 + TASKS - task_id) * 1024
+            durations[stage].append(duration)
+            reads[stage].append(shuffle_read)
+            f.write(task_end(stage, task_id, duration, shuffle_read) + '\n')
+    return durations, reads
+
+
+def test_stage_medians_match_exact_values_over_many_chunks(tmp_path):
+    path = str(tmp_path / 'events')
+    durations, reads = write_drifting_event_log(path)
+    analyzer = SparkEventLogAnalyzer(chunk_size=CHUNK_SIZE, sample_size=SAMPLE_SIZE).feed_all(iter_event_log_lines(path))
+    table = analyzer.stage_table().set_index('stage')
+
+    assert analyzer.tasks == TASKS
+    for stage in (0, 1):
+        exact_median, exact_p95 = np.percentile(durations[stage], [50, 95])
+        assert len(analyzer.stages[stage]['sample']) == SAMPLE_SIZE
+        assert table.loc[stage, 'tasks'] == len(durations[stage])
+        assert abs(table.loc[stage, 'median_task_s'] * 1000 - exact_median) < 0.05 * exact_median
+        assert abs(table.loc[stage, 'p95_task_s'] * 1000 - exact_p95) < 0.05 * exact_p95
+        assert abs(table.loc[stage, 'straggler_ratio'] - max(durations[stage]) / exact_median) < 0.05 * max(durations[stage]) / exact_median
+        exact_read = np.median(reads[stage])
+        assert abs(np.median(analyzer.stages[stage]['sample'][:, 1]) - exact_read) < 0.05 * exact_read
+
+
+def test_small_stages_are_sampled_exactly(tmp_path):
+    path = str(tmp_path / 'events')
+    with open(path, 'w') as f:
+        for task_id in range(300):
+            f.write(task_end(0, task_id, 1000 + task_id, 2 ** 20) + '\n')
+    analyzer = SparkEventLogAnalyzer(chunk_size=64, sample_size=SAMPLE_SIZE).feed_all(iter_event_log_lines(path))
+    assert sorted(analyzer.stages[0]['sample'][:, 0]) == [1000.0 + task_id for task_id in range(300)]
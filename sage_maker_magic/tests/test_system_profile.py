@@ -0,0 +1,50 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import os
+
+import pytest
+
+from sage_maker_kernel.system_profile import RECOMMENDATIONS, SystemMetricsAnalyzer, iter_system_metric_lines
+
+## Four 0.5s slots of Debugger system metrics in the layout Debugger writes. algo-1 has busy CPUs, two unevenly
+## loaded GPUs and nearly full memory; algo-2 is a CPU-only host with one saturated core and slow storage.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'system')
+
+## host, kind: p50, p95, p99, mean, max, busiest_device_p95, devices, device_spread, samples
+EXPECTED = {
+    ('algo-1', 'cpu'): (95.0, 95.0, 95.0, 95.0, 95.0, 95.0, 2, 0.0, 4),
+    ('algo-1', 'io_wait'): (5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 1, 0.0, 4),
+    ('algo-1', 'gpu'): (30.0, 43.5, 44.7, 30.0, 45.0, 58.5, 2, 30.0, 4),
+    ('algo-1', 'gpu_memory'): (20.0, 20.0, 20.0, 20.0, 20.0, 20.0, 2, 0.0, 4),
+    ('algo-1', 'memory'): (93.0, 95.7, 95.94, 93.0, 96.0, 95.7, 1, 0.0, 4),
+    ('algo-2', 'cpu'): (26.125, 27.1375, 27.2275, 26.125, 27.25, 100.0, 4, 98.5, 4),
+    ('algo-2', 'io_wait'): (45.0, 58.5, 59.7, 45.0, 60.0, 58.5, 1, 0.0, 4),
+    ('algo-2', 'memory'): (20.0, 20.0, 20.0, 20.0, 20.0, 20.0, 1, 0.0, 4),
+}
+FLAGS = [('algo-1', 'cpu_bottleneck'), ('algo-1', 'gpu_imbalance'), ('algo-1', 'memory_pressure'),
+         ('algo-2', 'io_bottleneck'), ('algo-2', 'underutilized'), ('algo-2', 'single_core_bound')]
+
+
+@pytest.mark.parametrize('chunk_size', [5, 65536])
+def test_recorded_metrics_reduce_to_exact_percentiles(chunk_size):
+    analyzer = SystemMetricsAnalyzer(resolution=0.5, chunk_size=chunk_size).feed_all(iter_system_metric_lines(FIXTURES))
+    table = analyzer.utilization_table()
+
+    assert analyzer.records == 56
+    assert analyzer.skipped == 1
+    assert analyzer.seconds == 2.0
+    assert sorted(zip(table.host, table.kind)) == sorted(EXPECTED)
+    for row in table.itertuples(index=False):
+        expected = EXPECTED[(row.host, row.kind)]
+        assert (row.p50, row.p95, row.p99, row.mean, row.max, row.busiest_device_p95, row.device_spread) == \
+            pytest.approx(expected[:6] + expected[7:8])
+        assert (row.devices, row.samples) == (expected[6], expected[8])
+
+
+def test_bottlenecks_and_recommendations():
+    analyzer = SystemMetricsAnalyzer(resolution=0.5).feed_all(iter_system_metric_lines(FIXTURES))
+    flags = analyzer.bottlenecks()
+
+    assert list(zip(flags.host, flags.flag)) == FLAGS
+    assert dict(zip(zip(flags.host, flags.flag), flags.evidence))[('algo-1', 'cpu_bottleneck')] == 'GPU p95 44%, CPU p50 95%'
+    assert analyzer.recommendations(flags) == ['{} ({}): {}'.format(flag, host, RECOMMENDATIONS[flag]) for host, flag in FLAGS]
@@ -0,0 +1,94 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from sage_maker_kernel import throttle
+from sage_maker_kernel.throttle import RateLimiter
+
+BASE_DELAY = 0.5
+MAX_ATTEMPTS = 4
+RATE = (1e6, 1e6)
+
+
+def client_error(code, operation):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+
+class Api(object):
+    """
+        Fails with the queued errors, in order, then returns 'ok'.
+    """
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """
+        A limiter whose full-jitter backoff always sleeps its cap, and whose buckets are so fast
+        that the waits they add after a throttle are negligible; `sleeps` holds only the backoffs.
+    """
+    monkeypatch.setattr(throttle.random, 'uniform', lambda low, high: high)
+    sleeps = []
+    limiter = RateLimiter(budgets={operation: RATE for operation in throttle.API_BUDGETS}, default_budget=RATE,
+                          max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY,
+                          sleep=lambda seconds: sleeps.append(seconds) if seconds > 1e-3 else None)
+    return limiter, sleeps
+
+
+def test_throttling_is_retried_with_backoff_and_slows_the_bucket(limiter):
+    limiter, sleeps = limiter
+    api = Api(client_error('ThrottlingException', 'DescribeTrainingJob'), client_error('ThrottlingException', 'DescribeTrainingJob'))
+
+    assert limiter.call('DescribeTrainingJob', api) == 'ok'
+    assert api.calls == 3
+    assert sleeps == [BASE_DELAY * 2, BASE_DELAY * 4]
+    stats = limiter.stats()['DescribeTrainingJob']
+    assert (stats['calls'], stats['throttled'], stats['retries'], stats['failed']) == (1, 2, 2, 0)
+    assert stats['rate'] < RATE[0]
+
+
+def test_non_throttling_errors_are_raised_at_once(limiter):
+    limiter, sleeps = limiter
+    api = Api(client_error('ValidationException', 'DescribeTrainingJob'))
+
+    with pytest.raises(ClientError, match='ValidationException'):
+        limiter.call('DescribeTrainingJob', api)
+    assert api.calls == 1 and sleeps == []
+
+
+def test_retries_stop_at_the_attempt_limit(limiter):
+    limiter, sleeps = limiter
+    api = Api(*[client_error('ThrottlingException', 'ListTrainingJobs')] * (MAX_ATTEMPTS + 1))
+
+    with pytest.raises(ClientError, match='ThrottlingException'):
+        limiter.call('ListTrainingJobs', api)
+    assert api.calls == MAX_ATTEMPTS
+    assert sleeps == [BASE_DELAY * 2 ** attempt for attempt in range(1, MAX_ATTEMPTS)]
+    assert limiter.stats()['ListTrainingJobs']['failed'] == 1
+
+
+def test_transient_errors_are_retried_for_idempotent_calls_only(limiter):
+    limiter, _ = limiter
+    describe = Api(EndpointConnectionError(endpoint_url='https://api.sagemaker'), client_error('ServiceUnavailable', 'DescribeTrainingJob'))
+    assert limiter.call('DescribeTrainingJob', describe) == 'ok'
+    assert describe.calls == 3
+
+    for operation, error in (('CreateTrainingJob', EndpointConnectionError(endpoint_url='https://api.sagemaker')),
+                             ('StopTrainingJob', client_error('InternalFailure', 'StopTrainingJob'))):
+        api = Api(error)
+        with pytest.raises(type(error)):
+            limiter.call(operation, api)
+        assert api.calls == 1
+
+    create = Api(client_error('ThrottlingException', 'CreateTrainingJob'))
+    assert limiter.call('CreateTrainingJob', create) == 'ok'
+    assert create.calls == 2